@@ -0,0 +1 @@
+"""Benchmarks of the sampling / render pipeline (`python -m benchmarks`)."""
@@ -0,0 +1,61 @@
+"""
+Run the benchmark suite.
+
+    python -m benchmarks                          # print results
+    python -m benchmarks --save baseline.json     # write a baseline
+    python -m benchmarks --compare baseline.json  # fail if p50 regressed
+"""
+import argparse
+import fnmatch
+import sys
+
+from benchmarks import cases  # registers the cases
+from benchmarks.harness import CASES, compare, load, run_case, save
+
+COLUMNS = ('n', 'mean_us', 'p50_us', 'p90_us', 'p99_us', 'max_us', 'peak_kb', 'net_blocks')
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='PyTaskManager benchmarks')
+    parser.add_argument('-k', '--filter', type=str, default='*',
+                        help='実行するケース名のパターン(fnmatch)です。')
+    parser.add_argument('-n', '--repeat', type=int, default=None,
+                        help='各ケースの実行回数です。デフォルトはケースごとの値です。')
+    parser.add_argument('--save', type=str, default=None,
+                        help='結果をJSONで保存します。')
+    parser.add_argument('--compare', type=str, default=None,
+                        help='保存したJSONと比較し、p50が遅くなったケースがあれば終了コード1を返します。')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='--compareで遅くなったとみなす割合です。デフォルトは0.2(20%%)です。')
+    args = parser.parse_args()
+
+    baseline = load(args.compare) if args.compare else {}
+    print(f'{"case":<24}' + ''.join(f'{c:>12}' for c in COLUMNS))
+    results = []
+    for case in CASES:
+        if not fnmatch.fnmatch(case.name, args.filter):
+            continue
+        result = run_case(case, args.repeat)
+        results.append(result)
+        if result.skipped is not None:
+            print(f'{case.name:<24}  skipped: {result.skipped}')
+            continue
+        row = result.todict()
+        line = f'{case.name:<24}' + ''.join(f'{row[c]:>12}' for c in COLUMNS)
+        base = baseline.get(case.name, {})
+        if 'p50_us' in base and base['p50_us'] > 0:
+            line += f'  ({(result.p50_us / base["p50_us"] - 1) * 100:+.1f}% p50)'
+        print(line)
+
+    if args.save:
+        save(args.save, results)
+    if args.compare:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print('regressions: ' + ', '.join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
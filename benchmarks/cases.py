@@ -0,0 +1,263 @@
+"""
+Benchmark cases.
+
+Every case measures one part of a UI tick with `FakeProviders` /
+`FakeComputer` data. Cases that need the Win32 / pythonnet modules or a
+Tk display are skipped elsewhere.
+"""
+import functools
+import sys
+
+from benchmarks.fakes import FakeComputer, FakeProviders
+from benchmarks.harness import Skip, benchmark
+from src.utils.container import StatusContainer
+
+__all__ = []
+
+CORES = 8
+
+
+def _require_windows() -> None:
+    if sys.platform != 'win32':
+        raise Skip('Windows only (pythonnet / Win32 API).')
+
+
+def _cancel_after(root) -> None:
+    """Drop the `after()` callbacks an op scheduled (they never run without mainloop)."""
+    for after_id in root.tk.splitlist(root.tk.call('after', 'info')):
+        root.after_cancel(after_id)
+
+
+@functools.lru_cache(maxsize=None)
+def _mainwindow():
+    """A MainWindow on a withdrawn Tk root, fed by FakeProviders; the sampler is driven by hand."""
+    _require_windows()
+    import tkinter as tk
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        raise Skip(f'Tk is not available: {e}')
+    root.withdraw()
+    from src.mainwindow import MainWindow
+    window = MainWindow(root, 340, 258, FakeProviders(CORES))
+    window.sampler.stop()
+    window.sampler.join()
+    _cancel_after(root)
+    return window
+
+
+def _sensor_dicts():
+    status = FakeProviders(CORES).hardware_full()
+    return {key: [c.container.todict() for c in getattr(status.CPU, key)]
+            for key in ('Clock', 'Temperature', 'Load', 'Power')}
+
+
+@benchmark('container.register')
+def container_register():
+    """Build the CPU part of the status tree (what schema discovery does)."""
+    dicts = _sensor_dicts()
+
+    def op():
+        cpu = StatusContainer()
+        cpu.register('name', 'Fake CPU')
+        cpu.register('size', len(dicts))
+        for key, values in dicts.items():
+            sensors = []
+            for value in values:
+                sensor = StatusContainer()
+                sensor.register('container', value)
+                sensors.append(sensor)
+            cpu.register(key, sensors)
+        return cpu
+    return op
+
+
+@benchmark('container.todict')
+def container_todict():
+    status = FakeProviders(CORES).hardware_full()
+    return status.todict
+
+
+@benchmark('history.append')
+def history_append():
+    from src.history import TieredHistory
+    # table rows with CORES cores and battery rows
+    n_series = 3 + 3 * (CORES + 1) + 4 + 5
+    history = TieredHistory(n_series)
+    sample = [float(i) for i in range(n_series)]
+    t = [0.]
+
+    def op():
+        t[0] += 1.
+        history.append(sample, t[0])
+    return op
+
+
+@benchmark('block.drain[20Hz]')
+def block_drain():
+    """Reduce one display tick of 20 Hz CPU load / power samples to min / max / mean."""
+    import numpy as np
+    from src.sampler import BlockSampler
+    rng = np.random.default_rng(0)
+    # CPU load (total + cores) and package power
+    n = CORES + 2
+    block = BlockSampler(lambda out: out.__setitem__(slice(None), rng.uniform(0., 100., n)), n)
+
+    def setup():
+        for _ in range(20):
+            block.sample()
+    return block.drain, setup
+
+
+@benchmark('network.rates[16]')
+def network_rates():
+    """KB/s of 16 adapters (+ total) from one counter read."""
+    import numpy as np
+    from src.utils.traffic import Adapter, AdapterTraffic
+    n = 16
+    keys = np.arange(n, dtype=np.uint64)
+    physical = keys < 2
+    counters = np.zeros((n, 2), dtype=np.uint64)
+
+    class FakeTraffic(AdapterTraffic):
+        def _discover(self):
+            return [Adapter(key, f'Ethernet {key}', bool(p)) for key, p in zip(keys, physical)]
+
+        def _read(self):
+            counters[:] += np.uint64(1500)
+            return keys, counters
+
+    traffic = FakeTraffic()
+    traffic()
+    return traffic
+
+
+@benchmark('ohm._curstatus')
+def ohm_curstatus():
+    _require_windows()
+    from src.ohmAPI import OpenHardwareMonitor
+
+    class FakeOpenHardwareMonitor(OpenHardwareMonitor):
+        def _open_computer(self):
+            return FakeComputer(CORES)
+
+        def close(self) -> None:
+            self._closed = True
+
+    ohm = FakeOpenHardwareMonitor()
+    ohm()  # schema discovery
+    return ohm._curstatus
+
+
+def _table_rows():
+    from src import (CPU_CLOCK, CPU_LOAD, CPU_POWER, CPU_TEMP, DISK_USAGE,
+                     MEMORY_USAGE, NET_RECV, NET_SENT, RUN_PID)
+    from src.utils import Name, TableGroup
+    providers = FakeProviders(CORES)
+    status = providers.hardware()
+    names = [Name('AC Status', tag='ac'), Name('Battery', tag='ac', unit='%'), Name('Battery Status', tag='ac')]
+    values = providers.battery().tolist()
+    for key, custom_name in (('Temperature', CPU_TEMP), ('Load', CPU_LOAD),
+                             ('Clock', CPU_CLOCK), ('Power', CPU_POWER)):
+        sensors = getattr(status.CPU, key)
+        names += TableGroup(sensors, custom_name=custom_name).names
+        values += [s.value for s in sensors]
+    names += [Name(DISK_USAGE, tag='system', unit='%'), Name(MEMORY_USAGE, tag='system', unit='%'),
+              Name(RUN_PID), Name(NET_SENT, tag='network', unit='KB/s'), Name(NET_RECV, tag='network', unit='KB/s')]
+    values += [providers.disk_usage(), status.RAM.Load[0].value, providers.process_count(), *providers.network()]
+    return list(zip(names, values))
+
+
+@benchmark('table.determine_color')
+def table_determine_color():
+    """One tick: the color of every table row (color functions resolved at table build)."""
+    from src.utils import resolve_color
+    rows = [(resolve_color(name), value) for name, value in _table_rows()]
+
+    def op():
+        for row_color, value in rows:
+            row_color(value)
+    return op
+
+
+@benchmark('table.adjust_format')
+def table_adjust_format():
+    """One tick: the text of every table row."""
+    from src.utils import adjust_format
+    values = [value for _, value in _table_rows()]
+
+    def op():
+        for value in values:
+            adjust_format(value)
+    return op
+
+
+@benchmark('mainwindow.update', repeat=300)
+def mainwindow_update():
+    window = _mainwindow()
+
+    def setup():
+        _cancel_after(window.master)
+        window.sampler.sample()
+    return window.update, setup
+
+
+def _graphs(n: int):
+    window = _mainwindow()
+    from src.mainwindow import ICON
+    from src.mpl_graph import MplGraphs
+    ids = [i for i in window.id_list if window.data_table[i]['type_'] is not str][:n]
+    graphs = MplGraphs(window, ids, ICON)
+    graphs.master.withdraw()
+
+    def setup():
+        _cancel_after(window.master)
+        window.sampler.sample()
+    return graphs.update_data, setup
+
+
+@benchmark('mpl.update_data[1]', repeat=100)
+def mpl_update_data_1():
+    return _graphs(1)
+
+
+@benchmark('mpl.update_data[10]', repeat=50)
+def mpl_update_data_10():
+    return _graphs(10)
+
+
+@benchmark('processes.top[500]')
+def processes_top():
+    """CPU % of 500 processes (some come and go) and the top 10."""
+    import numpy as np
+    from src.utils.processes import ProcessTable
+    n = 500
+    pids = np.arange(n, dtype=np.int64)
+    created = np.zeros(n, dtype=np.uint64)
+    times = np.zeros(n, dtype=np.uint64)
+    memory = np.arange(n, dtype=np.float64) * 4096
+    rng = np.random.default_rng(0)
+
+    class FakeProcesses(ProcessTable):
+        def _read(self):
+            times[:] += rng.integers(0, 100, n, dtype=np.uint64)
+            # one process exits, another starts
+            pids[rng.integers(n)] += n
+            return np.sort(pids), created, times, memory, str
+
+    processes = FakeProcesses(1.)
+    processes.update()
+    return lambda: processes(10)
+
+
+@benchmark('wmi.cached')
+def wmi_cached():
+    """Win32_OperatingSystem from the cache (static part cached forever, free memory for 3 s)."""
+    from src.utils.wmi import FakeQuerySource, WmiCache
+    source = FakeQuerySource({'Win32_OperatingSystem': [
+        dict(Caption='Microsoft Windows 11 Pro', FreePhysicalMemory=8_000_000,
+             TotalVisibleMemorySize=16_000_000)]})
+    cache = WmiCache(source)
+    properties = ['Caption', 'FreePhysicalMemory', 'TotalVisibleMemorySize']
+    cache.get('Win32_OperatingSystem', properties)
+    return lambda: cache.get('Win32_OperatingSystem', properties)
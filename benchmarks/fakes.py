@@ -0,0 +1,194 @@
+"""
+Deterministic stand-ins for the live sensors.
+
+`FakeComputer` mimics `OpenHardwareMonitor.Hardware.Computer` (the .NET
+object `OpenHardwareMonitor` reads), `FakeProviders` implements the
+`Providers` interface with the same StatusContainer layout, so benchmarks
+run the real code paths without hardware, DLLs or admin rights.
+"""
+import random
+from typing import List, Optional, Sequence, Tuple, Union
+
+from src.providers.base import Providers
+from src.utils.container import StatusContainer
+
+__all__ = ['FakeSensor', 'FakeHardware', 'FakeComputer', 'FakeProviders']
+
+# values of src.ohmAPI.HardWareType / SensorType
+HARDWARE_TYPES = {'CPU': 2, 'RAM': 3, 'GpuNvidia': 4}
+SENSOR_TYPES = {
+    'Clock': (1, 'MHz'), 'Temperature': (2, '°C'), 'Load': (3, '%'), 'Fan': (4, 'RPM'),
+    'Power': (9, 'W'), 'Data': (10, 'GB'), 'SmallData': (11, 'MB')}
+# plausible value range per sensor type
+RANGES = {
+    'Clock': (800., 4800.), 'Temperature': (30., 90.), 'Load': (0., 100.), 'Fan': (0., 3000.),
+    'Power': (1., 65.), 'Data': (4., 12.), 'SmallData': (512., 8192.)}
+
+
+class _Identifier:
+    __slots__ = ['_value']
+
+    def __init__(self, value: str):
+        self._value = value
+
+    def ToString(self) -> str:
+        return self._value
+
+
+class _Array(list):
+    """.NET array (`Length`, iterable, indexable)."""
+    @property
+    def Length(self) -> int:
+        return len(self)
+
+
+class FakeSensor:
+    def __init__(self, hardware: 'FakeHardware', sensor_type: str, index: int, name: str, number: int):
+        self.Hardware = hardware
+        self.SensorType = SENSOR_TYPES[sensor_type][0]
+        self.Index = index
+        self.Name = name
+        self.Identifier = _Identifier(f'{hardware.Identifier.ToString()}/{sensor_type.lower()}/{number}')
+        self.Value: Optional[float] = None
+        self.Min: Optional[float] = None
+        self.Max: Optional[float] = None
+        self._range = RANGES[sensor_type]
+
+    def update(self, rng: random.Random) -> None:
+        lo, hi = self._range
+        value = rng.uniform(lo, hi)
+        self.Value = value
+        self.Min = value if self.Min is None else min(self.Min, value)
+        self.Max = value if self.Max is None else max(self.Max, value)
+
+
+class FakeHardware:
+    def __init__(self,
+                 hardware_type: str,
+                 name: str,
+                 identifier: str,
+                 sensors: Sequence[Tuple[str, Sequence[str]]],
+                 seed: int = 0):
+        self.HardwareType = HARDWARE_TYPES[hardware_type]
+        self.Name = name
+        self.Identifier = _Identifier(identifier)
+        self.Sensors = _Array()
+        self._rng = random.Random(seed)
+        number = 0
+        for sensor_type, names in sensors:
+            for index, sensor_name in enumerate(names):
+                self.Sensors.append(FakeSensor(self, sensor_type, index, sensor_name, number))
+                number += 1
+        self.Update()
+
+    def Update(self) -> None:
+        for sensor in self.Sensors:
+            sensor.update(self._rng)
+
+
+class FakeComputer:
+    """`OpenHardwareMonitor.Hardware.Computer` with a CPU, RAM and (optionally) an Nvidia GPU."""
+    def __init__(self, cores: int = 8, gpu: bool = True, seed: int = 0):
+        cores_ = [f'CPU Core #{i + 1}' for i in range(cores)]
+        self.Hardware = _Array([
+            FakeHardware('CPU', 'Fake CPU', '/intelcpu/0', [
+                ('Clock', ['Bus Speed'] + cores_),
+                ('Temperature', cores_ + ['CPU Package']),
+                ('Load', ['CPU Total'] + cores_),
+                ('Power', ['CPU Package', 'CPU Cores', 'CPU Graphics', 'CPU DRAM']),
+            ], seed),
+            FakeHardware('RAM', 'Generic Memory', '/ram', [
+                ('Load', ['Memory']),
+                ('Data', ['Used Memory', 'Available Memory']),
+            ], seed + 1)])
+        if gpu:
+            self.Hardware.append(FakeHardware('GpuNvidia', 'Fake GPU', '/nvidiagpu/0', [
+                ('Temperature', ['GPU Core']),
+                ('Load', ['GPU Core', 'GPU Memory']),
+                ('Fan', ['GPU']),
+                ('Power', ['GPU Power']),
+                ('SmallData', ['GPU Memory Free', 'GPU Memory Used', 'GPU Memory Total']),
+            ], seed + 2))
+
+    def Open(self) -> None:
+        pass
+
+    def Close(self) -> None:
+        pass
+
+
+class FakeProviders(Providers):
+    """
+    Providers backed by a `FakeComputer`.
+
+    Builds the same StatusContainer layout as `OpenHardwareMonitor` once and
+    refreshes the values in place on every `hardware()` call.
+    """
+    def __init__(self, cores: int = 8, battery: bool = True, gpu: bool = False, seed: int = 0):
+        self.computer = FakeComputer(cores, gpu=gpu, seed=seed)
+        self.use_battery = battery
+        self._rng = random.Random(seed)
+        self._container = StatusContainer()
+        self._cells: List[Tuple[FakeSensor, StatusContainer]] = []
+        type_names = {v[0]: (k, v[1]) for k, v in SENSOR_TYPES.items()}
+        hardware_names = {v: k for k, v in HARDWARE_TYPES.items()}
+        for hardware in self.computer.Hardware:
+            keycontainer = StatusContainer()
+            keycontainer.register('name', hardware.Name)
+            sensors = {}
+            for sensor in hardware.Sensors:
+                sensortype, format = type_names[sensor.SensorType]
+                container = StatusContainer()
+                container.register('container', dict(
+                    index=sensor.Index,
+                    name=sensor.Name,
+                    type=sensortype,
+                    identifier=sensor.Identifier.ToString(),
+                    value=sensor.Value,
+                    min=sensor.Min,
+                    max=sensor.Max,
+                    format=format))
+                sensors.setdefault(sensortype, []).append(container)
+                self._cells.append((sensor, container.container))
+            keycontainer.register('size', len(sensors))
+            for sensortype, values in sensors.items():
+                keycontainer.register(sensortype, values)
+            self._container.register(hardware_names[hardware.HardwareType], keycontainer)
+
+    def select_battery_or_gpu(self) -> Optional[bool]:
+        if self.use_battery:
+            return True
+        return False if 'GpuNvidia' in self._container else None
+
+    def hardware(self) -> StatusContainer:
+        for hardware in self.computer.Hardware:
+            hardware.Update()
+        for sensor, cell in self._cells:
+            cell.set('value', sensor.Value)
+        return self._container
+
+    def hardware_full(self) -> StatusContainer:
+        status = self.hardware()
+        for sensor, cell in self._cells:
+            cell.set('min', sensor.Min)
+            cell.set('max', sensor.Max)
+        return status
+
+    def battery(self) -> StatusContainer:
+        status = StatusContainer()
+        status.register('PowerLineStatus', 'Online')
+        status.register('BatteryLife', self._rng.randint(0, 100))
+        status.register('BatteryChargeStatus', 'Charging(High)')
+        return status
+
+    def gpu_load(self) -> float:
+        return self._rng.uniform(0., 100.)
+
+    def disk_usage(self) -> float:
+        return self._rng.uniform(40., 60.)
+
+    def process_count(self) -> int:
+        return self._rng.randint(200, 400)
+
+    def network(self) -> List[Union[float, str]]:
+        return [self._rng.uniform(0., 1000.), self._rng.uniform(0., 1000.)]
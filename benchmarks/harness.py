@@ -0,0 +1,161 @@
+"""Timing / allocation harness and JSON baselines."""
+import dataclasses
+import datetime
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+__all__ = ['Skip', 'Case', 'Result', 'benchmark', 'CASES', 'run_case', 'save', 'load', 'compare']
+
+
+class Skip(Exception):
+    """Raised by a case when it cannot run here (e.g. Windows / Tk only)."""
+
+
+@dataclasses.dataclass
+class Case:
+    name: str
+    # returns `op` or `(op, setup)`; `setup` runs untimed before every `op`.
+    factory: Callable[[], Any]
+    repeat: int = 1000
+
+
+@dataclasses.dataclass
+class Result:
+    name: str
+    n: int = 0
+    mean_us: float = 0.
+    p50_us: float = 0.
+    p90_us: float = 0.
+    p99_us: float = 0.
+    max_us: float = 0.
+    # bytes allocated at the peak of one op / memory blocks still alive after it
+    peak_kb: float = 0.
+    net_blocks: float = 0.
+    skipped: Optional[str] = None
+
+    def todict(self) -> Dict[str, Any]:
+        if self.skipped is not None:
+            return dict(skipped=self.skipped)
+        return {k: v for k, v in dataclasses.asdict(self).items() if k not in ('name', 'skipped')}
+
+
+CASES: List[Case] = []
+
+
+def benchmark(name: str, repeat: int = 1000):
+    """Register a benchmark case."""
+    def wrapper(factory):
+        CASES.append(Case(name, factory, repeat))
+        return factory
+    return wrapper
+
+
+def _noop() -> None:
+    pass
+
+
+def _prepare(case: Case) -> Tuple[Callable[[], Any], Callable[[], Any]]:
+    fixture = case.factory()
+    if isinstance(fixture, tuple):
+        return fixture
+    return fixture, _noop
+
+
+def _allocations(op, setup, repeat: int) -> Tuple[float, float]:
+    peaks, blocks = [], []
+    tracemalloc.start()
+    try:
+        for _ in range(repeat):
+            setup()
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            before = sys.getallocatedblocks()
+            op()
+            after = sys.getallocatedblocks()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - current)
+            blocks.append(after - before)
+    finally:
+        tracemalloc.stop()
+    return float(np.median(peaks)) / 1024, float(np.median(blocks))
+
+
+def run_case(case: Case, repeat: Optional[int] = None, warmup: int = 10) -> Result:
+    """Time `repeat` calls of one case (gc disabled) and measure its allocations."""
+    repeat = repeat or case.repeat
+    try:
+        op, setup = _prepare(case)
+    except Skip as e:
+        return Result(case.name, skipped=str(e))
+    except ImportError as e:
+        return Result(case.name, skipped=f'{type(e).__name__}: {e}')
+
+    for _ in range(warmup):
+        setup()
+        op()
+    times = np.empty(repeat)
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for i in range(repeat):
+            setup()
+            start = time.perf_counter_ns()
+            op()
+            times[i] = time.perf_counter_ns() - start
+    finally:
+        if gc_enabled:
+            gc.enable()
+    times /= 1000.
+    peak_kb, net_blocks = _allocations(op, setup, min(repeat, 200))
+    p50, p90, p99 = np.percentile(times, [50, 90, 99])
+    return Result(
+        case.name,
+        n=repeat,
+        mean_us=round(float(times.mean()), 2),
+        p50_us=round(float(p50), 2),
+        p90_us=round(float(p90), 2),
+        p99_us=round(float(p99), 2),
+        max_us=round(float(times.max()), 2),
+        peak_kb=round(peak_kb, 2),
+        net_blocks=round(net_blocks, 1))
+
+
+def save(path: str, results: List[Result]) -> None:
+    """Write results as sorted, indented JSON so baselines diff cleanly."""
+    data = dict(
+        meta=dict(
+            date=datetime.datetime.now().isoformat(timespec='seconds'),
+            python=platform.python_version(),
+            platform=platform.platform(),
+            machine=platform.machine(),
+            processor=platform.processor()),
+        results={r.name: r.todict() for r in results})
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, sort_keys=True, ensure_ascii=False)
+        f.write('\n')
+
+
+def load(path: str) -> Dict[str, Dict[str, Any]]:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['results']
+
+
+def compare(results: List[Result], baseline: Dict[str, Dict[str, Any]], threshold: float = 0.2) -> List[str]:
+    """
+    Names of the cases whose p50 got slower than the baseline by more than `threshold`.
+    """
+    regressions = []
+    for r in results:
+        base = baseline.get(r.name)
+        if r.skipped is not None or base is None or 'p50_us' not in base:
+            continue
+        if r.p50_us > base['p50_us'] * (1. + threshold):
+            regressions.append(r.name)
+    return regressions
@@ -1,3 +1,5 @@
+import sys
+
 # gname.py
 from src.gname import PYTASKMGR
 from src.gname import AC_STATUS
@@ -18,48 +20,93 @@ from src.gname import RUN_PID
 from src.gname import NET_SENT
 from src.gname import NET_RECV
 
-# systemAPI
-## c_api.py
-from src.systemAPI import dpi_changed
-from src.systemAPI import getDpiFactor
-from src.systemAPI import init_process
-## network.py
-from src.systemAPI import Network
-## powerline.py
-from src.systemAPI import alert_on_balloontip
-from src.systemAPI import get_battery_status
-## process.py
-from src.systemAPI import get_current_pids
-from src.systemAPI import c_disk_usage
-## win_forms.py
-from src.systemAPI import error
-from src.systemAPI import info
-from src.systemAPI import question
-from src.systemAPI import show_message_to_notification
-from src.systemAPI import workingarea
-from src.systemAPI import borders
-from src.systemAPI import set_icon
-## gpu.py
-from src.systemAPI import nvidia_smi_update
-from src.systemAPI import is_nvidia_smi_available
-from src.systemAPI import gpu_power_limit
-from src.systemAPI import gpu_fan_speed
-from src.systemAPI import NetGPU
+# pythonnet / Win32 parts are only importable on Windows.
+# Tk / matplotlib modules (mainwindow, mpl_graph, debug_panel, utils.style)
+# are not imported here so that --headless never loads them.
+IS_WINDOWS = sys.platform == 'win32'
+
+if IS_WINDOWS:
+    # systemAPI
+    ## c_api.py
+    from src.systemAPI import dpi_changed
+    from src.systemAPI import getDpiFactor
+    from src.systemAPI import init_process
+    ## network.py
+    from src.systemAPI import Network
+    ## powerline.py
+    from src.systemAPI import alert_on_balloontip
+    from src.systemAPI import get_battery_status
+    ## process.py
+    from src.systemAPI import get_current_pids
+    from src.systemAPI import c_disk_usage
+    ## win_forms.py
+    from src.systemAPI import error
+    from src.systemAPI import info
+    from src.systemAPI import question
+    from src.systemAPI import show_message_to_notification
+    from src.systemAPI import workingarea
+    from src.systemAPI import borders
+    from src.systemAPI import set_icon
+    ## gpu.py
+    from src.systemAPI import nvidia_smi_update
+    from src.systemAPI import is_nvidia_smi_available
+    from src.systemAPI import gpu_power_limit
+    from src.systemAPI import gpu_fan_speed
+    from src.systemAPI import NetGPU
+    ## registry.py
+    from src.systemAPI import theme_source
+
+    # ohmAPI.py
+    from src.ohmAPI import OpenHardwareMonitor
 
-# ohmAPI.py
-from src.ohmAPI import OpenHardwareMonitor
+
+# task.py
+from src.utils import logger
 
 ## table.py
 from src.utils import Name
 from src.utils import TableGroup
 from src.utils import adjust_format
 from src.utils import determine_color
+from src.utils import resolve_color
 from src.utils import ctrl
-from src.utils import StyleWatch
 
-# task.py
-from src.utils import logger
+# history
+from src.history import RingHistory
+from src.history import as_float
+from src.history import SegmentWriter
+from src.history import read_segment
+from src.history import iter_segments
+from src.history import Rollup
+from src.history import TieredHistory
+
+# providers
+from src.providers import Providers
+from src.providers import CaptureProviders
+from src.providers import ReplayProviders
+
+# sampler.py
+from src.sampler import Sampler
+from src.sampler import Snapshot
+
+# profiler.py
+from src.profiler import Profiler
+from src.profiler import SpanStats
+
+# collector.py
+from src.collector import Collector
 
-# mplgraph
-from src.mpl_graph import create_graph
+# watchers.py
+from src.watchers import Source
+from src.watchers import PollSource
+from src.watchers import FakeSource
+from src.watchers import Watcher
+from src.watchers import WatcherThread
+from src.watchers import POLL_INTERVAL
 
+if IS_WINDOWS:
+    from src.providers import WindowsProviders
+else:
+    # linuxAPI
+    from src.linuxAPI import LinuxHardwareMonitor
+    from src.providers import LinuxProviders
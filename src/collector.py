@@ -0,0 +1,266 @@
+import dataclasses
+import threading
+from typing import AbstractSet, Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.gname import *
+from src.history import as_float
+from src.profiler import Profiler
+from src.providers import Providers
+from src.sampler import BlockSampler
+from src.utils import Name, StatusContainer, TableGroup, logger
+
+__all__ = ['Collector', 'SAMPLE_INTERVALS']
+
+# seconds between two reads of the slow providers; the others (and
+# `hardware()`, which starts every pass) follow the sampling interval
+SAMPLE_INTERVALS = {
+    'battery': 5.,
+    'disk_usage': 10.,
+    'process_count': 5.,
+    'processes': 5.,
+}
+
+
+def _row_group(name: str, children: List[str], type_: str, identifier: str,
+               unit: str, parent_unit: Optional[str] = None) -> TableGroup:
+    """
+    Parent row + one child row per entry of `children` (same layout as the
+    OHM sensor groups). `identifier` is formatted with the row index.
+    """
+    containers = []
+    for i, child in enumerate([name, *children]):
+        container = StatusContainer()
+        container.register('container', dict(
+            index=i,
+            name=child,
+            type=type_,
+            identifier=identifier.format(i),
+            value=None,
+            format=unit if i or parent_unit is None else parent_unit))
+        containers.append(container)
+    return TableGroup(containers, custom_name=name)
+
+
+def _network_group(adapters: List[str], direction: str, name: str) -> TableGroup:
+    """Total row + one child row per adapter."""
+    return _row_group(name, adapters, 'network', f'/network/{{}}/{direction}', 'KB/s')
+
+
+def _process_group(n: int, by: str) -> TableGroup:
+    """Process count row + N rows named after the top processes at each pass."""
+    return _row_group(RUN_PID, [f'#{i + 1}' for i in range(n)], 'process', '/process/{}',
+                      '%' if by == 'cpu' else 'MB', parent_unit='')
+
+
+class Collector:
+    """
+    Table rows and one sampling pass over the providers.
+
+    Shared by the window and the headless mode; never touches Tk.
+    Providers in `intervals` get their own sampler task (see `Sampler`);
+    when not due their last value is reused.
+
+    With `top_processes` > 0 the Running Processes row gets that many
+    children: the processes using the most CPU (%) or memory (MB) by
+    `top_by`; their names are in `labels` after each pass.
+    """
+    def __init__(self,
+                 providers: Providers,
+                 gpu3d: bool = False,
+                 profiler: Optional[Profiler] = None,
+                 intervals: Optional[Dict[str, float]] = None,
+                 top_processes: int = 0,
+                 top_by: str = 'cpu'):
+        self.providers = providers
+        self.gpu3d = gpu3d
+        self.profiler = profiler if profiler is not None else Profiler()
+        # last value of every provider call
+        self._last: Dict[str, Any] = {}
+        # --fast-rate: CPU load / power rows averaged over a block of fast samples
+        self.block: Optional[BlockSampler] = None
+        # (min, max) of the fast rows in the last pass
+        self.band: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+        # battery
+        self.use_battery_mode = providers.select_battery_or_gpu()
+
+        # table names
+        # not a sampling pass: a replay keeps its first frame, a capture records nothing
+        status = providers.hardware_full()
+
+        if self.use_battery_mode is not None:
+            if self.use_battery_mode:
+                self.table_names = [Name(AC_STATUS, tag='ac'),
+                                    Name(BATTERY, tag='ac', unit='%'),
+                                    Name(BATTERY_STATUS, tag='ac')]
+            else:
+                nv = status.GpuNvidia
+                self.table_names = [
+                    Name.from_container(nv.Fan[0].container).update(name=GPU_FAN, tag='gpu_fan'),
+                    Name.from_container(nv.Power[0].container).update(tag='gpu_power'),
+                    Name(name=GPU_RAM, tag='gpu_ram', unit='%'),
+                    Name.from_container(nv.Temperature[0].container).update(name=GPU_TEMP),
+                ]
+        else:
+            self.table_names = []
+
+        # gpus
+        if self.gpu3d:
+            self.table_names.append(Name(GPU_LOAD, tag='gpu_load', unit='%'))
+
+        # cpus
+        self.cpu_temp_table = TableGroup(status.CPU.Temperature, custom_name=CPU_TEMP)
+        self.cpu_load_table = TableGroup(status.CPU.Load, custom_name=CPU_LOAD)
+        self.cpu_clock_table = TableGroup(status.CPU.Clock, custom_name=CPU_CLOCK)
+        self.cpu_power_table = TableGroup(status.CPU.Power, custom_name=CPU_POWER)
+
+        self.table_names += self.cpu_temp_table.names
+        load_start = len(self.table_names)
+        self.table_names += self.cpu_load_table.names
+        self.table_names += self.cpu_clock_table.names
+        power_start = len(self.table_names)
+        self.table_names += self.cpu_power_table.names
+        # rows of `Providers.fast`, in its order
+        self.fast_rows = list(range(load_start, load_start + len(status.CPU.Load))) \
+                       + list(range(power_start, power_start + len(status.CPU.Power)))
+
+        # network: total, then one row per adapter (`Providers.network` order)
+        adapters = providers.network_adapters()
+        self.net_sent_table = _network_group(adapters, 'sent', NET_SENT)
+        self.net_recv_table = _network_group(adapters, 'received', NET_RECV)
+
+        # processes: count, then the top N
+        self.top_processes = top_processes
+        self.top_by = top_by
+        self.process_table = _process_group(top_processes, top_by)
+        # (row, process name) of the top N rows, replaced every pass
+        self.labels: List[Tuple[int, str]] = []
+
+        _system = [
+            Name(DISK_USAGE, tag='system', unit='%'),
+            Name(MEMORY_USAGE, tag='system', unit='%'),
+            *self.process_table.names,
+            *self.net_sent_table.names,
+            *self.net_recv_table.names,
+        ]
+
+        self.table_names += _system
+        # first top N row
+        self._top_row = self.table_names.index(self.process_table.parent) + 1
+
+        # a replay reads what was recorded in each frame
+        if intervals is None:
+            intervals = SAMPLE_INTERVALS if providers.live else {}
+        calls = {'battery': bool(self.use_battery_mode), 'gpu_load': self.gpu3d,
+                 'process_count': top_processes <= 0, 'processes': top_processes > 0}
+        self.intervals = {call: interval for call, interval in intervals.items()
+                          if calls.get(call, True)}
+
+    @property
+    def schema(self) -> List[Dict[str, Any]]:
+        """Table rows as dicts (recording / headless output header)."""
+        return [dataclasses.asdict(name) for name in self.table_names]
+
+    def start_block(self, rate: float, lock: threading.Lock) -> Optional[BlockSampler]:
+        """
+        Read CPU load / power at `rate` Hz (with the sampler `lock` held).
+        Each pass then shows their mean and keeps min / max in `band`.
+        """
+        try:
+            with lock:
+                self.providers.fast(np.empty(len(self.fast_rows)))
+        except NotImplementedError:
+            logger.debug('Fast sampling is not available with these providers.')
+            return None
+        self.block = BlockSampler(self.providers.fast, len(self.fast_rows), rate, lock)
+        self.block.start()
+        return self.block
+
+    def stop_block(self) -> None:
+        if self.block is not None:
+            self.block.stop()
+            self.block = None
+
+    def _read(self, call: str, skip: AbstractSet[str], *args: Any) -> Any:
+        """Provider `call`, or its last value when skipped / not recorded."""
+        if call in self._last and (call in skip or not self.providers.recorded(call)):
+            return self._last[call]
+        with self.profiler.span(f'sample.{call}'):
+            value = self._last[call] = getattr(self.providers, call)(*args)
+        return value
+
+    def _processes(self, skip: AbstractSet[str]) -> List[Union[str, int, float]]:
+        """Process count (+ the top N rows, updating `labels`)."""
+        n = self.top_processes
+        if n <= 0:
+            return [self._read('process_count', skip)]
+        processes = self._read('processes', skip, n, self.top_by)
+        top = processes['top']
+        values = [cpu if self.top_by == 'cpu' else memory for _, cpu, memory in top]
+        row = self._top_row
+        self.labels = [(row + i, name) for i, (name, _, _) in enumerate(top)] \
+                    + [(row + i, '-') for i in range(len(top), n)]
+        return [processes['count'], *values, *[''] * (n - len(top))]
+
+    def collect(self, skip: AbstractSet[str] = frozenset()) -> List[Union[str, int]]:
+        """
+        現在の状態を取得
+
+        Providers named in `skip` are not read (last value).
+        Called on the sampler thread: must not touch Tk.
+        """
+        span = self.profiler.span
+        with span('sample.hardware'):
+            ohm_status = self.providers.hardware()
+
+        if self.use_battery_mode is not None:
+            if self.use_battery_mode:
+                status = self._read('battery', skip).tolist()
+            else:
+                with span('sample.nvidia_smi'):
+                    self.providers.nvidia_smi_update()
+                status = [
+                    ohm_status.GpuNvidia.Fan[0].value,
+                    ohm_status.GpuNvidia.Power[0].value,
+                    ohm_status.GpuNvidia.SmallData[1].value \
+                        / ohm_status.GpuNvidia.SmallData[2].value * 100,
+                    ohm_status.GpuNvidia.Temperature[0].value,
+                ]
+        else:
+            status = []
+        if self.gpu3d:
+            status += [self._read('gpu_load', skip)]
+
+        status += [p.value for p in ohm_status.CPU.Temperature]
+        status += [p.value for p in ohm_status.CPU.Load]
+        status += [p.value for p in ohm_status.CPU.Clock]
+        status += [p.value for p in ohm_status.CPU.Power]
+
+        _system = [self._read('disk_usage', skip),
+                   ohm_status.RAM.Load[0].value,
+                   *self._processes(skip),
+                   *self._read('network', skip)]
+        status += _system
+
+        if self.block is not None:
+            block = self.block.drain()
+            if block.count:
+                for row, mean in zip(self.fast_rows, block.mean.tolist()):
+                    if mean == mean:  # not NaN
+                        status[row] = mean
+                self.band = (block.min, block.max)
+            else:
+                current = np.array([status[row] for row in self.fast_rows], dtype=np.float64)
+                self.band = (current, current)
+
+        return status
+
+    def to_sample(self, values: Sequence[Any]) -> List[float]:
+        """Row values as floats for the history / recording."""
+        sample = []
+        for name, value in zip(self.table_names, values):
+            # network: "Not connected" -> 0
+            sample.append(as_float(value, 0. if name.tag == 'network' else float('nan')))
+        return sample
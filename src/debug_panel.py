@@ -0,0 +1,54 @@
+import tkinter as tk
+from typing import Optional
+
+from src.gname import PYTASKMGR
+from src.profiler import Profiler
+
+__all__ = ['DebugPanel']
+
+
+class DebugPanel:
+    """
+    Toggleable window with the profiler numbers (p50 / p99 per stage, GC pauses).
+
+    The text is only rebuilt while the window is shown.
+    """
+    FONT = 'Consolas'
+
+    def __init__(self, master: tk.Tk, profiler: Profiler, font_size: int = 9):
+        self.master = master
+        self.profiler = profiler
+        self.font_size = font_size
+        self.window: Optional[tk.Toplevel] = None
+        self.label: Optional[tk.Label] = None
+
+    @property
+    def visible(self) -> bool:
+        return self.window is not None
+
+    def toggle(self) -> None:
+        if self.visible:
+            self.hide()
+        else:
+            self.show()
+
+    def show(self) -> None:
+        if self.visible:
+            return
+        self.window = tk.Toplevel(self.master)
+        self.window.title(f'{PYTASKMGR} - debug')
+        self.window.attributes('-topmost', True)
+        self.window.protocol('WM_DELETE_WINDOW', self.hide)
+        self.label = tk.Label(self.window, justify=tk.LEFT, anchor=tk.NW,
+                              font=(self.FONT, self.font_size))
+        self.label.pack(fill=tk.BOTH, expand=True, padx=4, pady=4)
+        self.refresh()
+
+    def hide(self) -> None:
+        if self.window is not None:
+            self.window.destroy()
+        self.window = self.label = None
+
+    def refresh(self) -> None:
+        if self.label is not None:
+            self.label.configure(text=self.profiler.format())
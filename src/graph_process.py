@@ -0,0 +1,153 @@
+import dataclasses
+import multiprocessing
+import tkinter as tk
+import types
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src import mpl_graph
+from src.gname import PYTASKMGR
+from src.history import RingHistory
+from src.mpl_graph import GraphRenderer, create_graph
+from src.profiler import Profiler
+from src.utils import logger
+
+__all__ = ['GraphProcess', 'run_graph_process', 'REMOTE_MAX_WINDOWS', 'REMOTE_MAX_SHOW']
+
+# limits in the renderer process (rendering does not compete with sampling there)
+REMOTE_MAX_WINDOWS = 30
+REMOTE_MAX_SHOW = 24
+# ms between two checks of the published sample version
+POLL_MS = 15
+
+
+def _theme(style) -> Tuple[bool, Dict[str, str]]:
+    return style.current_mode, dataclasses.asdict(style.colors)
+
+
+class GraphProcess:
+    """
+    Graph windows drawn by a separate process (`--graph-process`).
+
+    The raw history lives in shared memory; the child maps it read only
+    and redraws when the sample version published by `render` changes, so
+    matplotlib never runs in the process that samples and draws the table.
+    """
+    def __init__(self, history: RingHistory, dpi_factor: float, icon: str, style):
+        if history.shared_spec is None:
+            raise ValueError('GraphProcess needs a shared history (RingHistory(shared=True)).')
+        context = multiprocessing.get_context('spawn')
+        self.version = context.Value('q', 0, lock=False)
+        self._conn, child = context.Pipe()
+        self._mode = style.current_mode
+        self.process = context.Process(
+            target=run_graph_process,
+            args=(child, history.shared_spec, self.version, dpi_factor, icon, _theme(style)),
+            name=f'{PYTASKMGR} graphs',
+            daemon=True)
+        self.process.start()
+        child.close()
+        logger.debug(f'Graph process started (pid {self.process.pid}).')
+
+    def open(self, tables: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Open a graph window for `(table id, data_table entry)` rows."""
+        self._send('open', tables)
+
+    def render(self, version: int, style) -> None:
+        """Publish a new sample version (and the theme when it changed)."""
+        if style.current_mode != self._mode:
+            self._mode = style.current_mode
+            self._send('theme', _theme(style))
+        self.version.value = version
+
+    def _send(self, *message) -> None:
+        try:
+            self._conn.send(message)
+        except (BrokenPipeError, OSError):
+            logger.error('Graph process is not running.')
+
+    def close(self) -> None:
+        self._send('close')
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.terminate()
+        self._conn.close()
+
+
+class _RemoteMainWindow:
+    """
+    What `MplGraphs` reads from MainWindow, inside the renderer process.
+    """
+    def __init__(self,
+                 master: tk.Tk,
+                 conn,
+                 history: RingHistory,
+                 version,
+                 dpi_factor: float,
+                 icon: str,
+                 theme: Tuple[bool, Dict[str, str]]):
+        self.master = master
+        self.conn = conn
+        self.history = history
+        self.version = version
+        self.dpi_factor = dpi_factor
+        self.icon = icon
+        self.data_table: Dict[str, Dict[str, Any]] = {}
+        self.profiler = Profiler()
+        self.graph_renderer = GraphRenderer()
+        self.ttk_style = types.SimpleNamespace()
+        self.set_theme(theme)
+        self.master.after(POLL_MS, self.poll)
+
+    def _int_factor(self, value: float) -> int:
+        return int(value * self.dpi_factor)
+
+    def band(self, row: int, n: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        # --fast-rate bands stay in the main process
+        return None
+
+    def set_theme(self, theme: Tuple[bool, Dict[str, str]]) -> None:
+        mode, colors = theme
+        self.ttk_style.current_mode = mode
+        self.ttk_style.colors = types.SimpleNamespace(**colors)
+
+    def handle(self, command: str, *args) -> None:
+        if command == 'open':
+            tables, = args
+            self.data_table.update(tables)
+            create_graph(self, [table_id for table_id, _ in tables], self.icon)
+        elif command == 'theme':
+            self.set_theme(*args)
+        elif command == 'close':
+            raise EOFError
+
+    def poll(self) -> None:
+        try:
+            while self.conn.poll():
+                self.handle(*self.conn.recv())
+        except (EOFError, OSError):
+            # closed, or the main process is gone
+            self.history.close()
+            self.master.destroy()
+            return
+        version = self.version.value
+        if version != self.graph_renderer.version:
+            self.history.sync()
+            self.graph_renderer.render(version)
+        self.master.after(POLL_MS, self.poll)
+
+
+def run_graph_process(conn,
+                      spec: Tuple[str, int, int],
+                      version,
+                      dpi_factor: float,
+                      icon: str,
+                      theme: Tuple[bool, Dict[str, str]]) -> None:
+    """Entry point of the renderer process."""
+    mpl_graph.MAX_WINDOWS = REMOTE_MAX_WINDOWS
+    mpl_graph.MAX_SHOW = REMOTE_MAX_SHOW
+    root = tk.Tk()
+    root.withdraw()
+    _RemoteMainWindow(root, conn, RingHistory.attach(*spec), version, dpi_factor, icon, theme)
+    root.mainloop()
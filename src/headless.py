@@ -0,0 +1,131 @@
+"""Headless collector (`pytaskmgr.py --headless`): no Tk, no matplotlib."""
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+from typing import Any, Callable, List, Optional, TextIO
+
+from src.collector import Collector
+from src.history import SegmentWriter
+from src.providers import Providers
+from src.sampler import Sampler, Snapshot
+from src.utils import logger
+from src.watchers import WatcherThread
+
+__all__ = ['run_headless', 'log_to_stderr']
+
+
+def log_to_stderr() -> None:
+    """stdout is the data stream in headless mode: move the log to stderr."""
+    for handler in logger.handlers:
+        if isinstance(handler, logging.StreamHandler) and handler.stream is sys.stdout:
+            handler.setStream(sys.stderr)
+
+
+def _json_values(values) -> List[Any]:
+    """NaN / inf (no value) -> null: JSON has no NaN."""
+    return [None if isinstance(v, float) and not math.isfinite(v) else v for v in values]
+
+
+class _JsonLines:
+    """
+    Write samples to a stream as JSON lines.
+
+    The first line is `{"schema": [...]}` (same rows as the recording
+    schema), then one `{"t", "seq", "values"}` object per sample, `null`
+    where there is no value (with `--top-processes`, also the names of the
+    top N rows in `processes`).
+
+    When the reader goes away (`... | head -1`), the stream is sent to
+    devnull and `on_close` is called (stops the sampler).
+    """
+    def __init__(self, stream: TextIO, collector: Collector,
+                 on_close: Optional[Callable[[], None]] = None):
+        self.stream = stream
+        self.collector = collector
+        self.on_close = on_close
+        self.closed = False
+        header = dict(schema=collector.schema)
+        if collector.block is not None:
+            header['band_rows'] = collector.fast_rows
+        self._write(header)
+
+    def _write(self, obj) -> None:
+        if self.closed:
+            return
+        # allow_nan=False: a NaN that slipped through fails here, not in the reader
+        line = json.dumps(obj, ensure_ascii=False, default=str, allow_nan=False) + '\n'
+        try:
+            self.stream.write(line)
+            self.stream.flush()
+        except OSError:
+            # BrokenPipeError etc.: end of output
+            self._close()
+
+    def _close(self) -> None:
+        self.closed = True
+        logger.debug('Headless: output closed.')
+        try:
+            # the interpreter flushes stdout again at exit
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, self.stream.fileno())
+            os.close(devnull)
+        except (OSError, ValueError):
+            pass
+        if self.on_close is not None:
+            self.on_close()
+
+    def __call__(self, snapshot: Snapshot) -> None:
+        line = dict(t=snapshot.timestamp, seq=snapshot.seq, values=_json_values(snapshot.values))
+        band = self.collector.band
+        if band is not None:
+            # min / max of the `band_rows` (mean is in `values`)
+            line['band'] = [_json_values(band[0].tolist()), _json_values(band[1].tolist())]
+        if self.collector.top_processes > 0:
+            line['processes'] = [label for _, label in self.collector.labels]
+        self._write(line)
+
+
+def run_headless(providers: Providers, args: argparse.Namespace) -> None:
+    """
+    Sample the providers every `args.interval` seconds on this thread until
+    Ctrl+C (or the end of a replay). Samples go to `args.record` if given,
+    otherwise to stdout.
+    """
+    collector = Collector(providers, args.gpu3d,
+                          top_processes=args.top_processes, top_by=args.top_by)
+    sampler = Sampler(collector.collect, args.interval / providers.speed,
+                      clock=providers.clock,
+                      intervals=collector.intervals, profiler=collector.profiler)
+    if args.fast_rate > 0:
+        collector.start_block(args.fast_rate, sampler.lock)
+    # e.g. network adapter discovery
+    watchers = WatcherThread()
+    providers.watch(watchers)
+    watchers.start()
+    recorder: Optional[SegmentWriter] = None
+    if args.record is not None:
+        recorder = SegmentWriter(args.record, schema=collector.schema,
+                                 max_age=args.record_rotate * 3600)
+        logger.debug(f'Recording to {args.record}.')
+
+        def emit(snapshot: Snapshot) -> None:
+            recorder.append(collector.to_sample(snapshot.values), snapshot.timestamp)
+    else:
+        emit = _JsonLines(sys.stdout, collector, on_close=sampler.stop)
+
+    sampler.on_sample = emit
+    logger.debug(f'Headless: {len(collector.table_names)} rows every {args.interval}s.')
+    try:
+        # no UI: the sampler loop runs on the main thread
+        sampler.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        collector.stop_block()
+        watchers.stop()
+        if recorder is not None:
+            recorder.close()
+        providers.close()
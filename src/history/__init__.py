@@ -0,0 +1,8 @@
+from src.history.ring import RingHistory
+from src.history.ring import as_float
+from src.history.segments import SegmentWriter
+from src.history.segments import read_segment
+from src.history.segments import iter_segments
+from src.history.rollup import Rollup
+from src.history.rollup import RollupTier
+from src.history.rollup import TieredHistory
@@ -0,0 +1,166 @@
+from multiprocessing import shared_memory
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+__all__ = ['RingHistory', 'as_float']
+
+
+class RingHistory:
+    """
+    Columnar ring buffer of float64 samples with a timestamp column.
+
+    Shape is (n_series x capacity). Every sample is written twice, at
+    `head` and `head + capacity`, so the latest `n` samples are always one
+    contiguous slice and views can be handed out without copying.
+    Memory is fixed at creation: 16 * (n_series + 1) * capacity bytes.
+
+    Slots that were never written read as 0 (same as the old
+    `deque([0]*29 + [value])` rows); use `size` to know how many are real.
+
+    With `shared=True` the buffers live in a `multiprocessing.shared_memory`
+    block that another process maps with `attach` (read only); `head`,
+    `size` and `count` are published in a small header guarded by a
+    sequence counter (odd while an append is in progress).
+    """
+    # seq, head, size, count
+    _HEADER = 4
+
+    def __init__(self, n_series: int, capacity: int = 3600, shared: bool = False):
+        if capacity < 1:
+            raise ValueError('capacity must be >= 1.')
+        self.n_series = n_series
+        self.capacity = capacity
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._header: Optional[np.ndarray] = None
+        self._owner = shared
+        if shared:
+            self._shm = shared_memory.SharedMemory(create=True, size=self._shared_size(n_series, capacity))
+            self._map(self._shm.buf)
+            self._header[:] = 0
+            self._data[:] = 0.
+            self._time[:] = np.nan
+        else:
+            self._data = np.zeros((n_series, 2 * capacity), dtype=np.float64)
+            self._time = np.full(2 * capacity, np.nan, dtype=np.float64)
+        self._head = 0
+        self.size = 0
+        self.count = 0
+
+    @classmethod
+    def _shared_size(cls, n_series: int, capacity: int) -> int:
+        return 8 * (cls._HEADER + (n_series + 1) * 2 * capacity)
+
+    def _map(self, buf) -> None:
+        n, c = self.n_series, 2 * self.capacity
+        self._header = np.ndarray((self._HEADER,), dtype=np.int64, buffer=buf)
+        offset = 8 * self._HEADER
+        self._data = np.ndarray((n, c), dtype=np.float64, buffer=buf, offset=offset)
+        self._time = np.ndarray((c,), dtype=np.float64, buffer=buf, offset=offset + 8 * n * c)
+
+    @property
+    def shared_spec(self) -> Optional[Tuple[str, int, int]]:
+        """(shared memory name, n_series, capacity) for `attach`."""
+        if self._shm is None:
+            return None
+        return self._shm.name, self.n_series, self.capacity
+
+    @classmethod
+    def attach(cls, name: str, n_series: int, capacity: int) -> 'RingHistory':
+        """Read-only view of a shared history created in another process; call `sync` before reading."""
+        self = cls.__new__(cls)
+        self.n_series = n_series
+        self.capacity = capacity
+        self._shm = shared_memory.SharedMemory(name=name)
+        self._owner = False
+        self._map(self._shm.buf)
+        self._data.flags.writeable = False
+        self._time.flags.writeable = False
+        self._head = self.size = self.count = 0
+        self.sync()
+        return self
+
+    def sync(self) -> bool:
+        """Reader side: load head / size / count published by the writer. True if new samples arrived."""
+        header = self._header
+        while True:
+            seq = int(header[0])
+            if seq % 2 == 0:
+                head, size, count = (int(v) for v in header[1:])
+                if int(header[0]) == seq:
+                    break
+        changed = count != self.count
+        self._head, self.size, self.count = head, size, count
+        return changed
+
+    def close(self) -> None:
+        """Release the shared memory (the creator also unlinks it)."""
+        if self._shm is None:
+            return
+        # views handed out earlier keep the mapping alive until they are gone
+        self._header = self._data = self._time = None
+        try:
+            self._shm.close()
+        except BufferError:
+            pass
+        if self._owner:
+            self._shm.unlink()
+        self._shm = None
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes + self._time.nbytes
+
+    def append(self, values: Iterable[float], timestamp: float) -> None:
+        """Append one sample (one value per series). O(1)."""
+        header = self._header
+        if header is not None:
+            header[0] += 1
+        i = self._head
+        j = i + self.capacity
+        self._data[:, i] = values
+        self._data[:, j] = self._data[:, i]
+        self._time[i] = self._time[j] = timestamp
+        self._head = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        self.count += 1
+        if header is not None:
+            header[1:] = (self._head, self.size, self.count)
+            header[0] += 1
+
+    def _window(self, n: Optional[int]) -> slice:
+        if n is None:
+            n = self.size
+        n = min(n, self.capacity)
+        end = self._head + self.capacity
+        return slice(end - n, end)
+
+    @staticmethod
+    def _readonly(view: np.ndarray) -> np.ndarray:
+        view.flags.writeable = False
+        return view
+
+    def latest(self, row: int, n: Optional[int] = None) -> np.ndarray:
+        """
+        Zero-copy, read-only view of the last `n` samples of one series
+        (oldest first). `n=None` returns every sample stored so far.
+        """
+        return self._readonly(self._data[row, self._window(n)])
+
+    def window(self, n: Optional[int] = None) -> np.ndarray:
+        """Zero-copy, read-only (n_series x n) view of the last `n` samples."""
+        return self._readonly(self._data[:, self._window(n)])
+
+    def timestamps(self, n: Optional[int] = None) -> np.ndarray:
+        """Zero-copy, read-only view of the timestamps of the last `n` samples."""
+        return self._readonly(self._time[self._window(n)])
+
+    def last(self, row: int) -> float:
+        return self._data[row, self._head + self.capacity - 1]
+
+
+def as_float(value, default: float = np.nan) -> float:
+    """Convert a table value to float (strings / None become `default`)."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    return default
@@ -0,0 +1,179 @@
+import dataclasses
+import math
+import time
+from typing import Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.history.ring import RingHistory
+
+__all__ = ['Rollup', 'RollupTier', 'TieredHistory', 'DEFAULT_TIERS']
+
+# (bucket length [s], number of buckets)
+DEFAULT_TIERS = (
+    (1., 3600),        # 1 hour of 1s buckets
+    (60., 2 * 1440),   # 2 days of 1min buckets
+    (3600., 30 * 24),  # 30 days of 1h buckets
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class Rollup:
+    """Downsampled values of one series, oldest bucket first."""
+    resolution: float
+    start: np.ndarray
+    min: np.ndarray
+    max: np.ndarray
+    mean: np.ndarray
+    last: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+
+class RollupTier:
+    """
+    Fixed-size ring of time buckets keeping min / max / mean / last of every series.
+
+    Samples are folded into the current bucket as they arrive, so the cost
+    per sample is O(n_series) regardless of the bucket length; nothing is
+    ever rescanned. NaN (missing / string values) is ignored.
+    """
+    def __init__(self, n_series: int, resolution: float, capacity: int):
+        self.n_series = n_series
+        self.resolution = resolution
+        self.capacity = capacity
+        shape = (n_series, capacity)
+        self._min = np.full(shape, np.nan)
+        self._max = np.full(shape, np.nan)
+        self._sum = np.zeros(shape)
+        self._count = np.zeros(shape)
+        self._last = np.full(shape, np.nan)
+        self._start = np.full(capacity, np.nan)
+        self._head = -1
+        self._bucket: Optional[int] = None
+        self.size = 0
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self._min, self._max, self._sum, self._count, self._last, self._start))
+
+    def add(self, values: np.ndarray, timestamp: float) -> None:
+        """Fold one sample into the current bucket (or open a new one)."""
+        bucket = int(timestamp // self.resolution)
+        valid = ~np.isnan(values)
+        if self._bucket is None or bucket > self._bucket:
+            # new bucket; a clock that jumps backwards keeps filling the current one
+            i = self._head = (self._head + 1) % self.capacity
+            self._bucket = bucket
+            self._start[i] = bucket * self.resolution
+            self._min[:, i] = values
+            self._max[:, i] = values
+            self._sum[:, i] = 0.
+            self._count[:, i] = 0.
+            self._last[:, i] = values
+            self.size = min(self.size + 1, self.capacity)
+        else:
+            i = self._head
+            np.fmin(self._min[:, i], values, out=self._min[:, i])
+            np.fmax(self._max[:, i], values, out=self._max[:, i])
+            np.copyto(self._last[:, i], values, where=valid)
+        np.add(self._sum[:, i], values, out=self._sum[:, i], where=valid)
+        self._count[:, i] += valid
+
+    def _indices(self, n: int) -> np.ndarray:
+        n = min(n, self.size)
+        return np.arange(self._head - n + 1, self._head + 1) % self.capacity
+
+    def query(self, row: int, n: int, since: Optional[float] = None) -> Rollup:
+        """
+        The last `n` buckets of one series; with `since`, only the buckets
+        that end after it (buckets from before a sleep / recording gap are
+        left out).
+        """
+        idx = self._indices(n)
+        if since is not None:
+            idx = idx[self._start[idx] + self.resolution > since]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = self._sum[row, idx] / self._count[row, idx]
+        return Rollup(
+            resolution=self.resolution,
+            start=self._start[idx],
+            min=self._min[row, idx],
+            max=self._max[row, idx],
+            mean=mean,
+            last=self._last[row, idx])
+
+
+class TieredHistory:
+    """
+    Raw ring buffer plus incrementally maintained rollup tiers.
+
+    Graphs read the raw samples (`latest`, `window`, `timestamps`), long
+    range queries read the coarsest tier that still has enough resolution
+    (e.g. "last 24h" reads ~1440 one-minute buckets instead of 86,400 samples).
+    """
+    def __init__(self,
+                 n_series: int,
+                 capacity: int = 3600,
+                 tiers: Sequence[Tuple[float, int]] = DEFAULT_TIERS,
+                 shared: bool = False):
+        # shared: the raw samples can be mapped by another process (RingHistory.attach)
+        self.raw = RingHistory(n_series, capacity, shared)
+        self.tiers = [RollupTier(n_series, resolution, size) for resolution, size in tiers]
+
+    @property
+    def n_series(self) -> int:
+        return self.raw.n_series
+
+    @property
+    def nbytes(self) -> int:
+        return self.raw.nbytes + sum(t.nbytes for t in self.tiers)
+
+    def append(self, values: Iterable[float], timestamp: float) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        self.raw.append(values, timestamp)
+        for tier in self.tiers:
+            tier.add(values, timestamp)
+
+    # raw samples
+    def latest(self, row: int, n: Optional[int] = None) -> np.ndarray:
+        return self.raw.latest(row, n)
+
+    def window(self, n: Optional[int] = None) -> np.ndarray:
+        return self.raw.window(n)
+
+    def timestamps(self, n: Optional[int] = None) -> np.ndarray:
+        return self.raw.timestamps(n)
+
+    def last(self, row: int) -> float:
+        return self.raw.last(row)
+
+    def close(self) -> None:
+        self.raw.close()
+
+    # rollups
+    def select_tier(self, span: float, max_points: Optional[int] = None) -> RollupTier:
+        """
+        Finest tier that covers `span` seconds (and, if given, fits in `max_points` buckets).
+        Falls back to the coarsest tier.
+        """
+        for tier in self.tiers:
+            n = math.ceil(span / tier.resolution)
+            if n <= tier.capacity and (max_points is None or n <= max_points):
+                return tier
+        return self.tiers[-1]
+
+    def query(self,
+              row: int,
+              span: float,
+              max_points: Optional[int] = None,
+              now: Optional[float] = None) -> Rollup:
+        """
+        min / max / mean / last of one series over the `span` seconds before
+        `now` (default: the current time, same clock as the sample timestamps).
+        """
+        if now is None:
+            now = time.time()
+        tier = self.select_tier(span, max_points)
+        return tier.query(row, math.ceil(span / tier.resolution), since=now - span)
@@ -0,0 +1,195 @@
+import datetime
+import glob
+import json
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils import logger
+
+__all__ = ['SegmentWriter', 'read_segment', 'iter_segments']
+
+MAGIC = b'PYMONSEG'
+VERSION = 1
+# magic, version, header size, number of series, capacity (records), created
+_HEADER = struct.Struct('<8sIII4xQd')
+# number of valid records, updated after every append
+_COUNT_OFFSET = _HEADER.size
+_SCHEMA_OFFSET = _COUNT_OFFSET + 8
+PAGE = 4096
+SUFFIX = '.seg'
+
+
+def _header_size(schema_bytes: bytes) -> int:
+    size = _SCHEMA_OFFSET + 4 + len(schema_bytes)
+    return (size + PAGE - 1) // PAGE * PAGE
+
+
+class _Segment:
+    """One memory-mapped segment file (fixed-width float64 records)."""
+    def __init__(self, path: str, schema_bytes: bytes, n_series: int, capacity: int):
+        self.path = path
+        self.n_series = n_series
+        self.capacity = capacity
+        self.created = time.time()
+        self.header_size = _header_size(schema_bytes)
+        self.record_size = 8 * (1 + n_series)
+
+        self._file = open(path, 'w+b')
+        self._file.truncate(self.header_size + capacity * self.record_size)
+        self._mm = mmap.mmap(self._file.fileno(), self.header_size + capacity * self.record_size)
+        self._mm[:_HEADER.size] = _HEADER.pack(
+            MAGIC, VERSION, self.header_size, n_series, capacity, self.created)
+        self._mm[_SCHEMA_OFFSET:_SCHEMA_OFFSET + 4] = struct.pack('<I', len(schema_bytes))
+        self._mm[_SCHEMA_OFFSET + 4:_SCHEMA_OFFSET + 4 + len(schema_bytes)] = schema_bytes
+
+        self._count = np.ndarray((1,), dtype='<u8', buffer=self._mm, offset=_COUNT_OFFSET)
+        self._count[0] = 0
+        self._records = np.ndarray(
+            (capacity, 1 + n_series), dtype='<f8', buffer=self._mm, offset=self.header_size)
+
+    @property
+    def count(self) -> int:
+        return int(self._count[0])
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.capacity
+
+    def append(self, values: Iterable[float], timestamp: float) -> None:
+        i = self.count
+        record = self._records[i]
+        record[0] = timestamp
+        record[1:] = values
+        # publish the record only after it is complete
+        self._count[0] = i + 1
+
+    def flush(self) -> None:
+        self._mm.flush()
+
+    def close(self) -> None:
+        """Flush, unmap and cut the file down to the records actually written."""
+        count = self.count
+        del self._count, self._records
+        self._mm.flush()
+        self._mm.close()
+        self._file.truncate(self.header_size + count * self.record_size)
+        self._file.close()
+
+
+class SegmentWriter:
+    """
+    Append-only recorder of table samples into memory-mapped segment files.
+
+    Each segment holds a small header (with the table schema as JSON) and
+    fixed-width float64 records `(timestamp, value_0, ..., value_n)`.
+    `append` is a plain memory copy; `msync` and closing of finished
+    segments happen on a background thread so the UI never waits for disk.
+    A new segment is started when the current one is full (`max_bytes`)
+    or older than `max_age` seconds.
+
+    Disk usage is predictable: 8 * (1 + n_series) bytes per sample.
+    """
+    def __init__(self,
+                 directory: str,
+                 schema: List[Dict[str, Any]],
+                 max_bytes: int = 64 * 1024 * 1024,
+                 max_age: float = 24 * 3600.,
+                 flush_interval: float = 10.):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.schema = schema
+        self.n_series = len(schema)
+        self.max_age = max_age
+        self.flush_interval = flush_interval
+
+        self._schema_bytes = json.dumps(schema, ensure_ascii=False).encode('utf-8')
+        record_size = 8 * (1 + self.n_series)
+        self.capacity = max(1, (max_bytes - _header_size(self._schema_bytes)) // record_size)
+
+        self._segment: Optional[_Segment] = None
+        self._lock = threading.Lock()
+        self._closing: 'queue.Queue[Optional[_Segment]]' = queue.Queue()
+        self._flusher = threading.Thread(target=self._flush_loop, name='segment flusher', daemon=True)
+        self._flusher.start()
+
+    def _new_segment(self) -> _Segment:
+        name = datetime.datetime.now().strftime('%Y%m%d_%H%M%S_%f') + SUFFIX
+        path = os.path.join(self.directory, name)
+        logger.debug(f'Recording: new segment {path}')
+        return _Segment(path, self._schema_bytes, self.n_series, self.capacity)
+
+    def _rotate(self) -> None:
+        if self._segment is not None:
+            self._closing.put(self._segment)
+        self._segment = self._new_segment()
+
+    def append(self, values: Iterable[float], timestamp: float) -> None:
+        """Append one sample. Never blocks on disk I/O."""
+        with self._lock:
+            segment = self._segment
+            if (segment is None or segment.full
+                    or time.time() - segment.created >= self.max_age):
+                self._rotate()
+            self._segment.append(values, timestamp)
+
+    def _flush_loop(self) -> None:
+        while True:
+            try:
+                finished = self._closing.get(timeout=self.flush_interval)
+            except queue.Empty:
+                # segments are only closed on this thread, so flushing
+                # outside the lock is safe and never stalls `append`.
+                with self._lock:
+                    segment = self._segment
+                if segment is not None:
+                    segment.flush()
+                continue
+            if finished is None:
+                return
+            finished.close()
+
+    def close(self) -> None:
+        """Close the current segment and wait for pending segments to be written."""
+        with self._lock:
+            if self._segment is not None:
+                self._closing.put(self._segment)
+                self._segment = None
+        self._closing.put(None)
+        self._flusher.join()
+
+
+def read_segment(path: str) -> Tuple[List[Dict[str, Any]], np.ndarray, np.ndarray]:
+    """
+    Read a segment file.
+
+    Returns:
+        Tuple: schema, timestamps (n,) and values (n_series x n).
+            The arrays are read-only views of the mapped file.
+    """
+    with open(path, 'rb') as f:
+        head = f.read(_SCHEMA_OFFSET + 4)
+        magic, version, header_size, n_series, capacity, _ = _HEADER.unpack_from(head)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} is not a segment file.')
+        count, = struct.unpack_from('<Q', head, _COUNT_OFFSET)
+        schema_len, = struct.unpack_from('<I', head, _SCHEMA_OFFSET)
+        schema = json.loads(f.read(schema_len).decode('utf-8'))
+    # a segment that was not closed cleanly still has its full preallocated size
+    count = min(count, (os.path.getsize(path) - header_size) // (8 * (1 + n_series)))
+    if count == 0:
+        return schema, np.empty(0), np.empty((n_series, 0))
+    records = np.memmap(path, dtype='<f8', mode='r', offset=header_size, shape=(count, 1 + n_series))
+    return schema, records[:, 0], records[:, 1:].T
+
+
+def iter_segments(directory: str) -> Iterator[Tuple[List[Dict[str, Any]], np.ndarray, np.ndarray]]:
+    """Read every segment in `directory` in chronological order."""
+    for path in sorted(glob.glob(os.path.join(directory, '*' + SUFFIX))):
+        yield read_segment(path)
@@ -0,0 +1,12 @@
+## sysfs.py
+from src.linuxAPI.sysfs import SysFile
+## hwmon.py
+from src.linuxAPI.hwmon import LinuxHardwareMonitor
+## network.py
+from src.linuxAPI.network import Network
+## powerline.py
+from src.linuxAPI.powerline import Battery
+## process.py
+from src.linuxAPI.process import disk_usage
+from src.linuxAPI.process import process_count
+from src.linuxAPI.process import Processes
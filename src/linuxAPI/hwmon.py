@@ -0,0 +1,321 @@
+import glob
+import os
+import re
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from src.linuxAPI.sysfs import SysFile, read_text
+from src.utils import StatusContainer, logger
+from src.utils.rates import RateEngine
+
+__all__ = ['LinuxHardwareMonitor']
+
+# hwmon drivers that report the CPU temperature
+CPU_HWMON = ('coretemp', 'k10temp', 'zenpower', 'cpu_thermal', 'soc_thermal')
+_re_cpu = re.compile(rb'^cpu(\d*) ')
+
+
+class _Group:
+    """
+    Sensors of one type that are read together.
+
+    `read(out)` writes the current values of every sensor into `out`.
+    """
+    def __init__(self, hardware: str, type_: str, format: str):
+        self.hardware = hardware
+        self.type = type_
+        self.format = format
+        self.names: List[str] = []
+        self.identifiers: List[str] = []
+
+    def add(self, name: str, identifier: str) -> None:
+        self.names.append(name)
+        self.identifiers.append(identifier)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def read(self, out: np.ndarray) -> None:
+        raise NotImplementedError
+
+
+class _FileGroup(_Group):
+    """One value per file, scaled (e.g. millidegree -> degree)."""
+    def __init__(self, hardware: str, type_: str, format: str, scale: float):
+        super().__init__(hardware, type_, format)
+        self.scale = scale
+        self.files: List[SysFile] = []
+
+    def add_file(self, f: SysFile, name: str, identifier: str) -> None:
+        self.files.append(f)
+        self.add(name, identifier)
+
+    def read(self, out: np.ndarray) -> None:
+        for i, f in enumerate(self.files):
+            try:
+                out[i] = f.read_int() * self.scale
+            except (OSError, ValueError):
+                out[i] = np.nan
+
+
+class _CpuLoad(_Group):
+    """Total and per-CPU load from /proc/stat deltas."""
+    def __init__(self):
+        super().__init__('CPU', 'Load', '%')
+        self.file = SysFile('/proc/stat', 16384)
+        # jiffies / s of (total, idle) per CPU
+        self._rates = RateEngine()
+        for cpu in self._cpus(self.file.read()):
+            if cpu == b'':
+                self.add('CPU Total', '/linux/cpu/load/0')
+            else:
+                self.add(f'CPU Core #{int(cpu) + 1}', f'/linux/cpu/load/{int(cpu) + 1}')
+
+    @staticmethod
+    def _cpus(data: bytes) -> List[bytes]:
+        return [m.group(1) for m in map(_re_cpu.match, data.split(b'\n')) if m]
+
+    def read(self, out: np.ndarray) -> None:
+        rows = [line.split()[1:9] for line in self.file.read().split(b'\n') if line.startswith(b'cpu')]
+        ticks = np.array(rows).astype(np.uint64)
+        # total, idle + iowait
+        rates = self._rates.update(np.stack([ticks.sum(axis=1), ticks[:, 3] + ticks[:, 4]], axis=1))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            load = 100. * (1. - rates[:, 1] / rates[:, 0])
+        out[:] = np.nan_to_num(np.clip(load, 0., 100.), nan=0.)
+
+
+class _CpuClock(_FileGroup):
+    """Per-CPU clock from cpufreq (kHz); the first row is the average."""
+    def __init__(self):
+        super().__init__('CPU', 'Clock', 'MHz', 1e-3)
+        # OHM shows the bus speed in the first row
+        self.add('CPU Average', '/linux/cpu/clock/0')
+
+    def read(self, out: np.ndarray) -> None:
+        super().read(out[1:])
+        out[0] = np.nanmean(out[1:])
+
+
+class _RaplPower(_FileGroup):
+    """Package / core / dram power from RAPL energy counters (µJ, wraps at max_energy_range_uj)."""
+    def __init__(self):
+        super().__init__('CPU', 'Power', 'W', 1.)
+        self.ranges: List[int] = []
+        self._rates: Optional[RateEngine] = None
+
+    def add_zone(self, zone: str, index: int) -> None:
+        f = SysFile.open(os.path.join(zone, 'energy_uj'))
+        if f is None:
+            # not readable without root on recent kernels
+            return
+        name = read_text(os.path.join(zone, 'name'), os.path.basename(zone))
+        if name.startswith('package'):
+            name = 'CPU Package' if name == 'package-0' else f'CPU {name}'
+        else:
+            name = f'CPU {name.capitalize()}'
+        self.ranges.append(int(read_text(os.path.join(zone, 'max_energy_range_uj'), '0') or 0))
+        self.add_file(f, name, f'/linux/cpu/power/{index}')
+
+    def read(self, out: np.ndarray) -> None:
+        if self._rates is None:
+            # µJ / s -> W
+            self._rates = RateEngine(modulus=np.array(self.ranges, dtype=np.uint64), scale=1e-6)
+        energy = np.array([f.read_int() for f in self.files], dtype=np.uint64)
+        out[:] = np.nan_to_num(self._rates.update(energy), nan=0.)
+
+
+class _Memory(_Group):
+    """Memory load and used / available GB from /proc/meminfo."""
+    def __init__(self, type_: str, format: str):
+        super().__init__('RAM', type_, format)
+        self.file = SysFile('/proc/meminfo')
+
+    def meminfo(self) -> Tuple[int, int]:
+        total = available = 0
+        for line in self.file.read().split(b'\n'):
+            if line.startswith(b'MemTotal:'):
+                total = int(line.split()[1])
+            elif line.startswith(b'MemAvailable:'):
+                available = int(line.split()[1])
+                break
+        return total, available
+
+
+class _MemoryLoad(_Memory):
+    def __init__(self):
+        super().__init__('Load', '%')
+        self.add('Memory', '/linux/ram/load/0')
+
+    def read(self, out: np.ndarray) -> None:
+        total, available = self.meminfo()
+        out[0] = 100. * (total - available) / total if total else np.nan
+
+
+class _MemoryData(_Memory):
+    def __init__(self):
+        super().__init__('Data', 'GB')
+        self.add('Used Memory', '/linux/ram/data/0')
+        self.add('Available Memory', '/linux/ram/data/1')
+
+    def read(self, out: np.ndarray) -> None:
+        total, available = self.meminfo()
+        out[0] = (total - available) / 1024 ** 2
+        out[1] = available / 1024 ** 2
+
+
+class _Constant(_Group):
+    """
+    Placeholder when the machine does not expose a sensor type the table
+    needs: always NaN (no value), so it is not shown / recorded as 0.
+    """
+    def __init__(self, hardware: str, type_: str, format: str, name: str, identifier: str):
+        super().__init__(hardware, type_, format)
+        self.add(name, identifier)
+
+    def read(self, out: np.ndarray) -> None:
+        out[:] = np.nan
+
+
+def _hwmon_groups() -> List[_Group]:
+    temps = _FileGroup('CPU', 'Temperature', '°C', 1e-3)
+    fans = _FileGroup('SuperIO', 'Fan', 'RPM', 1.)
+    board_temps = _FileGroup('SuperIO', 'Temperature', '°C', 1e-3)
+    for hwmon in sorted(glob.glob('/sys/class/hwmon/hwmon*')):
+        driver = read_text(os.path.join(hwmon, 'name'))
+        is_cpu = driver in CPU_HWMON
+        for path in sorted(glob.glob(os.path.join(hwmon, 'temp*_input')),
+                           key=lambda p: int(re.findall(r'temp(\d+)_input', p)[0])):
+            f = SysFile.open(path)
+            if f is None:
+                continue
+            label = read_text(path.replace('_input', '_label'), os.path.basename(path)[:-6])
+            group = temps if is_cpu else board_temps
+            group.add_file(f, label if is_cpu else f'{driver} {label}',
+                           f'/linux/{os.path.basename(hwmon)}/temperature/{len(group)}')
+        for path in sorted(glob.glob(os.path.join(hwmon, 'fan*_input'))):
+            f = SysFile.open(path)
+            if f is None:
+                continue
+            label = read_text(path.replace('_input', '_label'), os.path.basename(path)[:-6])
+            fans.add_file(f, f'{driver} {label}', f'/linux/{os.path.basename(hwmon)}/fan/{len(fans)}')
+    if len(temps) == 0:
+        temps = _Constant('CPU', 'Temperature', '°C', 'CPU Package', '/linux/cpu/temperature/0')
+        logger.debug('hwmon: no CPU temperature sensor found.')
+    return [temps, fans, board_temps]
+
+
+def _cpufreq_group() -> _Group:
+    paths = glob.glob('/sys/devices/system/cpu/cpu[0-9]*/cpufreq/scaling_cur_freq')
+    paths.sort(key=lambda p: int(re.findall(r'cpu(\d+)', p)[0]))
+    files = [(p, SysFile.open(p)) for p in paths]
+    files = [(p, f) for p, f in files if f is not None]
+    if not files:
+        logger.debug('cpufreq: not available.')
+        return _Constant('CPU', 'Clock', 'MHz', 'CPU Clock', '/linux/cpu/clock/0')
+
+    clock = _CpuClock()
+    for p, f in files:
+        cpu = int(re.findall(r'cpu(\d+)', p)[0])
+        clock.add_file(f, f'CPU Core #{cpu + 1}', f'/linux/cpu/clock/{cpu + 1}')
+    return clock
+
+
+def _rapl_group() -> _Group:
+    power = _RaplPower()
+    index = 0
+    for zone in sorted(glob.glob('/sys/class/powercap/intel-rapl:[0-9]*')):
+        if os.path.basename(zone).count(':') == 1:
+            power.add_zone(zone, index)
+            index += 1
+            for sub in sorted(glob.glob(zone + ':[0-9]*')):
+                power.add_zone(sub, index)
+                index += 1
+    if len(power) == 0:
+        logger.debug('RAPL: not available.')
+        return _Constant('CPU', 'Power', 'W', 'CPU Package', '/linux/cpu/power/0')
+    return power
+
+
+class LinuxHardwareMonitor:
+    """
+    OpenHardwareMonitor replacement for Linux.
+
+    Builds the same StatusContainer layout (CPU.Temperature / Load / Clock /
+    Power, RAM.Load / Data, SuperIO.Fan / Temperature) once from hwmon,
+    /proc/stat, cpufreq, RAPL and /proc/meminfo. Every file is kept open and
+    re-read with `pread`; each tick only refreshes the values in place.
+    """
+    def __init__(self):
+        temps, fans, board_temps = _hwmon_groups()
+        self._groups: List[_Group] = [
+            temps, _CpuLoad(), _cpufreq_group(), _rapl_group(),
+            _MemoryLoad(), _MemoryData(), fans, board_temps]
+        self._groups = [g for g in self._groups if len(g) > 0]
+        self._build()
+
+    def _build(self) -> None:
+        self._container = StatusContainer()
+        self._cells: List[StatusContainer] = []
+        self._slices: List[slice] = []
+        hardwares = {}
+        start = 0
+        for group in self._groups:
+            if group.hardware not in hardwares:
+                hardware = StatusContainer()
+                hardware.register('name', group.hardware)
+                hardwares[group.hardware] = (hardware, [])
+            hardware, types = hardwares[group.hardware]
+            sensors = []
+            for i, (name, identifier) in enumerate(zip(group.names, group.identifiers)):
+                sensor = StatusContainer()
+                sensor.register('container', dict(
+                    index=i,
+                    name=name,
+                    type=group.type,
+                    identifier=identifier,
+                    value=None,
+                    min=None,
+                    max=None,
+                    format=group.format))
+                sensors.append(sensor)
+                self._cells.append(sensor.container)
+            types.append((group.type, sensors))
+            self._slices.append(slice(start, start + len(group)))
+            start += len(group)
+        for key, (hardware, types) in hardwares.items():
+            hardware.register('size', len(types))
+            for type_, sensors in types:
+                hardware.register(type_, sensors)
+            self._container.register(key, hardware)
+        self.values = np.full(start, np.nan)
+        self._min = np.full(start, np.nan)
+        self._max = np.full(start, np.nan)
+        logger.debug(f'LinuxHardwareMonitor: {start} sensors.')
+
+    def __call__(self) -> StatusContainer:
+        values = self.values
+        for group, sl in zip(self._groups, self._slices):
+            group.read(values[sl])
+        np.fmin(self._min, values, out=self._min)
+        np.fmax(self._max, values, out=self._max)
+        for cell, value in zip(self._cells, values.tolist()):
+            cell.set('value', value)
+        return self._container
+
+    def read_fast(self, out: np.ndarray) -> None:
+        """CPU load then CPU power (see `Providers.fast`)."""
+        start = 0
+        for group, sl in zip(self._groups, self._slices):
+            if group.hardware == 'CPU' and group.type in ('Load', 'Power'):
+                group.read(self.values[sl])
+                out[start:start + len(group)] = self.values[sl]
+                start += len(group)
+
+    def full_status(self) -> StatusContainer:
+        status = self()
+        for cell, mi, ma in zip(self._cells, self._min.tolist(), self._max.tolist()):
+            cell.set('min', mi)
+            cell.set('max', ma)
+        return status
@@ -0,0 +1,101 @@
+import os
+import socket
+import threading
+from typing import Any, Callable, List, Optional, Tuple
+
+import numpy as np
+
+from src.linuxAPI.sysfs import SysFile, read_text
+from src.utils import logger
+from src.utils.traffic import Adapter, AdapterTraffic
+from src.watchers import Source
+
+__all__ = ['Network', 'NetlinkSource']
+
+SYS_CLASS_NET = '/sys/class/net'
+# /proc/net/dev: name + 8 receive + 8 transmit fields
+FIELDS = 17
+RX_BYTES, TX_BYTES = 1, 9
+# rtnetlink multicast groups: links, IPv4 / IPv6 addresses
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV6_IFADDR = 0x100
+
+
+class NetlinkSource(Source):
+    """
+    `read()` pushed on rtnetlink link / address messages.
+
+    Without netlink (e.g. some containers) nothing is pushed and the
+    watcher interval applies.
+    """
+    push = True
+
+    def __init__(self, read: Callable[[], Any]):
+        self._read = read
+        self._socket: Optional[socket.socket] = None
+        self._closed = False
+
+    def read(self) -> Any:
+        return self._read()
+
+    def subscribe(self, notify: Callable[[], None]) -> None:
+        try:
+            self._socket = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+            self._socket.bind((0, RTMGRP_LINK | RTMGRP_IPV4_IFADDR | RTMGRP_IPV6_IFADDR))
+            # so that `close` is noticed
+            self._socket.settimeout(1.)
+        except (AttributeError, OSError) as e:
+            logger.debug(f'netlink: not available ({e}).')
+            return
+        threading.Thread(target=self._wait, args=(notify,),
+                         name='netlink', daemon=True).start()
+
+    def _wait(self, notify: Callable[[], None]) -> None:
+        while not self._closed:
+            try:
+                self._socket.recv(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            notify()
+
+    def close(self) -> None:
+        self._closed = True
+        if self._socket is not None:
+            self._socket.close()
+
+
+class Network(AdapterTraffic):
+    """
+    Sent / received KB/s per interface from /proc/net/dev (one read per tick).
+
+    Same return values as `src.systemAPI.Network`. Physical interfaces are
+    the ones backed by a device (`/sys/class/net/<name>/device`).
+    """
+    def __init__(self):
+        self._file = SysFile('/proc/net/dev')
+        super().__init__()
+
+    def _read(self) -> Tuple[np.ndarray, np.ndarray]:
+        # skip the two header lines; "eth0: 1 2 ..." / "eth0:1 2 ..." -> tokens
+        body = self._file.read().split(b'\n', 2)[2]
+        table = np.array(body.replace(b':', b' ').split()).reshape(-1, FIELDS)
+        names = table[:, 0]
+        keep = names != b'lo'
+        return names[keep], table[keep][:, [TX_BYTES, RX_BYTES]].astype(np.uint64)
+
+    def _discover(self) -> List[Adapter]:
+        names, counters = self._read()
+        adapters = []
+        for name, (sent, received) in zip(names.tolist(), counters.tolist()):
+            iface = name.decode()
+            state = read_text(os.path.join(SYS_CLASS_NET, iface, 'operstate'), 'unknown')
+            if state in ('up', 'unknown') and sent + received > 0:
+                physical = os.path.exists(os.path.join(SYS_CLASS_NET, iface, 'device'))
+                adapters.append(Adapter(name, iface, physical))
+        return adapters
+
+    def _discovery_source(self) -> Source:
+        return NetlinkSource(self._discover)
@@ -0,0 +1,58 @@
+import glob
+import os
+from typing import Optional
+
+from src.linuxAPI.sysfs import SysFile, read_text
+from src.utils import StatusContainer
+
+__all__ = ['Battery']
+
+
+class Battery:
+    """
+    Battery status from /sys/class/power_supply.
+
+    Returns the same fields as `src.systemAPI.get_battery_status`.
+    """
+    def __init__(self):
+        self._capacity: Optional[SysFile] = None
+        self._status: Optional[SysFile] = None
+        self._online: Optional[SysFile] = None
+        for supply in sorted(glob.glob('/sys/class/power_supply/*')):
+            kind = read_text(os.path.join(supply, 'type'))
+            if kind == 'Battery' and self._capacity is None:
+                self._capacity = SysFile.open(os.path.join(supply, 'capacity'))
+                self._status = SysFile.open(os.path.join(supply, 'status'))
+            elif kind == 'Mains' and self._online is None:
+                self._online = SysFile.open(os.path.join(supply, 'online'))
+
+    @property
+    def available(self) -> bool:
+        return self._capacity is not None
+
+    def __call__(self) -> StatusContainer:
+        status = StatusContainer()
+        if self._online is None:
+            status.register('PowerLineStatus', 'Unknown')
+        else:
+            status.register('PowerLineStatus', 'Online' if self._online.read_int() else 'Offline')
+        if self._capacity is None:
+            status.register('BatteryLife', 0)
+            status.register('BatteryChargeStatus', 'NoSystemBattery')
+            return status
+        life = self._capacity.read_int()
+        status.register('BatteryLife', life)
+        # same thresholds as Windows (High > 66%, Low < 33%, Critical < 5%)
+        if life > 66:
+            level = 'High'
+        elif life < 5:
+            level = 'Critical'
+        elif life < 33:
+            level = 'Low'
+        else:
+            level = None
+        charging = self._status is not None and self._status.read_str() == 'Charging'
+        if charging:
+            level = 'Charging' if level is None else f'Charging({level})'
+        status.register('BatteryChargeStatus', level or 'Uncharged')
+        return status
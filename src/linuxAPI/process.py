@@ -0,0 +1,73 @@
+import os
+from typing import Callable, Tuple
+
+import numpy as np
+
+from src.utils.processes import ProcessTable
+
+__all__ = ['disk_usage', 'process_count', 'Processes']
+
+# /proc/<pid>/stat fields after "(comm) " (state is field 3)
+STAT_UTIME, STAT_STIME, STAT_STARTTIME, STAT_RSS = 11, 12, 19, 21
+
+
+def disk_usage(path: str = '/') -> float:
+    """Get disk usage of the file system containing `path`.
+
+    Returns:
+        float: Disk usage (%).
+    """
+    st = os.statvfs(path)
+    total = st.f_blocks * st.f_frsize
+    used = (st.f_blocks - st.f_bfree) * st.f_frsize
+    return round(100 * used / total, 1)
+
+
+def process_count() -> int:
+    """Get the number of running processes (numeric entries of /proc).
+
+    Returns:
+        int: Number of processes.
+    """
+    with os.scandir('/proc') as it:
+        return sum(1 for entry in it if entry.name.isdigit())
+
+
+class Processes(ProcessTable):
+    """
+    Processes from /proc/<pid>/stat (CPU time in clock ticks, RSS).
+    """
+    def __init__(self):
+        # ticks / s -> % of all CPUs
+        super().__init__(100. / (os.sysconf('SC_CLK_TCK') * (os.cpu_count() or 1)))
+        self._page = os.sysconf('SC_PAGE_SIZE')
+
+    def _read(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Callable[[int], str]]:
+        pids, starts, times, rss, names = [], [], [], [], []
+        with os.scandir('/proc') as it:
+            for entry in it:
+                if not entry.name.isdigit():
+                    continue
+                try:
+                    fd = os.open(f'/proc/{entry.name}/stat', os.O_RDONLY)
+                    try:
+                        data = os.read(fd, 1024)
+                    finally:
+                        os.close(fd)
+                except OSError:
+                    # exited meanwhile
+                    continue
+                # "pid (comm) state ppid ...": comm may contain spaces / parentheses
+                head, _, tail = data.rpartition(b') ')
+                fields = tail.split()
+                pids.append(int(entry.name))
+                # starttime (field 22), utime + stime (fields 14, 15), rss (field 24)
+                starts.append(int(fields[STAT_STARTTIME]))
+                times.append(int(fields[STAT_UTIME]) + int(fields[STAT_STIME]))
+                rss.append(int(fields[STAT_RSS]))
+                names.append(head.partition(b'(')[2])
+        return (np.array(pids, dtype=np.int64),
+                np.array(starts, dtype=np.uint64),
+                np.array(times, dtype=np.uint64),
+                np.array(rss, dtype=np.float64) * self._page,
+                lambda i: names[i].decode('utf-8', 'replace'))
@@ -0,0 +1,61 @@
+import os
+from typing import Optional
+
+__all__ = ['SysFile', 'read_text']
+
+
+class SysFile:
+    """
+    A /proc or /sys file that is opened once and re-read with `pread`.
+
+    Re-reading at offset 0 makes the kernel regenerate the content, so no
+    open/close (and no Python file object) is needed per tick.
+    """
+    __slots__ = ['path', '_fd', '_bufsize']
+
+    def __init__(self, path: str, bufsize: int = 4096):
+        self.path = path
+        self._fd = -1
+        self._fd = os.open(path, os.O_RDONLY)
+        self._bufsize = bufsize
+
+    @staticmethod
+    def open(path: str, bufsize: int = 4096) -> Optional['SysFile']:
+        """Open `path`, or return None if it does not exist / is not readable."""
+        try:
+            f = SysFile(path, bufsize)
+            f.read()
+        except OSError:
+            return None
+        return f
+
+    def read(self) -> bytes:
+        data = os.pread(self._fd, self._bufsize, 0)
+        while len(data) >= self._bufsize:
+            # the file grew (e.g. /proc/stat on a large machine)
+            self._bufsize *= 2
+            data = os.pread(self._fd, self._bufsize, 0)
+        return data
+
+    def read_int(self) -> int:
+        return int(self.read())
+
+    def read_str(self) -> str:
+        return self.read().decode('utf-8', 'replace').strip()
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def __del__(self):
+        self.close()
+
+
+def read_text(path: str, default: str = '') -> str:
+    """Read a small file once (names / labels found at discovery)."""
+    try:
+        with open(path, 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return default
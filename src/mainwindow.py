@@ -0,0 +1,635 @@
+"""Main window (Tk). Only imported when the GUI is started, see pytaskmgr.start."""
+import argparse
+import datetime
+import json
+import os
+import traceback
+from functools import partial, partialmethod
+from typing import Union, Optional, Tuple
+
+import numpy as np
+import tkinter as tk
+import tkinter.ttk as ttk
+
+from src import *
+from src.collector import Collector
+from src.debug_panel import DebugPanel
+from src.graph_process import GraphProcess
+from src.mpl_graph import GraphRenderer, create_graph
+from src.utils.style import StyleWatch
+from src.utils.treeview import TreeviewBatch
+
+__all__ = ['MainWindow', 'run_window']
+
+TASKMGR_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ICON = os.path.join(TASKMGR_PATH, 'app.ico')
+
+# the title shows the data as stale after this many cycles without a new sample
+STALE_CYCLES = 3
+
+
+class MainWindow(ttk.Frame):
+    def __init__(self,
+                 master: tk.Tk,
+                 width: int,
+                 height: int,
+                 providers: Providers,
+                 gpu3d: bool = False,
+                 theme: str = 'system',
+                 history_size: int = 3600,
+                 record: Optional[str] = None,
+                 record_rotate: float = 24.,
+                 fast_rate: float = 0.,
+                 graph_process: bool = False,
+                 top_processes: int = 0,
+                 top_by: str = 'cpu') -> None:
+        super().__init__(master)
+        
+        self.master = master
+        self.master.call('tk', 'scaling', 1.0)
+        self.providers = providers
+        self.defwidth, self.defheight = width, height
+        self.height = height
+        self.width = width
+        self.gpu3d = gpu3d
+        self.theme = theme
+        self.history_size = history_size
+        self.record = record
+        self.record_rotate = record_rotate
+        self.fast_rate = fast_rate
+        self.use_graph_process = graph_process
+        self.top_processes = top_processes
+        self.top_by = top_by
+        if gpu3d:
+            logger.debug('gpu3d is now enabled. Cycles will be slow.')
+        self.pack()
+                
+        # init cpu usage
+        #self.show_hint_message()
+        # initialize
+        self._initialize_variables()
+        # move to default place
+        self.move_u()
+
+        # set icon
+        if os.path.exists(ICON):
+            self.master.iconbitmap(ICON)
+
+        # app settings
+        self.master.title(PYTASKMGR)
+        self.master.attributes("-topmost", self.showtop)
+        self.master.protocol("WM_DELETE_WINDOW", self.app_exit)
+        self.master.bind(ctrl.q, self.app_exit)
+        self.master.bind(ctrl.p, self.switch_topmost)
+        self.master.bind(ctrl.s, self.dump_current_status)
+        self.master.bind(ctrl.h, self.show_hint_message)
+        self.master.bind(ctrl.k, self.move_u)
+        self.master.bind(ctrl.m, self.move_d)
+        self.master.bind(ctrl.j, self.move_l)
+        self.master.bind(ctrl.l, self.move_r)
+        self.master.bind(ctrl.r, self.switch_window_transparency)
+        self.master.bind(ctrl.b, self.switch_cycle)
+        self.master.bind(ctrl.t, self.switch_title)
+        self.master.bind(ctrl.d, self.switch_debug_panel)
+        self.master.resizable(width=False, height=False)
+
+        # テーブル作成
+        self.make_table()
+
+        # providers are read on the sampler thread from here on
+        if self.fast_rate > 0:
+            self.collector.start_block(self.fast_rate, self.sampler.lock)
+        self.sampler.start()
+
+        # 更新用の関数
+        self.update()
+
+    def _initialize_variables(self):
+        """Initialize variables."""
+        # per-stage timers (Ctrl+D / Ctrl+S)
+        self.profiler = Profiler()
+        self.profiler.install_gc()
+
+        # table names / battery
+        self.collector = Collector(self.providers, self.gpu3d, self.profiler,
+                                   top_processes=self.top_processes, top_by=self.top_by)
+        self.use_battery_mode = self.collector.use_battery_mode
+        self.table_names = self.collector.table_names
+        self.cpu_temp_table = self.collector.cpu_temp_table
+        self.cpu_load_table = self.collector.cpu_load_table
+        self.cpu_clock_table = self.collector.cpu_clock_table
+        self.cpu_power_table = self.collector.cpu_power_table
+        self.net_sent_table = self.collector.net_sent_table
+        self.net_recv_table = self.collector.net_recv_table
+        self.process_table = self.collector.process_table
+                
+        # window
+        self.window_width, self.window_height = workingarea()
+
+        # dpi scales
+        if self.master.winfo_pixels('1i') != 96:
+            *self.dpi_factors, self.current_dpi = getDpiFactor(self.master.winfo_id(), 96)
+        else:
+            self.dpi_factors = (1,1)
+            self.current_dpi = 96
+
+        if self.use_battery_mode is not None:
+            if not self.use_battery_mode:
+                self.defheight += 20
+        else:
+            self.defheight -= 60
+
+        self.width, self.height = map(lambda p: int(p[0]*p[1]), zip((self.defwidth, self.defheight), self.dpi_factors))
+
+        # ttk style
+        self.ttk_style = StyleWatch(self.master, min(self.dpi_factors), self.theme)
+
+        # gpus
+        if self.gpu3d:
+            self.height += self._int_factor(20)
+
+        # is bind or not
+        self.h_bind = False
+        self.w_bind = False
+
+        # keep tops
+        self.showtop = False
+
+        # option
+        self.transparent = False
+
+        # update interval
+        self.cycle = 1000 # 1s
+        
+        # table ids
+        self.id_list = []
+        
+        # title 
+        self.show_status_to_title = True
+        self.current_title = PYTASKMGR
+
+        # graph windows are redrawn together, right after the table
+        self.graph_renderer = GraphRenderer()
+
+        # Ctrl+D
+        self.debug_panel = DebugPanel(self.master, self.profiler, self._int_factor(9))
+
+        # working area / dpi / theme are read off the Tk thread; the update
+        # loop only looks at the `changed` flags
+        self.watchers = WatcherThread()
+        self.workarea_watch = self.watchers.add(PollSource(workingarea), name='workingarea')
+        self.dpi_watch = self.watchers.add(
+            PollSource(partial(getDpiFactor, self.master.winfo_id(), 96)), name='dpi')
+        # moving to another monitor: re-read the dpi now
+        self.master.bind('<Configure>', self.on_configure, add='+')
+        if self.theme == 'system':
+            self.theme_watch = self.watchers.add(theme_source(), interval=None, name='theme')
+        else:
+            self.theme_watch = None
+        self.providers.watch(self.watchers)
+        self.watchers.start()
+
+        # sampler (reads all providers off the Tk thread)
+        self.sampler = Sampler(self.collector.collect, self.interval / 1000,
+                               clock=self.providers.clock, on_sample=self.store,
+                               intervals=self.collector.intervals, profiler=self.profiler)
+        self.rendered_seq = 0
+
+    @property
+    def interval(self) -> int:
+        """Update interval in ms (shorter than `cycle` when replaying faster than real time)."""
+        return max(1, int(self.cycle / self.providers.speed))
+
+    def _int_factor(self, value: Union[int, float]) -> int:
+        return int(value * min(self.dpi_factors))
+
+    def on_configure(self, event: tk.Event) -> None:
+        if event.widget is self.master:
+            self.dpi_watch.notify()
+
+    def update_scales(self):
+        if not self.dpi_watch.consume():
+            return
+        *dpi_factors, dpi = self.dpi_watch.value
+        if dpi != self.current_dpi:
+            self.dpi_factors, self.current_dpi = dpi_factors, dpi
+            self.width, self.height = map(lambda p: int(p[0]*p[1]), zip((self.defwidth, self.defheight), self.dpi_factors))
+
+            self.ttk_style.dpi_factor = min(self.dpi_factors)
+            self.ttk_style.rescale()
+            self.ttk_style.apply(force = True)
+            self.master.call('tk', 'scaling', 1.0)
+            self.master.resizable(width=True, height=True)
+            self.master.geometry(f'{self.width}x{self.height}')
+            self.master.resizable(width=False, height=False)
+            
+
+    def make_table(self) -> None:
+        """Create table."""
+        height = 14
+        if self.gpu3d:
+            height += 1
+        self.tree = ttk.Treeview(self.master, height=height, columns=(1,2))
+
+        self.tree.column('#0', width=self.width//2-self._int_factor(20))
+        self.tree.column(1, width=self.width//2-self._int_factor(50))
+        self.tree.column(2, width=self._int_factor(50))
+
+        self.tree.heading('#0', text='Name')
+        self.tree.heading(1, text="Value")
+        self.tree.heading(2, text="Unit")
+
+        # one float64 row per table row, shared by graphs / exporters,
+        # plus 1s / 1min / 1h rollups for long range queries
+        self.history = TieredHistory(len(self.table_names), self.history_size,
+                                     shared=self.use_graph_process)
+        logger.debug(f'History: {self.history_size} samples ({self.history.nbytes / 1024:.0f} KB).')
+        # --fast-rate: min / max of the fast rows, aligned with `history`
+        if self.fast_rate > 0:
+            fast_rows = self.collector.fast_rows
+            self.band_index = {row: i for i, row in enumerate(fast_rows)}
+            self.band_history = RingHistory(2 * len(fast_rows), self.history_size)
+            self._no_band = np.full(2 * len(fast_rows), np.nan)
+        else:
+            self.band_index = {}
+            self.band_history = None
+        # --graph-process: graph windows drawn by a child process from `history.raw`
+        if self.use_graph_process:
+            self.graph_process = GraphProcess(
+                self.history.raw, min(self.dpi_factors), ICON, self.ttk_style)
+        else:
+            self.graph_process = None
+        if self.record is not None:
+            self.recorder = SegmentWriter(
+                self.record,
+                schema=self.collector.schema,
+                max_age=self.record_rotate * 3600)
+            logger.debug(f'Recording to {self.record}.')
+        else:
+            self.recorder = None
+
+        snapshot = self.sampler.sample()
+        self.rendered_seq = snapshot.seq
+        status = snapshot.values
+
+        master_usage_id = ''
+        master_power_id = ''
+        master_clock_id = ''
+        master_temp_id = ''
+        master_sent_id = ''
+        master_recv_id = ''
+        master_process_id = ''
+        
+        self.data_table = {}
+        # value column / row colors, only changed cells are sent to Tcl
+        self.tree_batch = TreeviewBatch(self.tree, column='1')
+        # color function of every row (lookup tables of the current theme)
+        self.row_colors = [resolve_color(name) for name in self.table_names]
+        
+        for index, (name, value) in enumerate(zip(self.table_names, status)):
+            vname = name.tostring()
+            text = adjust_format(value)
+            color = self.row_colors[index](value)
+            
+            insert_kwg = dict(index='end', tags=index, text=vname, values=(text, name.unit))
+            if self.cpu_temp_table.is_children(name):
+                id_ = self.tree.insert(master_temp_id, **insert_kwg)
+            elif self.cpu_load_table.is_children(name):
+                id_ = self.tree.insert(master_usage_id, **insert_kwg)
+            elif self.cpu_clock_table.is_children(name):
+                id_ = self.tree.insert(master_clock_id, **insert_kwg)
+            elif self.cpu_power_table.is_children(name):
+                id_ = self.tree.insert(master_power_id, **insert_kwg)
+            elif self.net_sent_table.is_children(name):
+                id_ = self.tree.insert(master_sent_id, **insert_kwg)
+            elif self.net_recv_table.is_children(name):
+                id_ = self.tree.insert(master_recv_id, **insert_kwg)
+            elif self.process_table.is_children(name):
+                id_ = self.tree.insert(master_process_id, **insert_kwg)
+            else:
+                id_ = self.tree.insert('', **insert_kwg)
+            
+            if vname == CPU_LOAD:
+                master_usage_id = id_
+            elif vname == CPU_POWER:
+                master_power_id = id_
+            elif vname == CPU_CLOCK:
+                master_clock_id = id_
+            elif vname == CPU_TEMP:
+                master_temp_id = id_
+            elif vname == NET_SENT:
+                master_sent_id = id_
+            elif vname == NET_RECV:
+                master_recv_id = id_
+            elif vname == RUN_PID:
+                master_process_id = id_
+
+            if name.tag in ('network', 'process'):
+                ins_value = value if not isinstance(value, str) else 0.0
+            else:
+                ins_value = value
+
+            self.data_table[id_] = dict(
+                name=name,
+                type_ = type(ins_value),
+                row=index,
+                percentage_range = name.unit == '%' or name.unit == '°C')
+            self.id_list.append(id_)
+            self.tree.tag_configure(tagname=index, foreground=color)
+            self.tree_batch.add(id_, index, text, color)
+
+        # right-click menu
+        self.ttk_style.menu.add_command(label='選択中のデータのグラフを表示',
+                                        command=self.create_graph_window,
+                                        state=tk.DISABLED)
+        self.ttk_style.menu.add_command(label='簡易グラフ(軽量)で表示',
+                                        command=partial(self.create_graph_window, backend='tk'),
+                                        state=tk.DISABLED)
+        self.ttk_style.menu.add_command(label='ヘルプ', command=self.show_hint_message)
+        self.ttk_style.menu.add_separator()
+        self.ttk_style.menu.add_command(label='終了', command=self.app_exit)
+        self.ttk_style.menu.configure(font=('Yu Gothic UI', self._int_factor(11)))
+
+        self.tree.bind('<Button-3>', self.clicked)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+    def set_position(self) -> None:
+        """Set position."""
+        pos_w = self.window_width - self.width
+        pos_h = self.window_height - self.height
+        frame_border, border = borders()
+        if not self.w_bind:
+            pos_w -= (frame_border.Width + border.Width)
+        if not self.h_bind:
+            pos_h -= (frame_border.Height + border.Height)
+        logger.debug(f'Geometry: `{self.width}x{self.height}+{pos_w}+{pos_h}`.')
+        self.master.geometry(f'{self.width}x{self.height}+{pos_w}+{pos_h}')
+
+    def check_moveable(self):
+        if self.w_bind and self.h_bind:
+            return
+
+        if not self.workarea_watch.consume():
+            return
+
+        move = False
+        # ウィンドウサイズが変わったとき
+        wsize, hsize = self.workarea_watch.value
+        if not self.w_bind and wsize != self.window_width:
+            self.window_width = wsize
+            move = True
+        if not self.h_bind and hsize != self.window_height:
+            self.window_height = hsize
+            move = True
+        if move:
+            self.set_position()
+
+    def update_title(self, snapshot: Snapshot) -> None:
+        """Show CPU usage / temperature and mark the data as stale if the sampler lags."""
+        if self.show_status_to_title:
+            cpu_usage = snapshot.values[self.table_names.index(self.cpu_load_table.parent)]
+            cpu_temp = snapshot.values[self.table_names.index(self.cpu_temp_table.parent)]
+            title = f'CPU: {cpu_usage:>4.1f}%, Temp: {cpu_temp:>4.1f}°C'
+        else:
+            title = PYTASKMGR
+        age = snapshot.age
+        if age > STALE_CYCLES * self.interval / 1000:
+            title += f' [stale {age:.0f}s]'
+        if title != self.current_title:
+            self.master.title(title)
+            self.current_title = title
+
+    def update(self) -> None:
+        """Update table."""
+        self.profiler.fired('ui.after')
+        with self.profiler.span('ui.update'):
+            self._update()
+        self.debug_panel.refresh()
+        self.master.after(self.interval, self.update)
+        self.profiler.scheduled('ui.after', self.interval)
+
+    def _update(self) -> None:
+        span = self.profiler.span
+        with span('ui.check_moveable'):
+            self.check_moveable()
+        with span('ui.update_scales'):
+            self.update_scales()
+        if self.theme_watch is not None and self.theme_watch.consume():
+            with span('ui.style_apply'):
+                # the value the watcher read: no registry access here
+                self.ttk_style.apply(theme=self.theme_watch.value)
+
+        snapshot = self.sampler.latest
+        self.update_title(snapshot)
+        if snapshot.seq == self.rendered_seq:
+            # no new data
+            return
+        self.rendered_seq = snapshot.seq
+
+        status = snapshot.values
+        with span('ui.tree'):
+            for index, (row_color, value) in enumerate(zip(self.row_colors, status)):
+                self.tree_batch.set(index, adjust_format(value), row_color(value))
+
+                # alert if battery is low or high
+                if self.use_battery_mode and index == 1: # BatteryLife
+                    alert_on_balloontip(value, status[0])
+            # --top-processes: names of the rows under Running Processes
+            for row, label in self.collector.labels:
+                self.tree_batch.set_label(row, label)
+            self.tree_batch.flush()
+
+        with span('ui.graphs'):
+            if self.graph_process is not None:
+                self.graph_process.render(snapshot.seq, self.ttk_style)
+            # sparkline windows are always drawn here
+            self.graph_renderer.render(snapshot.seq)
+
+    def store(self, snapshot: Snapshot) -> None:
+        """
+        Append a snapshot to the history.
+
+        Called on the sampler thread for every snapshot, rendered or not.
+        """
+        with self.profiler.span('sample.store'):
+            sample = self.collector.to_sample(snapshot.values)
+            self.history.append(sample, snapshot.timestamp)
+            if self.band_history is not None:
+                band = self.collector.band
+                self.band_history.append(
+                    self._no_band if band is None else np.concatenate(band), snapshot.timestamp)
+            if self.recorder is not None:
+                self.recorder.append(sample, snapshot.timestamp)
+
+    def band(self, row: int, n: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """min / max behind the last `n` values of `row` (None: not sampled fast)."""
+        i = self.band_index.get(row)
+        if i is None:
+            return None
+        return self.band_history.latest(i, n), self.band_history.latest(i + len(self.band_index), n)
+
+    ###################################################################
+    #                          event handler                          #
+    ###################################################################
+
+    def create_graph_window(self, event: Optional[tk.Event] = None, backend: str = 'mpl') -> None:
+        """
+        Create matplotlib (or Tk sparkline, `backend='tk'`) window.
+        
+        Used: self.tree -> self.ttk_style.menu
+        """
+        show_ids = []
+        for table_id in self.tree.selection():
+            if self.data_table[table_id]['type_'] is not str:
+                show_ids.append(table_id)
+        if show_ids:
+            create_graph(self, show_ids, ICON, backend)
+
+    def clicked(self, event: Optional[tk.Event] = None) -> None:
+        """
+        Clicked event.
+        
+        Used: self.tree
+        """
+        if self.tree.selection():
+            if all(self.data_table[table_id]['type_'] is str for table_id in self.tree.selection()):
+                self.ttk_style.menu.entryconfigure(0, state=tk.DISABLED, label='グラフ化できません')
+                self.ttk_style.menu.entryconfigure(1, state=tk.DISABLED)
+            else:
+                self.ttk_style.menu.entryconfigure(0, state=tk.NORMAL, label='選択中のデータのグラフを表示')
+                self.ttk_style.menu.entryconfigure(1, state=tk.NORMAL)
+        else:
+            self.ttk_style.menu.entryconfigure(0, state=tk.DISABLED, label='グラフが選択されていません')
+            self.ttk_style.menu.entryconfigure(1, state=tk.DISABLED)
+        self.ttk_style.menu.tk_popup(event.x_root, event.y_root)
+
+    def app_exit(self, event: Optional[tk.Event] = None) -> None:
+        """Close app."""
+        logger.debug('App exit.')
+        self.collector.stop_block()
+        self.sampler.stop()
+        self.sampler.join(timeout=self.interval / 1000)
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.graph_process is not None:
+            self.graph_process.close()
+            if not self.sampler.is_alive():
+                self.history.close()
+        self.profiler.uninstall_gc()
+        self.watchers.stop()
+        self.master.destroy()
+
+    def dump_current_status(self, event: Optional[tk.Event] = None) -> None:
+        """Dump current status."""
+        _date = datetime.datetime.now().strftime('%Y_%m_%d')
+        fpath = os.path.join(TASKMGR_PATH, _date+'_dump.json')
+        add_summary = dict(recorded = _date)
+        
+        # the sampler thread owns the providers
+        with self.sampler.lock:
+            status = self.providers.hardware_full().todict()
+            if self.use_battery_mode:
+                add_summary['Battery Status (all)'] = self.providers.battery().tolist()
+        add_summary['Profile'] = self.profiler.summary()
+        add_summary['Schedule'] = self.sampler.scheduler.summary()
+        try:
+            with open(fpath, 'w') as f:
+                summary = dict(**status, **add_summary)
+                json.dump(summary, f, indent=4)
+        except PermissionError:
+            show_message_to_notification('保存に失敗しました。アクセスが拒否されました。')
+        else:
+            show_message_to_notification(f'データファイルを{fpath}に保存しました。')
+
+    def show_hint_message(self, event: Optional[tk.Event] = None):
+        msg = ('コマンド:\n\n'
+            'Ctrl + Q ... アプリ終了\n'
+            'Ctrl + P ... アプリを最前面に固定 or 解除\n'
+            'Ctrl + H ... このヒント画面を表示\n'
+            'Ctrl + S ... ダンプファイルを作成\n'
+            'Ctrl + K ... ウィンドウを上端に移動\n'
+            'Ctrl + M ... ウィンドウを下端に移動\n'
+            'Ctrl + J ... ウィンドウを左端に移動\n'
+            'Ctrl + L ... ウィンドウを右端に移動\n'
+            'Ctrl + R ... ウィンドウを半透明化 or 解除\n'
+            'Ctrl + B ... 情報の更新速度を0.5s間隔に変更 / 1s間隔に戻す\n'
+            'Ctrl + T ... タイトルにCPU使用率/温度を表示 / 非表示\n'
+            'Ctrl + D ... 処理時間(デバッグ情報)を表示 / 非表示\n\n')
+        info(msg)
+
+    def move(self, direction: str, event: Optional[tk.Event] = None) -> None:
+        if direction == 'up':
+            if self.h_bind:
+                return
+            self.window_height = self.height
+            self.h_bind = True
+        elif direction == 'down':
+            if not self.h_bind:
+                return
+            _, self.window_height = workingarea()
+            self.h_bind = False
+        elif direction == 'left':
+            if self.w_bind:
+                return
+            self.window_width = self.width
+            self.w_bind = True
+        elif direction == 'right':
+            if not self.w_bind:
+                return
+            self.window_width, _ = workingarea()
+            self.w_bind = False
+        self.set_position()
+
+    move_u = partialmethod(move, 'up')
+    move_d = partialmethod(move, 'down')
+    move_l = partialmethod(move, 'left')
+    move_r = partialmethod(move, 'right')
+
+    def switch_topmost(self, event: Optional[tk.Event] = None) -> None:
+        self.showtop = not self.showtop
+        logger.debug(f'Topmost: {self.showtop}')
+        self.master.attributes("-topmost", self.showtop)
+
+    def switch_window_transparency(self, event: Optional[tk.Event] = None):
+        if self.transparent:
+            alpha = 1.0
+        else:
+            alpha = 0.5
+        self.transparent = not self.transparent
+        logger.debug(f'Transparent: {self.transparent}')
+        self.master.attributes("-alpha",alpha)
+
+    def switch_cycle(self, event: Optional[tk.Event] = None):
+        if self.cycle == 1000:
+            self.cycle = 500
+        else:
+            self.cycle = 1000
+        self.sampler.interval = self.interval / 1000
+        logger.debug(f'Cycle: {self.cycle/1000:.1f}s')
+
+    def switch_debug_panel(self, event: Optional[tk.Event] = None):
+        self.debug_panel.toggle()
+        logger.debug(f'Debug panel: {self.debug_panel.visible}')
+
+    def switch_title(self, event: Optional[tk.Event] = None):
+        self.show_status_to_title = not self.show_status_to_title
+        self.update_title(self.sampler.latest)
+        logger.debug(f'Show status to title: {self.show_status_to_title}')
+
+
+def run_window(providers: Providers, args: argparse.Namespace) -> None:
+    set_icon(ICON)
+    try:
+        window = tk.Tk()
+        MainWindow(window, 340, 258, providers, gpu3d = args.gpu3d, theme=args.theme,
+                   history_size=args.history, record=args.record,
+                   record_rotate=args.record_rotate, fast_rate=args.fast_rate,
+                   graph_process=args.graph_process, top_processes=args.top_processes,
+                   top_by=args.top_by)
+        window.mainloop()
+    except:
+        msg = traceback.format_exc()
+        show_message_to_notification(msg)
+        logger.error(msg)
+    finally:
+        providers.close()
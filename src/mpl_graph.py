@@ -5,7 +5,7 @@ import os
 import random
 import tkinter as tk
 import tkinter.ttk as ttk
-from typing import List, Optional
+from typing import List, Optional, Tuple, Union
 
 import matplotlib.pyplot as plt
 import numpy as np
@@ -13,26 +13,102 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.collections import PolyCollection
 
 from src.gname import PYTASKMGR
+from src.spark_graph import SparkGraphs
 from src.systemAPI import info, dpi_changed
 from src.utils import logger, ctrl
 
 plt.rcParams['ytick.direction'] = 'in'
 CMAP = plt.get_cmap('gist_rainbow', 100)
 RUNNING_GRAPHS = 0
+# open graph windows / lines per window (raised in the --graph-process renderer)
+MAX_WINDOWS = 10
 MAX_SHOW = 10
+# graph grid: size of one plot (before dpi scaling), rows before switching to more columns
+PLOT_WIDTH, PLOT_HEIGHT = 360, 180
+MAX_ROWS = 4
+# y-limits: headroom around the data, and shrink once the data uses less than this part
+YLIM_PAD = 0.25
+YLIM_SHRINK = 0.5
+
+
+def grid_shape(n: int) -> Tuple[int, int]:
+    """
+    (rows, cols) of `n` plots: 2 or 3 columns when they divide `n` within
+    `MAX_ROWS` rows, otherwise 3 (or 4, for many plots) columns.
+    """
+    if n <= 1:
+        return 1, 1
+    for cols in (2, 3):
+        if n % cols == 0 and n // cols <= MAX_ROWS:
+            return n // cols, cols
+    cols = 3 if math.ceil(n / 3) <= MAX_ROWS else 4
+    return math.ceil(n / cols), cols
+
+
+def ylim_with_hysteresis(current: Tuple[float, float], lo: float, hi: float) -> Optional[Tuple[float, float]]:
+    """
+    New y-limits for data in [lo, hi], or None to keep `current`.
+
+    The limits only move when the data leaves them or fits in less than
+    `YLIM_SHRINK` of them, so ticks / labels are rarely recomputed.
+    """
+    pad = max(1., (hi - lo) * YLIM_PAD)
+    new = (0. if lo < 1 else lo - pad, hi + pad)
+    a, b = current
+    if lo < a or hi > b or (new[1] - new[0]) < YLIM_SHRINK * (b - a):
+        return new
+    return None
 
 
 def create_graph(mainwindow: ttk.Frame,
                  target_ids: List[str],
-                 icon: str) -> Optional['MplGraphs']:
-    if RUNNING_GRAPHS > MAX_SHOW:
+                 icon: str,
+                 backend: str = 'mpl') -> Optional[Union['MplGraphs', SparkGraphs]]:
+    """
+    Open a graph window. `backend='mpl'`: matplotlib (detailed view),
+    `'tk'`: sparklines on a Tk canvas (cheap, always in this process).
+    """
+    graph_process = getattr(mainwindow, 'graph_process', None)
+    if backend == 'tk':
+        return SparkGraphs(mainwindow, target_ids, icon)
+    elif graph_process is not None:
+        # opened (and limited) by the renderer process
+        graph_process.open([(table_id, mainwindow.data_table[table_id]) for table_id in target_ids])
+    elif RUNNING_GRAPHS > MAX_WINDOWS:
         info("表示中のグラフが多すぎます。")
     elif len(target_ids) > MAX_SHOW:
-        info("同時に表示可能なグラフ数は10個までです。")
+        info(f"同時に表示可能なグラフ数は{MAX_SHOW}個までです。")
     else:
         return MplGraphs(mainwindow, target_ids, icon)
 
 
+class GraphRenderer:
+    """
+    Render clock shared by every graph window (MplGraphs / SparkGraphs).
+
+    MainWindow calls `render(version)` right after it shows a new sample
+    (`version` is the snapshot seq); each window redraws at most once per
+    version, in the same pass. Minimized / fully obscured windows are
+    skipped and catch up when they are shown again.
+    """
+    def __init__(self):
+        self.graphs: List['MplGraphs'] = []
+        self.version = 0
+
+    def add(self, graph: 'MplGraphs') -> None:
+        self.graphs.append(graph)
+
+    def remove(self, graph: 'MplGraphs') -> None:
+        if graph in self.graphs:
+            self.graphs.remove(graph)
+
+    def render(self, version: int) -> None:
+        self.version = version
+        for graph in self.graphs:
+            if graph.rendered_version != version and graph.visible:
+                graph.render()
+
+
 def count_running_graphs():
     global RUNNING_GRAPHS
     RUNNING_GRAPHS += 1
@@ -79,31 +155,33 @@ class MplGraphs:
 
         table_length = len(self.target_ids)
         self.lines = [None] * table_length
-        if table_length > 1:
-            for d in [2, 3]:
-                if table_length % d == 0:
-                    self.rows = table_length // d
-                    self.cols = d
-                    break
-            if not hasattr(self, "rows"):
-                self.rows = math.ceil(table_length / 3)
-                self.cols = 3
-            self.title_at = 'axes'
-        else:
-            self.rows = self.cols = 1
-            self.title_at = 'bar'
-        col = self.mainwindow._int_factor(360*self.cols)
-        row = self.mainwindow._int_factor(180*self.rows)
+        self.rows, self.cols = grid_shape(table_length)
+        self.title_at = 'axes' if table_length > 1 else 'bar'
+        # plots shrink so that the window fits in the screen
+        screen_w = getattr(self.mainwindow, 'window_width', self.master.winfo_screenwidth())
+        screen_h = getattr(self.mainwindow, 'window_height', self.master.winfo_screenheight())
+        col = min(self.mainwindow._int_factor(PLOT_WIDTH * self.cols), int(screen_w * 0.9))
+        row = min(self.mainwindow._int_factor(PLOT_HEIGHT * self.rows), int(screen_h * 0.9))
         self.master.geometry(f'{col}x{row}')
 
-        # title(init)
+        # title(init); the single graph shows its value in the title bar
+        self.current_title = PYTASKMGR
         self.master.title(PYTASKMGR)
         
         # destroy
         self.destroy_flag = False
 
+        # sample version last drawn (see GraphRenderer)
+        self.renderer: GraphRenderer = self.mainwindow.graph_renderer
+        self.rendered_version = -1
+        self.obscured = False
+
         self.initialize_graph()
-        self.update_data()
+        canvas = self.graph.get_tk_widget()
+        canvas.bind('<Visibility>', self.on_visibility)
+        canvas.bind('<Map>', self.on_map)
+        self.renderer.add(self)
+        self.render()
 
     def initialize_graph(self):
         # create canvas
@@ -115,6 +193,11 @@ class MplGraphs:
             self.axs = np.array(self.axs, dtype='O').reshape(1,1)
         self.graph = FigureCanvasTkAgg(self.fig, master=self.master)
         self.graph.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1)
+        # figure without the animated artists, captured after every full draw
+        # (first tick, resize, y-limit or theme change); other ticks blit
+        # (axes titles included; a single graph's title bar is set only when it changes)
+        self._background = None
+        self.graph.mpl_connect('draw_event', self._on_draw)
         
         # setting
         table_length = len(self.target_ids)
@@ -122,7 +205,16 @@ class MplGraphs:
         r1, r2 = itertools.tee(range(self.rows*self.cols))
         
         self.key_list = [random.randint(1, 100) for _ in r1]
-        self.polys = [PolyCollection([], facecolors=CMAP(k-1), alpha=0.2) for k in self.key_list]
+        self.polys = [PolyCollection([], facecolors=CMAP(k-1), alpha=0.2, animated=True)
+                      for k in self.key_list]
+        # min - max of the fast samples (--fast-rate)
+        self.bands = [PolyCollection([], facecolors=CMAP(k-1), alpha=0.35, linewidths=0, animated=True)
+                      for k in self.key_list]
+        self.plot_axes = []
+        # vertices of the line / fill / band paths, written in place every tick
+        self.line_xy: List[np.ndarray] = []
+        self.fill_xy: List[np.ndarray] = []
+        self.band_xy: List[np.ndarray] = []
         # default axes settings
         self.theme_color = self.mainwindow.ttk_style.colors
         self.current_mode = self.mainwindow.ttk_style.current_mode
@@ -131,9 +223,14 @@ class MplGraphs:
         for i in r2:
             axes = self.axs[row_count, i % self.cols]
             axes.add_collection(self.polys[i])
+            axes.add_collection(self.bands[i])
+            axes.title.set_animated(True)
+            self.plot_axes.append(axes)
             self.set_color(axes)
             # set xlim
             axes.set_xlim(0, 29)
+            if i < table_length:
+                self._init_plot(i, axes)
             # xaxis -> invisible
             axes.get_xaxis().set_visible(False)
             # unused axes -> hide y axis label
@@ -142,6 +239,30 @@ class MplGraphs:
             if (i+1) % self.cols == 0:
                 row_count += 1
 
+    def _init_plot(self, i: int, axes) -> None:
+        """Create the artists of plot `i` once and keep their vertex arrays."""
+        x = self.x_data
+        n = len(x)
+        line = axes.plot(x, np.zeros(n), '-', color=CMAP(self.key_list[i]), animated=True)[0]
+        # build the path now; afterwards only the y column of its vertices changes
+        line.recache()
+        self.lines[i] = line
+        self.line_xy.append(line.get_xydata())
+
+        # (0, 0), (x, y)..., (x[-1], 0)
+        fill = np.zeros((1, n + 2, 2))
+        fill[0, 1:-1, 0] = x
+        fill[0, -1, 0] = x[-1]
+        self.polys[i].set_verts(fill)
+        self.fill_xy.append(self.polys[i].get_paths()[0].vertices)
+
+        # (x, max)..., (x reversed, min)...
+        band = np.zeros((1, 2 * n, 2))
+        band[0, :n, 0] = x
+        band[0, n:, 0] = x[::-1]
+        self.bands[i].set_verts(band)
+        self.band_xy.append(self.bands[i].get_paths()[0].vertices)
+
     def set_color(self, axes):
         axes.set_facecolor(self.theme_color.background)
         axes.tick_params(axis='both',
@@ -155,51 +276,102 @@ class MplGraphs:
         return dpi_changed(handler=self.master.winfo_id(),
                            current_dpi=self.master.winfo_pixels('1i'))
 
+    def _on_draw(self, event) -> None:
+        """After a full draw: keep the static part and draw the animated artists on it."""
+        self._background = self.graph.copy_from_bbox(self.fig.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self) -> None:
+        for i, line in enumerate(self.lines):
+            axes = self.plot_axes[i]
+            axes.draw_artist(self.polys[i])
+            axes.draw_artist(self.bands[i])
+            axes.draw_artist(line)
+            if self.title_at == 'axes':
+                axes.draw_artist(axes.title)
+
+    def _blit(self) -> None:
+        self.graph.restore_region(self._background)
+        self._draw_animated()
+        self.graph.blit(self.fig.bbox)
+
+    @property
+    def visible(self) -> bool:
+        return not self.obscured and self.master.state() not in ('iconic', 'withdrawn')
+
+    def on_visibility(self, event: tk.Event) -> None:
+        # reported where the window system supports it (X11)
+        self.obscured = event.state == 'VisibilityFullyObscured'
+        self.on_map(event)
+
+    def on_map(self, event: Optional[tk.Event] = None) -> None:
+        """Shown again: catch up with the samples skipped meanwhile."""
+        if self.rendered_version != self.renderer.version and self.visible:
+            self.master.after_idle(self.render)
+
+    def render(self) -> None:
+        if self.destroy_flag or self.rendered_version == self.renderer.version:
+            return
+        self.update_data()
+        self.rendered_version = self.renderer.version
+
     def update_data(self):
+        with self.mainwindow.profiler.span('graph.update'):
+            self._update_data()
+
+    def _update_data(self):
+        full_draw = self._background is None
         bg_changed = self.current_mode != self.mainwindow.ttk_style.current_mode
         if bg_changed:
+            full_draw = True
             self.current_mode = self.mainwindow.ttk_style.current_mode
             self.theme_color = self.mainwindow.ttk_style.colors
             self.fig.set_facecolor(self.theme_color.background)
         tables = self.mainwindow.data_table
+        history = self.mainwindow.history
         row_count = 0
         for i, tid in enumerate(self.target_ids):
             axes = self.axs[row_count, i % self.cols]
             table = tables[tid]
 
-            x = self.x_data
-            y = table['values']
+            n = len(self.x_data)
+            y = history.latest(table['row'], n)
 
-            # update y
-            if self.lines[i] is None:
-                self.lines[i] = axes.plot(
-                    x, y,
-                    '-',
-                    color=CMAP(self.key_list[i]))[0]
-            else:
-                self.lines[i].set_ydata(y)
-            
+            # update y (in place, no new arrays)
+            self.line_xy[i][:, 1] = y
+            self.lines[i].stale = True
             # fill between x and y
-            verts = [[
-                [0, 0],
-                *zip(x, y),
-                [x[-1], 0]]]
-            self.polys[i].set_verts(verts)
+            self.fill_xy[i][1:n + 1, 1] = y
+            self.polys[i].stale = True
+
+            band = self.mainwindow.band(table['row'], n)
+            if band is not None:
+                lo, hi = band
+                band_xy = self.band_xy[i]
+                band_xy[:n, 1] = hi
+                band_xy[n:2 * n, 1] = lo[::-1]
+                # closing vertex
+                band_xy[2 * n, 1] = hi[0]
+                self.bands[i].stale = True
             
             # set y lim
             if table['percentage_range']:
-                r = [0, 100]
+                r = (0, 100) if axes.get_ylim() != (0, 100) else None
             else:
-                _mi, _ma = min(y), max(y)
-                _mi = 0 if _mi < 1 else _mi -1
-                _ma += 1
-                r = [_mi, _ma]
-            axes.set_ylim(r)
+                _mi, _ma = y.min(), y.max()
+                if band is not None:
+                    _mi = np.fmin.reduce(lo, initial=_mi)
+                    _ma = np.fmax.reduce(hi, initial=_ma)
+                r = ylim_with_hysteresis(axes.get_ylim(), float(_mi), float(_ma))
+            if r is not None:
+                # ticks / labels are part of the background
+                axes.set_ylim(r)
+                full_draw = True
             if bg_changed:
                 self.set_color(axes)
             
             # set title
-            cur = table['values'][-1]
+            cur = y[-1]
             if table['type_'] is float:
                 cur = round(cur, 1)
             elif table['type_'] is int:
@@ -210,17 +382,25 @@ class MplGraphs:
             else:
                 if self.showtop:
                     table_title = '*' + table_title
-                self.master.title(table_title)
+                # only when the text changed (a Tk call per tick otherwise)
+                if table_title != self.current_title:
+                    self.master.title(table_title)
+                    self.current_title = table_title
                 break
             
             # next row
             if (i+1) % self.cols == 0:
                 row_count += 1
 
-        self.graph.draw()
-        self.master.after(self.mainwindow.cycle, self.update_data)
+        if full_draw:
+            with self.mainwindow.profiler.span('graph.draw'):
+                self.graph.draw()
+        else:
+            with self.mainwindow.profiler.span('graph.blit'):
+                self._blit()
 
     def app_exit(self, *args, **kwargs):
+        self.renderer.remove(self)
         remove_running_graphs()
         plt.close(self.fig)
         self.master.destroy()
@@ -234,6 +414,7 @@ class MplGraphs:
         if self.title_at == 'axes':
             title = f'*{PYTASKMGR}' if self.showtop else PYTASKMGR
             self.master.title(title)
+            self.current_title = title
 
     def switch_window_transparency(self, *args, **kwargs):
         if self.transparent:
@@ -1,12 +1,14 @@
 import dataclasses
 import enum
 import time
-from typing import Tuple, Union
+from typing import List, Tuple, Union
+
+import numpy as np
 
 from src.systemAPI import error, get_battery_status, question
-from src.utils import StatusContainer, close_container, import_module
+from src.utils import StatusContainer, close_container, import_module, logger
 
-__all__ = ['OpenHardwareMonitor']
+__all__ = ['OpenHardwareMonitor', 'SensorInfo']
 
 
 class HardWareType(enum.IntEnum):
@@ -53,6 +55,17 @@ def sensor_getvaluetoname(value: int) -> Tuple[str, str]:
             return k, sensortype_prefix[v]
 
 
+@dataclasses.dataclass(frozen=True)
+class SensorInfo:
+    """Static description of one sensor, fixed at schema discovery."""
+    hardware: str
+    index: int
+    name: str
+    type: str
+    identifier: str
+    format: str
+
+
 @dataclasses.dataclass
 class OpenHardwareMonitor:
     """
@@ -65,16 +78,32 @@ class OpenHardwareMonitor:
     enable_gpu: bool = True
     
     def __post_init__(self) -> None:
+        self._handle = self._open_computer()
+        self._closed = False
+        self._container = StatusContainer()
+
+        # sensor schema (rebuilt only when the hardware set changes)
+        self._signature = None
+        self._sensors = []
+        self._cells = []
+        self.schema: List[SensorInfo] = []
+        self.values = np.empty(0)
+
+        # CPU hardware and its load / power sensors (`read_fast`)
+        self._cpu = None
+        self._fast_sensors = []
+
+    def _open_computer(self):
+        """Open `OpenHardwareMonitor.Hardware.Computer` (overridden by benchmarks)."""
         Hardware = import_module(
             self.dllpath, "OpenHardwareMonitor", 'Hardware')
 
-        self._handle = Hardware.Computer()
-        self._handle.CPUEnabled = self.enable_cpu
-        self._handle.RAMEnabled = self.enable_ram
-        self._handle.GPUEnabled = self.enable_gpu
-        self._handle.Open()
-        self._closed = False
-        self._container = StatusContainer()
+        computer = Hardware.Computer()
+        computer.CPUEnabled = self.enable_cpu
+        computer.RAMEnabled = self.enable_ram
+        computer.GPUEnabled = self.enable_gpu
+        computer.Open()
+        return computer
 
     def __call__(self):
         return self._curstatus()
@@ -87,14 +116,41 @@ class OpenHardwareMonitor:
             self.close()
 
     def _curstatus(self)-> StatusContainer:
-        if not self._container.isempty:
-            self._container.clear()
-        for sensors in self._handle.Hardware:
-            self._parse_sensors(sensors)
+        hardwares = list(self._handle.Hardware)
+        for hardware in hardwares:
+            hardware.Update()
+        signature = self._hardware_signature(hardwares)
+        if signature != self._signature:
+            self._build_schema(hardwares, signature)
+        self._read_values()
         return self._container
 
+    @staticmethod
+    def _hardware_signature(hardwares) -> Tuple[Tuple[str, int], ...]:
+        return tuple((h.Identifier.ToString(), h.Sensors.Length) for h in hardwares)
+
+    def _build_schema(self, hardwares, signature) -> None:
+        """
+        Discover sensor order, names, units and identifiers once.
+
+        The StatusContainer tree is built here and afterwards only the
+        `value` of each sensor is refreshed in place (see `_read_values`).
+        """
+        self._container = StatusContainer()
+        self._sensors = []
+        self._cells = []
+        self.schema = []
+        self._cpu = None
+        self._fast_sensors = []
+        for hardware in hardwares:
+            self._parse_sensors(hardware)
+        self.values = np.full(len(self._sensors), np.nan)
+        self._signature = signature
+        logger.debug(f'OpenHardwareMonitor: sensor schema rebuilt ({len(self.schema)} sensors).')
+
     def _parse_sensors(self, sensors) -> None:
-        sensors.Update()
+        if sensors.Sensors.Length == 0:
+            return
         sensor_name = sensors.Sensors[0].Hardware.HardwareType
         key = hardware_getvaluetoname(sensor_name)
 
@@ -126,12 +182,53 @@ class OpenHardwareMonitor:
             sensorcontainer.register('container', values)
             register_dicts[sensortype].append(sensorcontainer)
 
+            self._sensors.append(sensor)
+            self._cells.append(sensorcontainer.container)
+            self.schema.append(SensorInfo(
+                hardware=key,
+                index=values['index'],
+                name=values['name'],
+                type=sensortype,
+                identifier=values['identifier'],
+                format=format))
+
+        if key == 'CPU' and self._cpu is None:
+            # the one registered as `CPU` (the others become CPU_1, ...)
+            self._cpu = sensors
+            self._fast_sensors = [s for s in i_sensors if s.SensorType == SensorType.Load] \
+                               + [s for s in i_sensors if s.SensorType == SensorType.Power]
+
         keycontainer.register('size', len(register_dicts))
         for st, values in register_dicts.items():
             keycontainer.register(st, values)
         
         self._container.register(key, keycontainer)
 
+    def _read_values(self) -> None:
+        """Read only `sensor.Value` into the preallocated flat array."""
+        values = self.values
+        for i, (sensor, cell) in enumerate(zip(self._sensors, self._cells)):
+            value = sensor.Value
+            cell.set('value', value)
+            values[i] = np.nan if value is None else value
+
+    def read_fast(self, out: np.ndarray) -> None:
+        """CPU load then CPU power; only the CPU is updated (see `Providers.fast`)."""
+        if self._cpu is None:
+            self._curstatus()
+        self._cpu.Update()
+        for i, sensor in enumerate(self._fast_sensors):
+            value = sensor.Value
+            out[i] = np.nan if value is None else value
+
+    def full_status(self) -> StatusContainer:
+        """Current status with `min` / `max` refreshed as well (slow, for dumps)."""
+        status = self._curstatus()
+        for sensor, cell in zip(self._sensors, self._cells):
+            cell.set('min', sensor.Min)
+            cell.set('max', sensor.Max)
+        return status
+
     def close(self) -> None:
         if self._closed:
             return
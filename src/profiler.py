@@ -0,0 +1,152 @@
+import gc
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+__all__ = ['Profiler', 'SpanStats']
+
+
+class SpanStats:
+    """Rolling window of the last `size` durations (seconds) of one stage."""
+    __slots__ = ['_data', '_head', 'count', 'total']
+
+    def __init__(self, size: int = 512):
+        self._data = np.zeros(size)
+        self._head = 0
+        self.count = 0
+        self.total = 0.
+
+    def add(self, seconds: float) -> None:
+        self._data[self._head] = seconds
+        self._head = (self._head + 1) % len(self._data)
+        self.count += 1
+        self.total += seconds
+
+    @property
+    def window(self) -> np.ndarray:
+        return self._data[:min(self.count, len(self._data))]
+
+    def summary(self) -> Dict[str, float]:
+        """count / last / p50 / p99 / max (ms) of the window."""
+        window = self.window
+        if len(window) == 0:
+            return dict(count=0)
+        p50, p99 = np.percentile(window, [50, 99]) * 1000
+        return dict(
+            count=self.count,
+            last=round(float(self._data[self._head - 1]) * 1000, 3),
+            p50=round(float(p50), 3),
+            p99=round(float(p99), 3),
+            max=round(float(window.max()) * 1000, 3))
+
+
+class _Span:
+    __slots__ = ['_profiler', '_name', '_start']
+
+    def __init__(self, profiler: 'Profiler', name: str):
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self._profiler.record(self._name, time.perf_counter() - self._start)
+
+
+class Profiler:
+    """
+    Cheap per-stage timers for the sampler / UI / graph ticks.
+
+    `with profiler.span('name'):` records the duration of a stage,
+    `scheduled` / `fired` record how late an `after()` callback ran and
+    `install_gc` counts garbage collector pauses. Stages are kept in
+    rolling windows so p50 / p99 reflect the last few hundred ticks.
+    Safe to use from the sampler thread and the Tk thread at once.
+    """
+    def __init__(self, size: int = 512):
+        self.size = size
+        self._stats: Dict[str, SpanStats] = {}
+        self._lock = threading.Lock()
+        self._deadlines: Dict[Any, float] = {}
+        self._gc_start: Optional[float] = None
+        # filled from the gc callback, which may run while `_lock` is held
+        self._gc = SpanStats(size)
+        self.gc_pauses = [0, 0, 0]
+        # event counts (e.g. missed sampling deadlines)
+        self.counters: Dict[str, int] = {}
+        self.started = time.monotonic()
+
+    def span(self, name: str) -> _Span:
+        return _Span(self, name)
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = SpanStats(self.size)
+            stats.add(seconds)
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    # after() lateness
+    def scheduled(self, name: str, delay_ms: int, token: Any = None) -> None:
+        """
+        Call right after `after(delay_ms, ...)`.
+        `token` tells apart several callers sharing one stage (e.g. graph windows).
+        """
+        self._deadlines[name, token] = time.perf_counter() + delay_ms / 1000
+
+    def fired(self, name: str, token: Any = None) -> None:
+        """Call first thing in the scheduled callback; records `<name>.late`."""
+        deadline = self._deadlines.pop((name, token), None)
+        if deadline is not None:
+            self.record(name + '.late', max(0., time.perf_counter() - deadline))
+
+    # garbage collector pauses
+    def _on_gc(self, phase: str, info: Dict[str, Any]) -> None:
+        if phase == 'start':
+            self._gc_start = time.perf_counter()
+        elif self._gc_start is not None:
+            self.gc_pauses[info['generation']] += 1
+            self._gc.add(time.perf_counter() - self._gc_start)
+            self._gc_start = None
+
+    def install_gc(self) -> None:
+        if self._on_gc not in gc.callbacks:
+            gc.callbacks.append(self._on_gc)
+
+    def uninstall_gc(self) -> None:
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+
+    def summary(self) -> Dict[str, Any]:
+        """All stages (ms) plus GC pause counts, JSON serializable."""
+        with self._lock:
+            stages = {name: stats.summary() for name, stats in sorted(self._stats.items())}
+            counters = dict(sorted(self.counters.items()))
+        stages['gc'] = self._gc.summary()
+        return dict(
+            uptime=round(time.monotonic() - self.started, 1),
+            gc_pauses={f'gen{i}': n for i, n in enumerate(self.gc_pauses)},
+            counters=counters,
+            stages=stages)
+
+    def format(self) -> str:
+        """Fixed-width table for the debug panel."""
+        summary = self.summary()
+        lines: List[str] = [f'{"stage":<22}{"p50":>8}{"p99":>8}{"max":>8}  [ms]']
+        for name, s in summary['stages'].items():
+            if s['count'] == 0:
+                continue
+            lines.append(f'{name:<22}{s["p50"]:>8.2f}{s["p99"]:>8.2f}{s["max"]:>8.2f}')
+        for name, n in summary['counters'].items():
+            lines.append(f'{name:<22}{n:>8}')
+        gc_pauses = ' / '.join(str(n) for n in self.gc_pauses)
+        lines.append(f'GC pauses (gen0/1/2): {gc_pauses}')
+        return '\n'.join(lines)
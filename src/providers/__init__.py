@@ -0,0 +1,10 @@
+import sys
+
+from src.providers.base import Providers
+from src.providers.capture import CaptureProviders
+from src.providers.replay import ReplayProviders
+
+if sys.platform == 'win32':
+    from src.providers.windows import WindowsProviders
+else:
+    from src.providers.linux import LinuxProviders
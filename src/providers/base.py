@@ -0,0 +1,94 @@
+import time
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from src.utils.container import StatusContainer
+from src.watchers import WatcherThread
+
+__all__ = ['Providers']
+
+
+class Providers:
+    """
+    Everything MainWindow reads from the system.
+
+    A sampling pass always starts with `hardware()` and then calls the
+    other providers it needs, so implementations may treat `hardware()`
+    as the beginning of a new frame.
+    """
+    # playback speed relative to real time (math.inf: as fast as possible)
+    speed: float = 1.0
+    # False when replaying: the recording decides which providers were read
+    live: bool = True
+
+    def select_battery_or_gpu(self) -> Optional[bool]:
+        """True: battery rows, False: Nvidia GPU rows, None: neither."""
+        raise NotImplementedError
+
+    def recorded(self, call: str) -> bool:
+        """False if `call` has no value in the current frame (replay)."""
+        return True
+
+    def hardware(self) -> StatusContainer:
+        """OpenHardwareMonitor style status (CPU / RAM / GpuNvidia ...)."""
+        raise NotImplementedError
+
+    def hardware_full(self) -> StatusContainer:
+        """
+        Like `hardware`, with min / max refreshed (table schema, dumps).
+        Not the start of a sampling pass.
+        """
+        return self.hardware()
+
+    def fast(self, out: np.ndarray) -> None:
+        """
+        CPU load and power only (`hardware().CPU.Load` then `.Power`, same
+        order), cheap enough to be read 10-20 times per second.
+        """
+        raise NotImplementedError
+
+    def battery(self) -> StatusContainer:
+        """PowerLineStatus, BatteryLife and BatteryChargeStatus."""
+        raise NotImplementedError
+
+    def nvidia_smi_update(self) -> None:
+        pass
+
+    def gpu_load(self) -> float:
+        raise NotImplementedError
+
+    def disk_usage(self) -> float:
+        raise NotImplementedError
+
+    def process_count(self) -> int:
+        raise NotImplementedError
+
+    def processes(self, n: int, by: str = 'cpu') -> Dict[str, Any]:
+        """
+        `count` (as `process_count()`) and `top`: (name, CPU %, working set
+        MB) of the `n` processes using the most CPU / memory (`by`).
+        """
+        raise NotImplementedError
+
+    def watch(self, watchers: WatcherThread) -> None:
+        """Register what should be refreshed off the sampling path (before `watchers.start()`)."""
+        pass
+
+    def network_adapters(self) -> List[str]:
+        """Adapters with their own rows in `network()` (fixed at start)."""
+        return []
+
+    def network(self) -> List[Union[float, str]]:
+        """
+        Sent / received KB/s (or 'Not connected'): total sent, sent of each
+        of `network_adapters()`, total received, received of each.
+        """
+        raise NotImplementedError
+
+    def clock(self) -> float:
+        """Wall-clock time of the current frame."""
+        return time.time()
+
+    def close(self) -> None:
+        pass
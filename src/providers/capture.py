@@ -0,0 +1,111 @@
+import gzip
+import json
+import time
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from src.providers.base import Providers
+from src.utils.container import StatusContainer
+from src.watchers import WatcherThread
+
+__all__ = ['CaptureProviders', 'open_capture']
+
+CAPTURE_VERSION = 1
+
+
+def open_capture(path: str, mode: str):
+    """Open a capture file (gzip compressed if the name ends with `.gz`)."""
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class CaptureProviders(Providers):
+    """
+    Wraps live providers and writes everything they return to a capture file.
+
+    The file is JSON lines: a header, then one frame per sampling pass
+    `{"t": wall time, "calls": {"hardware": [...], "network": [...], ...}}`.
+    Replay it with `ReplayProviders`.
+    """
+    def __init__(self, inner: Providers, path: str):
+        self.inner = inner
+        self.path = path
+        self._file = open_capture(path, 'w')
+        self._frame: Optional[Dict[str, Any]] = None
+        self._header_written = False
+
+    def _write(self, obj: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(obj, ensure_ascii=False) + '\n')
+
+    def _record(self, call: str, value: Any) -> Any:
+        if self._frame is not None:
+            stored = value.todict() if isinstance(value, StatusContainer) else value
+            self._frame['calls'].setdefault(call, []).append(stored)
+        return value
+
+    def _end_frame(self) -> None:
+        if self._frame is not None:
+            self._write(self._frame)
+            self._frame = None
+
+    def _write_header(self, select: Optional[bool]) -> None:
+        if not self._header_written:
+            self._write(dict(version=CAPTURE_VERSION, select_battery_or_gpu=select,
+                             network_adapters=self.inner.network_adapters()))
+            self._header_written = True
+
+    def select_battery_or_gpu(self) -> Optional[bool]:
+        result = self.inner.select_battery_or_gpu()
+        self._write_header(result)
+        return result
+
+    def hardware(self) -> StatusContainer:
+        # a new sampling pass
+        self._write_header(None)
+        self._end_frame()
+        self._frame = dict(t=time.time(), calls={})
+        return self._record('hardware', self.inner.hardware())
+
+    def hardware_full(self) -> StatusContainer:
+        return self.inner.hardware_full()
+
+    def fast(self, out: np.ndarray) -> None:
+        # not recorded: a replay shows the per-pass values
+        self.inner.fast(out)
+
+    def battery(self) -> StatusContainer:
+        return self._record('battery', self.inner.battery())
+
+    def nvidia_smi_update(self) -> None:
+        self.inner.nvidia_smi_update()
+
+    def gpu_load(self) -> float:
+        return self._record('gpu_load', self.inner.gpu_load())
+
+    def disk_usage(self) -> float:
+        return self._record('disk_usage', self.inner.disk_usage())
+
+    def process_count(self) -> int:
+        return self._record('process_count', self.inner.process_count())
+
+    def processes(self, n: int, by: str = 'cpu') -> Dict[str, Any]:
+        return self._record('processes', self.inner.processes(n, by))
+
+    def watch(self, watchers: WatcherThread) -> None:
+        self.inner.watch(watchers)
+
+    def network_adapters(self) -> List[str]:
+        return self.inner.network_adapters()
+
+    def network(self) -> List[Union[float, str]]:
+        return self._record('network', list(self.inner.network()))
+
+    def clock(self) -> float:
+        return self.inner.clock()
+
+    def close(self) -> None:
+        self._end_frame()
+        self._file.close()
+        self.inner.close()
@@ -0,0 +1,61 @@
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from src.linuxAPI import (Battery, LinuxHardwareMonitor, Network, Processes,
+                          disk_usage, process_count)
+from src.providers.base import Providers
+from src.utils import StatusContainer
+from src.watchers import WatcherThread
+
+__all__ = ['LinuxProviders']
+
+
+class LinuxProviders(Providers):
+    """Live providers for Linux (/proc, /sys/class/hwmon, /proc/net/dev, statvfs)."""
+    def __init__(self, disk: str = '/'):
+        self.ohm = LinuxHardwareMonitor()
+        self.disk = disk
+        self._network = Network()
+        self._battery = Battery()
+        self._processes = Processes()
+        # CPU % of the first pass: deltas since now
+        self._processes.update()
+
+    def select_battery_or_gpu(self) -> Optional[bool]:
+        # no Nvidia rows on Linux (nvidia-smi is Windows only here)
+        return True if self._battery.available else None
+
+    def hardware(self) -> StatusContainer:
+        return self.ohm()
+
+    def hardware_full(self) -> StatusContainer:
+        return self.ohm.full_status()
+
+    def fast(self, out: np.ndarray) -> None:
+        self.ohm.read_fast(out)
+
+    def battery(self) -> StatusContainer:
+        return self._battery()
+
+    def gpu_load(self) -> float:
+        raise NotImplementedError('GPU usage (3D) is not available on Linux.')
+
+    def disk_usage(self) -> float:
+        return disk_usage(self.disk)
+
+    def process_count(self) -> int:
+        return process_count()
+
+    def processes(self, n: int, by: str = 'cpu') -> Dict[str, Any]:
+        return self._processes(n, by)
+
+    def watch(self, watchers: WatcherThread) -> None:
+        # adapter discovery
+        self._network.watch(watchers)
+
+    def network_adapters(self) -> List[str]:
+        return self._network.names
+
+    def network(self) -> List[Union[float, str]]:
+        return self._network()
@@ -0,0 +1,128 @@
+import json
+import math
+import time
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from src.providers.base import Providers
+from src.providers.capture import CAPTURE_VERSION, open_capture
+from src.utils.container import StatusContainer
+
+__all__ = ['ReplayProviders']
+
+
+class ReplayProviders(Providers):
+    """
+    Plays a capture file back through the same interface as the live providers.
+
+    Args:
+        path (str): Capture file written by `CaptureProviders`.
+        speed (float): 1.0 plays in real time, 10.0 ten times faster,
+            `math.inf` (or 0) as fast as the consumer can read.
+
+    `hardware()` moves to the next frame (waiting until it is due) and the
+    other providers return what was recorded in that frame. When the file
+    is exhausted `hardware()` raises EOFError.
+    """
+    live = False
+
+    def __init__(self, path: str, speed: float = 1.0):
+        self.path = path
+        self.speed = math.inf if speed <= 0 else speed
+        self._file = open_capture(path, 'r')
+        self._lines = iter(self._file)
+        header = json.loads(next(self._lines))
+        if header.get('version') != CAPTURE_VERSION:
+            raise ValueError(f'{path}: unsupported capture version {header.get("version")}.')
+        self._select = header.get('select_battery_or_gpu')
+        # older captures: totals only
+        self._adapters = header.get('network_adapters', [])
+        self._frame: Optional[Dict[str, Any]] = None
+        # frame read by `hardware_full` before the first `hardware()`
+        self._peeked: Optional[Dict[str, Any]] = None
+        self._pending: Dict[str, Iterator[Any]] = {}
+        self._start_t: Optional[float] = None
+        self._start_clock = 0.
+        self.frames = 0
+
+    def select_battery_or_gpu(self) -> Optional[bool]:
+        return self._select
+
+    def _next_frame(self) -> Dict[str, Any]:
+        try:
+            line = next(self._lines)
+        except StopIteration:
+            raise EOFError(f'{self.path}: end of replay ({self.frames} frames).')
+        frame = json.loads(line)
+        if self._start_t is None:
+            self._start_t = frame['t']
+            self._start_clock = time.monotonic()
+        elif not math.isinf(self.speed):
+            due = self._start_clock + (frame['t'] - self._start_t) / self.speed
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        self.frames += 1
+        return frame
+
+    def _pop(self, call: str) -> Any:
+        if call not in self._pending:
+            raise LookupError(f'{self.path}: "{call}" was not recorded.')
+        try:
+            return next(self._pending[call])
+        except StopIteration:
+            raise LookupError(f'{self.path}: "{call}" was not recorded in frame {self.frames}.')
+
+    def recorded(self, call: str) -> bool:
+        # 'processes' falls back to the recorded count
+        return call in self._pending or (call == 'processes' and 'process_count' in self._pending)
+
+    def hardware(self) -> StatusContainer:
+        if self._peeked is not None:
+            self._frame, self._peeked = self._peeked, None
+        else:
+            self._frame = self._next_frame()
+        self._pending = {k: iter(v) for k, v in self._frame['calls'].items()}
+        return StatusContainer.fromdict(self._pop('hardware'))
+
+    def hardware_full(self) -> StatusContainer:
+        # before the first pass (table schema): peek at the first frame,
+        # which the first `hardware()` then plays
+        if self._frame is None:
+            if self._peeked is None:
+                self._peeked = self._next_frame()
+            return StatusContainer.fromdict(self._peeked['calls']['hardware'][0])
+        return StatusContainer.fromdict(self._frame['calls']['hardware'][0])
+
+    def battery(self) -> StatusContainer:
+        return StatusContainer.fromdict(self._pop('battery'))
+
+    def gpu_load(self) -> float:
+        return self._pop('gpu_load')
+
+    def disk_usage(self) -> float:
+        return self._pop('disk_usage')
+
+    def process_count(self) -> int:
+        return self._pop('process_count')
+
+    def processes(self, n: int, by: str = 'cpu') -> Dict[str, Any]:
+        if 'processes' not in self._pending:
+            # recorded without the top N: the count only
+            return dict(count=self.process_count(), top=[])
+        value = self._pop('processes')
+        # JSON lists -> tuples, in the recorded order
+        return dict(count=value['count'], top=[tuple(row) for row in value['top'][:n]])
+
+    def network_adapters(self) -> List[str]:
+        return self._adapters
+
+    def network(self) -> List[Union[float, str]]:
+        return self._pop('network')
+
+    def clock(self) -> float:
+        if self._frame is None:
+            return time.time()
+        return self._frame['t']
+
+    def close(self) -> None:
+        self._file.close()
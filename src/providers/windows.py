@@ -0,0 +1,68 @@
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from src.ohmAPI import OpenHardwareMonitor
+from src.providers.base import Providers
+from src.systemAPI import (NetGPU, Network, Processes, c_disk_usage,
+                           get_battery_status, nvidia_smi_update)
+from src.utils import StatusContainer
+from src.watchers import WatcherThread
+
+__all__ = ['WindowsProviders']
+
+
+class WindowsProviders(Providers):
+    """Live providers: OpenHardwareMonitorLib and .NET / Win32 APIs."""
+    def __init__(self, ohm: OpenHardwareMonitor):
+        self.ohm = ohm
+        self._network = Network()
+        self._processes = Processes()
+        # CPU % of the first pass: deltas since now
+        self._processes.update()
+        self._gpu: Optional[NetGPU] = None
+
+    def select_battery_or_gpu(self) -> Optional[bool]:
+        return self.ohm.select_battery_or_gpu()
+
+    def hardware(self) -> StatusContainer:
+        return self.ohm()
+
+    def hardware_full(self) -> StatusContainer:
+        return self.ohm.full_status()
+
+    def fast(self, out: np.ndarray) -> None:
+        self.ohm.read_fast(out)
+
+    def battery(self) -> StatusContainer:
+        return get_battery_status()
+
+    def nvidia_smi_update(self) -> None:
+        nvidia_smi_update()
+
+    def gpu_load(self) -> float:
+        if self._gpu is None:
+            self._gpu = NetGPU()
+            self._gpu.setup()
+        return self._gpu()
+
+    def disk_usage(self) -> float:
+        return c_disk_usage()
+
+    def process_count(self) -> int:
+        # one native snapshot instead of a .NET Process object per process
+        self._processes.update()
+        return self._processes.count
+
+    def processes(self, n: int, by: str = 'cpu') -> Dict[str, Any]:
+        return self._processes(n, by)
+
+    def watch(self, watchers: WatcherThread) -> None:
+        # adapter discovery
+        self._network.watch(watchers)
+
+    def network_adapters(self) -> List[str]:
+        return self._network.names
+
+    def network(self) -> List[Union[float, str]]:
+        return self._network()
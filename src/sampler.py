@@ -0,0 +1,219 @@
+import dataclasses
+import threading
+import time
+import traceback
+from typing import AbstractSet, Any, Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from src.gname import PYTASKMGR
+from src.profiler import Profiler
+from src.scheduler import Scheduler
+from src.utils import logger
+
+__all__ = ['Snapshot', 'Sampler', 'SAMPLE', 'Block', 'BlockSampler']
+
+# scheduler task of a full sampling pass
+SAMPLE = 'sample'
+
+
+@dataclasses.dataclass(frozen=True)
+class Snapshot:
+    """
+    Immutable result of one sampling pass.
+
+    `timestamp` is wall-clock time (for display / storage), `monotonic`
+    is used to measure the age of the data.
+    """
+    seq: int
+    values: Tuple[Any, ...]
+    timestamp: float
+    monotonic: float
+
+    @property
+    def age(self) -> float:
+        """Seconds since this snapshot was taken."""
+        return time.monotonic() - self.monotonic
+
+
+class Sampler(threading.Thread):
+    """
+    Background thread that owns the providers and publishes snapshots.
+
+    The newest snapshot is published by swapping a single reference, so
+    readers (the Tk `after()` loop) never block and never see a partially
+    written result.
+
+    Passes run on a `Scheduler`: every `interval` seconds, aligned to the
+    monotonic clock. `intervals` gives providers read less often their own
+    task; `collect(skip)` gets the names of those that are not due. Only
+    the SAMPLE ticks wake the loop: a slow task whose deadline falls
+    between two ticks stays pending and is read in the next pass, so
+    snapshots stay on the sampling grid.
+    """
+    def __init__(self,
+                 collect: Callable[[AbstractSet[str]], Iterable[Any]],
+                 interval: float = 1.0,
+                 clock: Callable[[], float] = time.time,
+                 on_sample: Optional[Callable[[Snapshot], None]] = None,
+                 intervals: Optional[Dict[str, float]] = None,
+                 profiler: Optional[Profiler] = None):
+        super().__init__(name=f'{PYTASKMGR} sampler', daemon=True)
+        self.collect = collect
+        self.scheduler = Scheduler({SAMPLE: interval, **(intervals or {})})
+        # lateness / missed deadlines per task
+        self.profiler = profiler
+        # wall-clock source (recorded time when replaying)
+        self.clock = clock
+        # called on this thread with every new snapshot (history, recording)
+        self.on_sample = on_sample
+        # held while the providers are being read.
+        # other threads must take it before touching a provider directly.
+        self.lock = threading.Lock()
+        self._latest: Optional[Snapshot] = None
+        self._seq = 0
+        self._stop_event = threading.Event()
+
+    @property
+    def interval(self) -> float:
+        return self.scheduler.tasks[SAMPLE].interval
+
+    @interval.setter
+    def interval(self, value: float) -> None:
+        self.scheduler.set_interval(SAMPLE, value)
+
+    @property
+    def latest(self) -> Optional[Snapshot]:
+        return self._latest
+
+    @property
+    def age(self) -> float:
+        """Age of the latest snapshot in seconds (inf if nothing was sampled yet)."""
+        snapshot = self._latest
+        if snapshot is None:
+            return float('inf')
+        return snapshot.age
+
+    def sample(self, skip: AbstractSet[str] = frozenset()) -> Snapshot:
+        """Read the providers (all but `skip`) once and publish the result."""
+        with self.lock:
+            values = tuple(self.collect(skip))
+            self._seq += 1
+            snapshot = Snapshot(
+                seq=self._seq,
+                values=values,
+                timestamp=self.clock(),
+                monotonic=time.monotonic())
+        if self.on_sample is not None:
+            self.on_sample(snapshot)
+        self._latest = snapshot
+        return snapshot
+
+    def run(self) -> None:
+        logger.debug('Sampler started.')
+        while not self._stop_event.is_set():
+            # only the sampling grid wakes the loop (see the class docstring)
+            delay = self.scheduler.tasks[SAMPLE].deadline - time.monotonic()
+            if delay > self.scheduler.coalesce:
+                self._stop_event.wait(delay)
+                continue
+            due = self.scheduler.due()
+            if self.profiler is not None:
+                for task in due:
+                    self.profiler.record(f'sched.{task.name}.late', task.late)
+                    if task.skipped:
+                        self.profiler.count(f'sched.{task.name}.missed', task.skipped)
+            skip = self.scheduler.tasks.keys() - {task.name for task in due}
+            try:
+                self.sample(skip)
+            except EOFError as e:
+                # replay finished
+                logger.debug(str(e))
+                break
+            except Exception:
+                # keep the last good snapshot; the UI shows it as stale.
+                logger.error(traceback.format_exc())
+        logger.debug('Sampler stopped.')
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+
+@dataclasses.dataclass(frozen=True)
+class Block:
+    """min / max / mean of the fast samples read since the previous drain."""
+    count: int
+    min: np.ndarray
+    max: np.ndarray
+    mean: np.ndarray
+
+
+class BlockSampler(threading.Thread):
+    """
+    Reads a few cheap sensors at `rate` Hz into a preallocated block.
+
+    `read(out)` fills one row (`n` values) and is called with `lock` held
+    (the sampler lock: the providers are not thread safe). `drain()` is
+    called once per display sample and reduces all rows written since the
+    previous drain in one vectorized pass; if more than `capacity` rows
+    pile up the oldest are overwritten.
+    """
+    def __init__(self,
+                 read: Callable[[np.ndarray], None],
+                 n: int,
+                 rate: float = 20.,
+                 lock: Optional[threading.Lock] = None,
+                 capacity: int = 1200):
+        super().__init__(name=f'{PYTASKMGR} block sampler', daemon=True)
+        self.read = read
+        self.n = n
+        self.rate = rate
+        self.lock = lock if lock is not None else threading.Lock()
+        self.capacity = capacity
+        self.scheduler = Scheduler({'block': 1 / rate})
+        # written here, reduced in `drain`; swapped under `_swap`
+        self._blocks = [np.full((capacity, n), np.nan) for _ in range(2)]
+        self._block = self._blocks[0]
+        self._rows = 0
+        self._row = np.full(n, np.nan)
+        self._swap = threading.Lock()
+        self._stop_event = threading.Event()
+
+    def sample(self) -> None:
+        """Read one row."""
+        with self.lock:
+            self.read(self._row)
+        with self._swap:
+            self._block[self._rows % self.capacity] = self._row
+            self._rows += 1
+
+    def drain(self) -> Block:
+        with self._swap:
+            block, rows = self._block, self._rows
+            self._block = self._blocks[1] if block is self._blocks[0] else self._blocks[0]
+            self._rows = 0
+        data = block[:min(rows, self.capacity)]
+        valid = (~np.isnan(data)).sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.nansum(data, axis=0) / valid
+        # fmin / fmax skip NaN (an all-NaN column stays NaN)
+        return Block(
+            count=rows,
+            min=np.fmin.reduce(data, axis=0, initial=np.nan),
+            max=np.fmax.reduce(data, axis=0, initial=np.nan),
+            mean=mean)
+
+    def run(self) -> None:
+        logger.debug(f'Block sampler started ({self.rate:g} Hz, {self.n} sensors).')
+        while not self._stop_event.is_set():
+            self.scheduler.due()
+            try:
+                self.sample()
+            except Exception:
+                logger.error(traceback.format_exc())
+                break
+            self._stop_event.wait(max(0., self.scheduler.tasks[SAMPLE].deadline - time.monotonic()))
+        logger.debug('Block sampler stopped.')
+
+    def stop(self) -> None:
+        self._stop_event.set()
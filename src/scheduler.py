@@ -0,0 +1,79 @@
+import dataclasses
+import math
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+__all__ = ['Task', 'Scheduler']
+
+
+@dataclasses.dataclass
+class Task:
+    name: str
+    # seconds (<= 0: due on every pass)
+    interval: float
+    deadline: float = 0.
+    runs: int = 0
+    # deadlines that passed without a run (total / before the last run)
+    missed: int = 0
+    skipped: int = 0
+    # seconds between the deadline and the last run
+    late: float = 0.
+
+
+class Scheduler:
+    """
+    Periodic tasks on the monotonic clock.
+
+    Deadlines are multiples of each task's interval (`k * interval`), so
+    the period does not drift with the work time, and tasks whose
+    intervals are multiples of each other fall on the same ticks. Tasks
+    due within `coalesce` seconds run in the same pass. Deadlines that
+    passed while the previous pass was still running are skipped and
+    counted in `missed`. Every task is due on the first pass.
+    """
+    def __init__(self,
+                 intervals: Dict[str, float],
+                 coalesce: float = 0.01,
+                 clock: Callable[[], float] = time.monotonic):
+        self.coalesce = coalesce
+        self.clock = clock
+        self.tasks = {name: Task(name, interval) for name, interval in intervals.items()}
+
+    @staticmethod
+    def _align(interval: float, after: float) -> float:
+        """First deadline of the interval grid after `after`."""
+        if interval <= 0:
+            return after
+        return (math.floor(after / interval) + 1) * interval
+
+    def set_interval(self, name: str, interval: float) -> None:
+        task = self.tasks[name]
+        task.interval = interval
+        task.deadline = self._align(interval, self.clock())
+
+    def next_deadline(self) -> float:
+        return min(task.deadline for task in self.tasks.values())
+
+    def due(self, now: Optional[float] = None) -> List[Task]:
+        """Tasks to run in this pass (their next deadline is set)."""
+        if now is None:
+            now = self.clock()
+        limit = now + self.coalesce
+        due = []
+        for task in self.tasks.values():
+            if task.deadline > limit:
+                continue
+            if task.runs:
+                task.late = max(0., now - task.deadline)
+                task.skipped = int(task.late // task.interval) if task.interval > 0 else 0
+                task.missed += task.skipped
+            task.runs += 1
+            task.deadline = self._align(task.interval, max(now, task.deadline))
+            due.append(task)
+        return due
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            task.name: dict(interval=task.interval, runs=task.runs, missed=task.missed,
+                            late=round(task.late * 1000, 3))
+            for task in self.tasks.values()}
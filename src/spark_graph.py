@@ -0,0 +1,180 @@
+import dataclasses
+import os
+import tkinter as tk
+import tkinter.ttk as ttk
+from typing import List, Optional
+
+import numpy as np
+
+from src.gname import PYTASKMGR
+from src.utils import logger, ctrl
+
+__all__ = ['SparkGraphs', 'SPARK_SAMPLES', 'SPARK_COLORS']
+
+# samples per sparkline (last N seconds at 1s)
+SPARK_SAMPLES = 60
+SPARK_COLORS = ('#e6194b', '#3cb44b', '#4363d8', '#f58231', '#911eb4',
+                '#42d4f4', '#f032e6', '#bfef45', '#469990', '#dcbeff')
+# px at 96 dpi
+ROW_HEIGHT = 56
+LABEL_HEIGHT = 16
+PAD = 4
+
+
+@dataclasses.dataclass
+class SparkGraphs:
+    """
+    Sparklines on a single tk.Canvas (no matplotlib figure).
+
+    One row per target: area polygon, line and label. The canvas items are
+    created once; a render only moves their coordinates (computed with
+    numpy into preallocated arrays) and sets the label text.
+    """
+    mainwindow : Optional[ttk.Frame] # pytaskmgr.py -> MainWindow
+    target_ids: List[str]
+    icon: str
+    samples: int = SPARK_SAMPLES
+
+    def __post_init__(self) -> None:
+        self.master = tk.Toplevel(master=self.mainwindow.master)
+        if os.path.exists(self.icon):
+            self.master.iconbitmap(self.icon)
+        self.master.protocol("WM_DELETE_WINDOW", self.app_exit)
+        self.master.bind(ctrl.r, self.switch_window_transparency)
+        self.master.bind(ctrl.p, self.switch_topmost)
+        self.showtop = False
+        self.transparent = False
+        self.master.title(PYTASKMGR)
+
+        self.row_height = self.mainwindow._int_factor(ROW_HEIGHT)
+        self.label_height = self.mainwindow._int_factor(LABEL_HEIGHT)
+        self.pad = self.mainwindow._int_factor(PAD)
+        width = self.mainwindow._int_factor(300)
+        height = self.row_height * len(self.target_ids)
+        self.master.geometry(f'{width}x{height}')
+
+        self.theme_color = self.mainwindow.ttk_style.colors
+        self.current_mode = self.mainwindow.ttk_style.current_mode
+        self.canvas = tk.Canvas(self.master, highlightthickness=0, background=self.theme_color.background)
+        self.canvas.pack(side=tk.TOP, fill=tk.BOTH, expand=1)
+
+        n = self.samples
+        self.lines, self.areas, self.labels = [], [], []
+        # line: (x, y) * n / area: (x0, bottom), (x, y) * n, (x_n, bottom)
+        self.area_xy = [np.zeros((n + 2, 2)) for _ in self.target_ids]
+        for i in range(len(self.target_ids)):
+            color = SPARK_COLORS[i % len(SPARK_COLORS)]
+            self.areas.append(self.canvas.create_polygon(0, 0, 0, 0, 0, 0, fill=color, outline='', stipple='gray25'))
+            self.lines.append(self.canvas.create_line(0, 0, 0, 0, fill=color, width=self.mainwindow._int_factor(1.5) or 1))
+            self.labels.append(self.canvas.create_text(
+                self.pad, i * self.row_height, anchor=tk.NW, fill=self.theme_color.foreground,
+                font=('Yu Gothic UI', self.mainwindow._int_factor(8))))
+        self.width = width
+        self._layout()
+
+        self.destroy_flag = False
+        self.renderer = self.mainwindow.graph_renderer
+        self.rendered_version = -1
+        self.obscured = False
+        self.canvas.bind('<Configure>', self.on_resize)
+        self.canvas.bind('<Visibility>', self.on_visibility)
+        self.canvas.bind('<Map>', self.on_map)
+        self.renderer.add(self)
+        self.render()
+
+    def _layout(self) -> None:
+        """x coordinates / row bottoms for the current canvas width."""
+        x = np.linspace(self.pad, self.width - self.pad, self.samples)
+        for i, area_xy in enumerate(self.area_xy):
+            bottom = (i + 1) * self.row_height - self.pad
+            area_xy[1:-1, 0] = x
+            area_xy[0] = x[0], bottom
+            area_xy[-1] = x[-1], bottom
+
+    def on_resize(self, event: tk.Event) -> None:
+        if event.width != self.width:
+            self.width = event.width
+            self._layout()
+            self.rendered_version = -1
+            self.render()
+
+    @property
+    def visible(self) -> bool:
+        return not self.obscured and self.master.state() not in ('iconic', 'withdrawn')
+
+    def on_visibility(self, event: tk.Event) -> None:
+        self.obscured = event.state == 'VisibilityFullyObscured'
+        self.on_map(event)
+
+    def on_map(self, event: Optional[tk.Event] = None) -> None:
+        if self.rendered_version != self.renderer.version and self.visible:
+            self.master.after_idle(self.render)
+
+    def render(self) -> None:
+        if self.destroy_flag or self.rendered_version == self.renderer.version:
+            return
+        with self.mainwindow.profiler.span('graph.spark'):
+            self._update_data()
+        self.rendered_version = self.renderer.version
+
+    def _set_theme(self) -> None:
+        self.current_mode = self.mainwindow.ttk_style.current_mode
+        self.theme_color = self.mainwindow.ttk_style.colors
+        self.canvas.configure(background=self.theme_color.background)
+        for label in self.labels:
+            self.canvas.itemconfigure(label, fill=self.theme_color.foreground)
+
+    def _update_data(self) -> None:
+        if self.current_mode != self.mainwindow.ttk_style.current_mode:
+            self._set_theme()
+        tables = self.mainwindow.data_table
+        history = self.mainwindow.history
+        n = self.samples
+        # plot area of a row: below the label, above the bottom padding
+        span = self.row_height - self.label_height - 2 * self.pad
+        for i, tid in enumerate(self.target_ids):
+            table = tables[tid]
+            y = history.latest(table['row'], n)
+            area_xy = self.area_xy[i]
+            bottom = area_xy[0, 1]
+            if table['percentage_range']:
+                lo, hi = 0., 100.
+            else:
+                lo = min(0., float(np.fmin.reduce(y, initial=np.inf)))
+                hi = float(np.fmax.reduce(y, initial=-np.inf))
+                if not hi > lo:
+                    hi = lo + 1.
+            # short history: the line starts at the right samples
+            m = len(y)
+            ys = area_xy[1 + n - m:n + 1, 1]
+            np.subtract(y, lo, out=ys)
+            np.multiply(ys, -span / (hi - lo), out=ys)
+            np.add(ys, bottom, out=ys)
+            np.copyto(ys, bottom, where=np.isnan(ys))
+            area_xy[1:1 + n - m, 1] = bottom
+            coords = area_xy.ravel().tolist()
+            self.canvas.coords(self.areas[i], coords)
+            self.canvas.coords(self.lines[i], coords[2:-2])
+
+            cur = y[-1] if m else 0.
+            if table['type_'] is float:
+                cur = round(cur, 1)
+            elif table['type_'] is int:
+                cur = int(cur)
+            self.canvas.itemconfigure(self.labels[i], text=f"{table['name'].name}: {cur} {table['name'].unit}")
+
+    def app_exit(self, *args, **kwargs) -> None:
+        self.renderer.remove(self)
+        self.master.destroy()
+        self.destroy_flag = True
+        logger.debug('Sparkline window closed.')
+
+    def switch_topmost(self, *args, **kwargs) -> None:
+        """ウィンドウ最前面固定の有効/無効"""
+        self.showtop = not self.showtop
+        self.master.attributes("-topmost", self.showtop)
+        self.master.title(f'*{PYTASKMGR}' if self.showtop else PYTASKMGR)
+
+    def switch_window_transparency(self, *args, **kwargs) -> None:
+        self.transparent = not self.transparent
+        self.master.attributes("-alpha", 0.5 if self.transparent else 1.0)
@@ -16,6 +16,9 @@ from src.systemAPI.process import num_processors
 from src.systemAPI.process import cpu_usage
 from src.systemAPI.process import get_current_pids
 from src.systemAPI.process import c_disk_usage
+from src.systemAPI.process import Processes
+from src.systemAPI.process import ManagementQuerySource
+from src.systemAPI.process import wmi_cache
 
 from src.systemAPI.win_forms import error
 from src.systemAPI.win_forms import info
@@ -31,3 +34,5 @@ from src.systemAPI.gpu import gpu_power_limit
 from src.systemAPI.gpu import gpu_fan_speed
 from src.systemAPI.gpu import NetGPU
 
+
+from src.systemAPI.registry import theme_source
@@ -1,88 +1,169 @@
-import time
-from types import ModuleType
-from typing import Tuple, Union, Optional, Callable
-
-from src.utils import NetworkInterface, StatusContainer
-
-__all__ = ["Network"]
-NOT_CONNECTED = ['Not connected', 'Not connected']
-
-class Network():
-    MAX_WAIT_COUNT = 4
-
-    def __init__(self):
-        self._time = time.time()
-        self._network = self._get_networks()
-        self._network_wait_count = 0
-
-        self._sent = None
-        self._received = None
-
-    def _get_networks(self) -> StatusContainer:
-        status = StatusContainer()
-        adapters = NetworkInterface.GetAllNetworkInterfaces()
-        for adapter in adapters:
-            sent, received = self._get_current_status(adapter)
-            if adapter.Speed != -1 and sent != 0 and received != 0:
-                status.register('adapter', adapter)
-                break
-        return status
-
-    def _get_current_status(self, adapter: Optional[ModuleType] = None) -> Tuple[float, float]:
-        if adapter is None:
-            stats = self._network.adapter.GetIPv4Statistics()
-        else:
-            stats = adapter.GetIPv4Statistics()
-        current_sent = stats.BytesSent
-        current_received = stats.BytesReceived
-
-        return current_sent, current_received
-
-    def _reset_wait_count(self):
-        self._network_wait_count = 0
-    
-    def get_sent_received(self) -> Union[Tuple[float, float], Tuple[str, str]]:
-        if self._network.isempty:
-            if self._network_wait_count == self.MAX_WAIT_COUNT:
-                self._reset_wait_count()
-                self._network = self._get_networks()
-            else:
-                self._network_wait_count += 1
-            return NOT_CONNECTED
-        else:
-            current_sent, current_received = self._get_current_status()
-    
-            if self._sent is None or type(self._sent) is str:
-                self._sent = current_sent
-                self._received = current_received
-                return NOT_CONNECTED
-            elif current_sent < 0 or current_sent < self._sent:
-                self._sent = None
-                self._received = None
-                self._reset_wait_count()
-                return NOT_CONNECTED
-            elif current_sent == self._sent and current_received == self._received:
-                if self._network_wait_count == self.MAX_WAIT_COUNT:
-                    self._reset_wait_count()
-                    self._network = self._get_networks()
-                    return NOT_CONNECTED
-                else:
-                    self._network_wait_count += 1
-            else:
-                self._reset_wait_count()
-
-            now = time.time()
-            time_diff = now - self._time
-            self._time = now
-
-            # convert to kbps
-            # bps = byte diff / time diff
-            # kbps = bps / 1024
-            sent = (current_sent - self._sent) / (1024 * time_diff)
-            received = (current_received - self._received) / (1024 * time_diff)
-
-            self._sent = current_sent
-            self._received = current_received
-            return [sent, received]
-
-    __call__: Callable[[], Union[Tuple[float, float], Tuple[str, str]]] = get_sent_received
+import ctypes
+from typing import Any, Callable, List, Tuple
+
+import numpy as np
+
+from src.utils import NetworkChange
+from src.utils.traffic import Adapter, AdapterTraffic
+from src.watchers import Source
+
+__all__ = ["Network", "NetworkChangeSource"]
+
+IF_MAX_STRING_SIZE = 256
+IF_MAX_PHYS_ADDRESS_LENGTH = 32
+IF_TYPE_SOFTWARE_LOOPBACK = 24
+IF_OPER_STATUS_UP = 1
+# MIB_IF_ROW2.InterfaceAndOperStatusFlags bits
+HARDWARE_INTERFACE = 0x01
+FILTER_INTERFACE = 0x02
+
+
+class GUID(ctypes.Structure):
+    _fields_ = [('Data1', ctypes.c_uint32),
+                ('Data2', ctypes.c_uint16),
+                ('Data3', ctypes.c_uint16),
+                ('Data4', ctypes.c_ubyte * 8)]
+
+
+class MIB_IF_ROW2(ctypes.Structure):
+    """
+    https://learn.microsoft.com/en-us/windows/win32/api/netioapi/ns-netioapi-mib_if_row2
+    """
+    _fields_ = [('InterfaceLuid', ctypes.c_uint64),
+                ('InterfaceIndex', ctypes.c_uint32),
+                ('InterfaceGuid', GUID),
+                ('Alias', ctypes.c_wchar * (IF_MAX_STRING_SIZE + 1)),
+                ('Description', ctypes.c_wchar * (IF_MAX_STRING_SIZE + 1)),
+                ('PhysicalAddressLength', ctypes.c_uint32),
+                ('PhysicalAddress', ctypes.c_ubyte * IF_MAX_PHYS_ADDRESS_LENGTH),
+                ('PermanentPhysicalAddress', ctypes.c_ubyte * IF_MAX_PHYS_ADDRESS_LENGTH),
+                ('Mtu', ctypes.c_uint32),
+                ('Type', ctypes.c_uint32),
+                ('TunnelType', ctypes.c_uint32),
+                ('MediaType', ctypes.c_uint32),
+                ('PhysicalMediumType', ctypes.c_uint32),
+                ('AccessType', ctypes.c_uint32),
+                ('DirectionType', ctypes.c_uint32),
+                ('InterfaceAndOperStatusFlags', ctypes.c_ubyte),
+                ('OperStatus', ctypes.c_uint32),
+                ('AdminStatus', ctypes.c_uint32),
+                ('MediaConnectState', ctypes.c_uint32),
+                ('NetworkGuid', GUID),
+                ('ConnectionType', ctypes.c_uint32),
+                ('TransmitLinkSpeed', ctypes.c_uint64),
+                ('ReceiveLinkSpeed', ctypes.c_uint64),
+                ('InOctets', ctypes.c_uint64),
+                ('InUcastPkts', ctypes.c_uint64),
+                ('InNUcastPkts', ctypes.c_uint64),
+                ('InDiscards', ctypes.c_uint64),
+                ('InErrors', ctypes.c_uint64),
+                ('InUnknownProtos', ctypes.c_uint64),
+                ('InUcastOctets', ctypes.c_uint64),
+                ('InMulticastOctets', ctypes.c_uint64),
+                ('InBroadcastOctets', ctypes.c_uint64),
+                ('OutOctets', ctypes.c_uint64),
+                ('OutUcastPkts', ctypes.c_uint64),
+                ('OutNUcastPkts', ctypes.c_uint64),
+                ('OutDiscards', ctypes.c_uint64),
+                ('OutErrors', ctypes.c_uint64),
+                ('OutUcastOctets', ctypes.c_uint64),
+                ('OutMulticastOctets', ctypes.c_uint64),
+                ('OutBroadcastOctets', ctypes.c_uint64),
+                ('OutQLen', ctypes.c_uint64)]
+
+
+class MIB_IF_TABLE2(ctypes.Structure):
+    _fields_ = [('NumEntries', ctypes.c_uint32),
+                ('Table', MIB_IF_ROW2 * 1)]
+
+
+def _field(name: str, dtype: str) -> Tuple[str, str, int]:
+    return name, dtype, getattr(MIB_IF_ROW2, name).offset
+
+
+# the columns read every tick, as a numpy view of the table rows
+_COLUMNS = [_field('InterfaceLuid', '<u8'),
+            _field('Type', '<u4'),
+            _field('InterfaceAndOperStatusFlags', 'u1'),
+            _field('OperStatus', '<u4'),
+            _field('InOctets', '<u8'),
+            _field('OutOctets', '<u8')]
+ROW_DTYPE = np.dtype(dict(names=[c[0] for c in _COLUMNS],
+                          formats=[c[1] for c in _COLUMNS],
+                          offsets=[c[2] for c in _COLUMNS],
+                          itemsize=ctypes.sizeof(MIB_IF_ROW2)))
+
+
+def if_table(aliases: bool = False) -> Tuple[np.ndarray, List[str]]:
+    """
+    Every interface in one `GetIfTable2` call: the `ROW_DTYPE` columns
+    (copied), and the aliases ("Wi-Fi", "Ethernet 2" ...) if asked.
+    """
+    iphlpapi = ctypes.windll.iphlpapi
+    table = ctypes.POINTER(MIB_IF_TABLE2)()
+    result = iphlpapi.GetIfTable2(ctypes.byref(table))
+    if result != 0:
+        raise ctypes.WinError(result)
+    try:
+        n = table.contents.NumEntries
+        address = ctypes.addressof(table.contents.Table)
+        rows = np.frombuffer((ctypes.c_char * (n * ROW_DTYPE.itemsize)).from_address(address),
+                             ROW_DTYPE, n).copy()
+        names = [row.Alias for row in (MIB_IF_ROW2 * n).from_address(address)] if aliases else []
+    finally:
+        iphlpapi.FreeMibTable(table)
+    return rows, names
+
+
+class NetworkChangeSource(Source):
+    """`read()` pushed on .NET NetworkChange address / availability events."""
+    push = True
+
+    def __init__(self, read: Callable[[], Any]):
+        self._read = read
+        self._handlers = []
+
+    def read(self) -> Any:
+        return self._read()
+
+    def subscribe(self, notify: Callable[[], None]) -> None:
+        def changed(sender, args) -> None:
+            notify()
+        NetworkChange.NetworkAddressChanged += changed
+        NetworkChange.NetworkAvailabilityChanged += changed
+        self._handlers.append(changed)
+
+    def close(self) -> None:
+        for changed in self._handlers:
+            NetworkChange.NetworkAddressChanged -= changed
+            NetworkChange.NetworkAvailabilityChanged -= changed
+        self._handlers.clear()
+
+
+def _active(rows: np.ndarray) -> np.ndarray:
+    return ((rows['OperStatus'] == IF_OPER_STATUS_UP)
+            & (rows['Type'] != IF_TYPE_SOFTWARE_LOOPBACK)
+            & (rows['InterfaceAndOperStatusFlags'] & FILTER_INTERFACE == 0))
+
+
+class Network(AdapterTraffic):
+    """
+    Sent / received KB/s per interface from `GetIfTable2` (one call per tick).
+
+    Adapters: up, not loopback / filter interfaces, with traffic. Physical
+    ones have the HardwareInterface flag.
+    """
+    def _discover(self) -> List[Adapter]:
+        rows, names = if_table(aliases=True)
+        used = _active(rows) & ((rows['InOctets'] > 0) | (rows['OutOctets'] > 0))
+        hardware = rows['InterfaceAndOperStatusFlags'] & HARDWARE_INTERFACE != 0
+        return [Adapter(rows['InterfaceLuid'][i], names[i], bool(hardware[i]))
+                for i in np.flatnonzero(used)]
+
+    def _discovery_source(self) -> Source:
+        return NetworkChangeSource(self._discover)
+
+    def _read(self) -> Tuple[np.ndarray, np.ndarray]:
+        rows, _ = if_table()
+        rows = rows[_active(rows)]
+        return rows['InterfaceLuid'], np.stack([rows['OutOctets'], rows['InOctets']], axis=1)
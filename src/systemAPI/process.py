@@ -1,9 +1,14 @@
 
+import ctypes
 import shutil
 import time
-from typing import List, TypeVar
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
 
-from src.utils import StatusContainer, diagnostics, dispose, management, system
+import numpy as np
+
+from src.utils import StatusContainer, diagnostics, dispose, logger, management, system
+from src.utils.processes import ProcessTable
+from src.utils.wmi import QuerySource, WmiCache
 
 
 __all__ = [
@@ -15,7 +20,10 @@ __all__ = [
     'num_processors',
     'cpu_usage',
     'get_current_pids',
-    'c_disk_usage']
+    'c_disk_usage',
+    'Processes',
+    'ManagementQuerySource',
+    'wmi_cache']
 
 
 PerformanceCounter = TypeVar('PerformanceCounter')
@@ -42,7 +50,7 @@ WMI_CLASS_TAG = {
         'ExpectedBatteryLife',
         'ExpectedLife',
         'FullChargeCapacity',
-        'datetime InstallDate',
+        'InstallDate',
         'LastErrorCode',
         'MaxRechargeTime',
         'Name',
@@ -233,33 +241,72 @@ WMI_CLASS_TAG = {
         'WindowsDirectory',
         'QuantumLength',
         'QuantumType']}
+# NtQuerySystemInformation
+SYSTEM_PROCESS_INFORMATION = 5
+STATUS_INFO_LENGTH_MISMATCH = 0xC0000004
+# SYSTEM_PROCESS_INFORMATION (x64) fields, in 8-byte words from the entry start
+SPI_CREATE_TIME = 4
+SPI_USER_TIME = 5
+SPI_KERNEL_TIME = 6
+SPI_IMAGE_NAME = 7  # UNICODE_STRING: Length (u16) ..., Buffer at the next word
+SPI_PROCESS_ID = 10
+SPI_WORKING_SET = 18
 available_memory = None
 total_memory = None
 
 
-def _wmi_info(target: str) -> StatusContainer:
+class ManagementQuerySource(QuerySource):
+    """Projected WQL queries through System.Management."""
+    def query(self, wmi_class: str, properties: Sequence[str]) -> List[Dict[str, Any]]:
+        try:
+            return self._select(wmi_class, properties, ', '.join(properties))
+        except Exception as e:
+            # a property this Windows version lacks makes the whole query invalid
+            logger.debug(f'WMI: {wmi_class}: {e}, retrying with all properties.')
+            return self._select(wmi_class, properties, '*')
+
+    @staticmethod
+    def _select(wmi_class: str, properties: Sequence[str], columns: str) -> List[Dict[str, Any]]:
+        searcher = management.ManagementObjectSearcher(f'SELECT {columns} FROM {wmi_class}')
+        moc = searcher.Get()
+        rows = []
+        try:
+            for mo in moc:
+                row = {}
+                for name in properties:
+                    try:
+                        value = mo.get_Item(name)
+                    except Exception:
+                        continue
+                    if value is not None:
+                        row[name] = value
+                rows.append(row)
+                dispose(mo)
+        finally:
+            dispose(moc, searcher)
+        return rows
+
+
+# WMI queries (worker threads, results cached per class / property TTL)
+wmi_cache = WmiCache(ManagementQuerySource())
+
+
+def _wmi_info(target: str, properties: Optional[Sequence[str]] = None) -> StatusContainer:
     """Get WMI data for a given target.
 
     Args:
         target (str): The target to get info for.
-        Must be in the WMI_INFO_TARGETS dict.
+        Must be in the WMI_CLASS_TAG dict.
+        properties (Sequence[str], optional): Properties to query.
+        Defaults to WMI_CLASS_TAG[target].
 
     Returns:
         StatusContainer: Status.
     """
-    mc = management.ManagementClass(target)
-
-    moc = mc.GetInstances()
     status = StatusContainer()
-    for mo in moc:
-        for name in WMI_CLASS_TAG[target]:
-            try:
-                res = mo.get_Item(name)
-                if res is None: continue
-                status.register(name, res)
-            except:
-                pass
-    dispose(moc, mc)
+    for row in wmi_cache.get(target, properties or WMI_CLASS_TAG[target]):
+        for name, value in row.items():
+            status.register(name, value)
     return status
 
 
@@ -368,3 +415,55 @@ def c_disk_usage() -> float:
     """
     total, used, _ = shutil.disk_usage('c:\\')
     return round(100*used / total, 1)
+
+
+class Processes(ProcessTable):
+    """
+    Processes from one `NtQuerySystemInformation(SystemProcessInformation)`
+    call (CPU time in 100 ns units, working set). The System Idle Process
+    (PID 0) is left out.
+
+    The buffer is reused between calls (grown when too small); the names
+    point into it, so they are only valid until the next `update`.
+    """
+    def __init__(self):
+        # 100 ns / s -> % of all CPUs
+        super().__init__(100. / (1e7 * num_processors()))
+        self._buffer = ctypes.create_string_buffer(1 << 18)
+
+    def _query(self) -> int:
+        ntdll = ctypes.windll.ntdll
+        needed = ctypes.c_ulong()
+        while True:
+            status = ntdll.NtQuerySystemInformation(
+                SYSTEM_PROCESS_INFORMATION, self._buffer, len(self._buffer), ctypes.byref(needed))
+            if status & 0xFFFFFFFF != STATUS_INFO_LENGTH_MISMATCH:
+                break
+            # processes may start before the next call
+            self._buffer = ctypes.create_string_buffer(needed.value + (1 << 16))
+        if status != 0:
+            raise OSError(f'NtQuerySystemInformation: 0x{status & 0xFFFFFFFF:08X}')
+        return needed.value
+
+    def _read(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Callable[[int], str]]:
+        size = self._query()
+        words = np.frombuffer(self._buffer, '<u8', size // 8)
+        # entry starts: follow NextEntryOffset (low 32 bits of the first word)
+        starts = [0]
+        while True:
+            step = int(words[starts[-1]]) & 0xFFFFFFFF
+            if not step:
+                break
+            starts.append(starts[-1] + step // 8)
+        starts = np.array(starts)
+        pids = words[starts + SPI_PROCESS_ID].astype(np.int64)
+        starts = starts[pids != 0]
+        # bytes of UTF-16
+        lengths = words[starts + SPI_IMAGE_NAME] & 0xFFFF
+        pointers = words[starts + SPI_IMAGE_NAME + 1]
+        return (pids[pids != 0],
+                words[starts + SPI_CREATE_TIME],
+                words[starts + SPI_USER_TIME] + words[starts + SPI_KERNEL_TIME],
+                words[starts + SPI_WORKING_SET].astype(np.float64),
+                lambda i: ctypes.string_at(int(pointers[i]), int(lengths[i])).decode('utf-16-le'))
+
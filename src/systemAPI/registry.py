@@ -1,4 +1,17 @@
+import ctypes
+import threading
 import winreg
+from ctypes import wintypes
+from typing import Any, Callable, List
+
+from src.watchers import Source
+
+PERSONALIZE_KEY = r"Software\Microsoft\Windows\CurrentVersion\Themes\Personalize"
+DWM_KEY = r"Software\Microsoft\Windows\DWM"
+
+REG_NOTIFY_CHANGE_LAST_SET = 0x00000004
+INFINITE = 0xFFFFFFFF
+WAIT_OBJECT_0 = 0
 
 
 class _Registry:
@@ -14,17 +27,87 @@ class _Registry:
             return winreg.QueryValueEx(key, value)[0]
     
     def is_dark_mode(self) -> bool:
-        res = self.getvalue(
-            r"Software\Microsoft\Windows\CurrentVersion\Themes\Personalize",
-            "AppsUseLightTheme")
+        res = self.getvalue(PERSONALIZE_KEY, "AppsUseLightTheme")
         if not isinstance(res, int):
             return False
         return res == 0
     
     def colorization_color(self) -> str:
-        res = self.getvalue(r"Software\Microsoft\Windows\DWM", "ColorizationColor")
+        res = self.getvalue(DWM_KEY, "ColorizationColor")
         if not isinstance(res, int):
             return "#0090ee"
         value = res & 0xFFFFFF
         return f"#{value:06x}"
 system = _Registry()
+
+
+class RegistryKeySource(Source):
+    """
+    Value read from HKCU keys, re-read when one of the keys changes
+    (RegNotifyChangeKeyValue, waited on by a daemon thread).
+    """
+    push = True
+
+    def __init__(self, keys: List[str], read: Callable[[], Any]):
+        self.keys = keys
+        self._read = read
+        self._thread = None
+        kernel32 = ctypes.windll.kernel32
+        kernel32.CreateEventW.restype = wintypes.HANDLE
+        kernel32.CreateEventW.argtypes = (ctypes.c_void_p, wintypes.BOOL, wintypes.BOOL, wintypes.LPCWSTR)
+        kernel32.SetEvent.argtypes = (wintypes.HANDLE,)
+        kernel32.WaitForMultipleObjects.restype = wintypes.DWORD
+        kernel32.WaitForMultipleObjects.argtypes = (wintypes.DWORD, ctypes.POINTER(wintypes.HANDLE), wintypes.BOOL, wintypes.DWORD)
+        ctypes.windll.advapi32.RegNotifyChangeKeyValue.argtypes = (
+            wintypes.HKEY, wintypes.BOOL, wintypes.DWORD, wintypes.HANDLE, wintypes.BOOL)
+        self._stop_event = kernel32.CreateEventW(None, True, False, None)
+
+    def read(self) -> Any:
+        return self._read()
+
+    def subscribe(self, notify: Callable[[], None]) -> None:
+        self._thread = threading.Thread(target=self._wait, args=(notify,),
+                                        name='registry watcher', daemon=True)
+        self._thread.start()
+
+    def _arm(self, key: winreg.HKEYType, event: int) -> None:
+        # one-shot: re-armed after every notification
+        ctypes.windll.advapi32.RegNotifyChangeKeyValue(
+            key.handle, False, REG_NOTIFY_CHANGE_LAST_SET, event, True)
+
+    def _wait(self, notify: Callable[[], None]) -> None:
+        kernel32 = ctypes.windll.kernel32
+        keys, events = [], []
+        for name in self.keys:
+            try:
+                key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, name, 0, winreg.KEY_NOTIFY)
+            except OSError:
+                continue
+            event = kernel32.CreateEventW(None, False, False, None)
+            self._arm(key, event)
+            keys.append(key)
+            events.append(event)
+        handles = (wintypes.HANDLE * (len(events) + 1))(*events, self._stop_event)
+        while True:
+            index = kernel32.WaitForMultipleObjects(len(handles), handles, False, INFINITE) - WAIT_OBJECT_0
+            if not 0 <= index < len(events):
+                # stop event (or WAIT_FAILED)
+                break
+            self._arm(keys[index], events[index])
+            notify()
+        for key in keys:
+            key.Close()
+        for event in events:
+            kernel32.CloseHandle(event)
+
+    def close(self) -> None:
+        ctypes.windll.kernel32.SetEvent(self._stop_event)
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+
+
+def theme_source() -> RegistryKeySource:
+    """System color / dark mode, pushed on registry changes."""
+    return RegistryKeySource(
+        [PERSONALIZE_KEY, DWM_KEY],
+        lambda: (system.colorization_color(), system.is_dark_mode()))
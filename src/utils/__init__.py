@@ -1,28 +1,45 @@
+import sys
+
 from src.utils.container import StatusContainer
 
-from src.utils.pythonnet import import_module
-
-from src.utils.csharp_modules import dispose
-from src.utils.csharp_modules import System
-from src.utils.csharp_modules import system
-from src.utils.csharp_modules import Diagnostics
-from src.utils.csharp_modules import diagnostics
-from src.utils.csharp_modules import Management
-from src.utils.csharp_modules import management
-from src.utils.csharp_modules import Forms
-from src.utils.csharp_modules import forms
-from src.utils.csharp_modules import container
-from src.utils.csharp_modules import Container
-from src.utils.csharp_modules import Icon
-from src.utils.csharp_modules import SystemIcons
-from src.utils.csharp_modules import NetworkInterface
-from src.utils.csharp_modules import close_container
+from src.utils.task import logger
+
+from src.utils.rates import RateEngine
+from src.utils.rates import WRAP_32
+
+from src.utils.wmi import QuerySource
+from src.utils.wmi import FakeQuerySource
+from src.utils.wmi import WmiCache
+# traffic.py imports src.watchers: import it from src.utils.traffic
 
+# pythonnet / Win32 parts are only importable on Windows
+if sys.platform == 'win32':
+    from src.utils.pythonnet import import_module
+
+    from src.utils.csharp_modules import dispose
+    from src.utils.csharp_modules import System
+    from src.utils.csharp_modules import system
+    from src.utils.csharp_modules import Diagnostics
+    from src.utils.csharp_modules import diagnostics
+    from src.utils.csharp_modules import Management
+    from src.utils.csharp_modules import management
+    from src.utils.csharp_modules import Forms
+    from src.utils.csharp_modules import forms
+    from src.utils.csharp_modules import container
+    from src.utils.csharp_modules import Container
+    from src.utils.csharp_modules import Icon
+    from src.utils.csharp_modules import SystemIcons
+    from src.utils.csharp_modules import NetworkInterface
+    from src.utils.csharp_modules import NetworkChange
+    from src.utils.csharp_modules import close_container
+
+# after csharp_modules: table.py imports src.systemAPI on Windows
 from src.utils.table import Name
 from src.utils.table import TableGroup
 from src.utils.table import adjust_format
 from src.utils.table import determine_color
+from src.utils.table import resolve_color
 from src.utils.table import ctrl
-from src.utils.table import StyleWatch
+from src.utils.table import set_dark_mode
 
-from src.utils.task import logger
+# style.py (StyleWatch) imports tkinter: import it from src.utils.style
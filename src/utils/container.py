@@ -67,6 +67,10 @@ class StatusContainer:
             value = s
         self._holder[self._setname(name, 1)] = value
 
+    def set(self, name: str, value):
+        """Overwrite a registered value in place (no renaming, no conversion)."""
+        self._holder[name] = value
+
     def clear(self):
         self._holder.clear()
 
@@ -91,6 +95,26 @@ class StatusContainer:
             ret.append(t)
         return ret
 
+    @staticmethod
+    def fromdict(value: Dict[str, Any]) -> 'StatusContainer':
+        """
+        Inverse of `todict`. Keys are kept as they are.
+
+        Args:
+            value (Dict[str, Any]): Output of `todict`.
+
+        Returns:
+            StatusContainer: Rebuilt container.
+        """
+        s = StatusContainer()
+        for k, v in value.items():
+            if isinstance(v, dict):
+                v = StatusContainer.fromdict(v)
+            elif isinstance(v, (list, tuple)):
+                v = [StatusContainer.fromdict(_v) if isinstance(_v, dict) else _v for _v in v]
+            s.set(k, v)
+        return s
+
     def todict(self) -> Dict[str, Any]:
         """
         Convert to StatusContainer to dict.
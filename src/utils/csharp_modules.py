@@ -15,6 +15,7 @@ __all__ = [
     'Icon',
     'SystemIcons',
     'NetworkInterface',
+    'NetworkChange',
     'close_container',]
 
 
@@ -26,7 +27,8 @@ Container = import_module("System.ComponentModel.Primitives",
                           module_name="System.ComponentModel",
                           submodule_or_classes='Container')
 Icon, SystemIcons = import_module("System.Drawing", submodule_or_classes=["Icon", "SystemIcons"])
-NetworkInterface = import_module("System.Net.NetworkInformation", submodule_or_classes="NetworkInterface")
+NetworkInterface, NetworkChange = import_module("System.Net.NetworkInformation",
+                                               submodule_or_classes=["NetworkInterface", "NetworkChange"])
 
 
 system = System
@@ -0,0 +1,60 @@
+import heapq
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from src.utils.rates import RateEngine
+
+__all__ = ['ProcessTable', 'TOP_BY', 'KEY_DTYPE']
+
+# ranking keys of `ProcessTable.top`
+TOP_BY = ('cpu', 'memory')
+MB = 1024 * 1024
+# a process: PIDs are reused, (PID, creation time) is not
+KEY_DTYPE = np.dtype([('pid', '<i8'), ('created', '<u8')])
+
+
+class ProcessTable:
+    """
+    PID-indexed snapshot of the running processes, refreshed once per pass.
+
+    Subclasses read every process with one pass (`_read`): PIDs, creation
+    times, CPU time and working set. CPU % comes from the CPU time deltas
+    between two snapshots (`RateEngine` matched by PID and creation time,
+    so processes can come and go, and a reused PID starts over instead of
+    counting all its CPU time as one delta); `count` is the size of the
+    same snapshot. `top` picks the N
+    largest with a heap instead of sorting every process.
+    """
+    def __init__(self, cpu_time_scale: float):
+        # CPU time units -> % of all logical CPUs
+        self.rates = RateEngine(scale=cpu_time_scale)
+        self.count = 0
+        self._cpu = np.zeros(0)
+        self._memory = np.zeros(0)
+        self._name: Callable[[int], str] = str
+
+    def _read(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Callable[[int], str]]:
+        """(PIDs, creation times, CPU time, working set bytes, name of the i-th process)."""
+        raise NotImplementedError
+
+    def update(self) -> None:
+        pids, created, cpu_time, memory, name = self._read()
+        keys = np.empty(len(pids), KEY_DTYPE)
+        keys['pid'] = pids
+        keys['created'] = created
+        # new processes: 0 % until their second snapshot
+        self._cpu = np.nan_to_num(self.rates.update(cpu_time, keys), nan=0.)
+        self._memory = memory / MB
+        self._name = name
+        self.count = len(pids)
+
+    def top(self, n: int, by: str = 'cpu') -> List[Tuple[str, float, float]]:
+        """(name, CPU %, working set MB) of the `n` largest by `by` (see `TOP_BY`)."""
+        values = (self._cpu if by == 'cpu' else self._memory).tolist()
+        best = heapq.nlargest(n, range(len(values)), key=values.__getitem__)
+        return [(self._name(i), float(self._cpu[i]), float(self._memory[i])) for i in best]
+
+    def __call__(self, n: int, by: str = 'cpu') -> Dict[str, Any]:
+        self.update()
+        return dict(count=self.count, top=self.top(n, by))
@@ -0,0 +1,95 @@
+import math
+import time
+from typing import Callable, Optional, Tuple, Union
+
+import numpy as np
+
+__all__ = ['RateEngine', 'WRAP_32']
+
+# modulus of a 32-bit counter
+WRAP_32 = 1 << 32
+
+
+class RateEngine:
+    """
+    Per-second rates of many cumulative counters, computed together.
+
+    `update(counters)` takes the current values of every counter (one
+    array) and returns their rates since the previous update, timed with
+    `time.monotonic_ns` (wall clock changes do not matter). A counter
+    lower than before either wrapped, if it has a `modulus` and dropped by
+    more than half of it, or was reset, in which case its new value is
+    the delta. Rates are NaN until a counter has two values.
+
+    With `keys` (one per row of `counters`), rows are matched by key
+    between updates, so the set can change (new rows: NaN for one
+    update). `tau` > 0 smooths the
+    rates with an EWMA of that time constant (seconds); `scale`
+    multiplies them (e.g. 1 / 1024 for KB/s).
+    """
+    def __init__(self,
+                 modulus: Union[int, np.ndarray] = 0,
+                 tau: float = 0.,
+                 scale: float = 1.,
+                 clock: Callable[[], int] = time.monotonic_ns):
+        # 0: no wrap (64-bit counters)
+        self.modulus = np.asarray(modulus, dtype=np.uint64)
+        self.tau = tau
+        self.scale = scale
+        self.clock = clock
+        self._keys: Optional[np.ndarray] = None
+        self._prev: Optional[np.ndarray] = None
+        self._time = 0
+        self.rates = np.empty(0)
+
+    def reset(self) -> None:
+        self._keys = self._prev = None
+        self.rates = np.empty(0)
+
+    def _align(self, keys: Optional[np.ndarray], shape: Tuple[int, ...]):
+        """Previous values / rates in the order of `keys` (+ which ones exist)."""
+        if keys is None or self._keys is None or np.array_equal(keys, self._keys):
+            if self._prev.shape != shape:
+                return None
+            return self._prev, self.rates, np.ones(shape[0], dtype=bool)
+        prev = np.zeros(shape, dtype=np.uint64)
+        rates = np.full(shape, np.nan)
+        known = np.zeros(shape[0], dtype=bool)
+        _, now_i, prev_i = np.intersect1d(keys, self._keys, assume_unique=True, return_indices=True)
+        prev[now_i] = self._prev[prev_i]
+        rates[now_i] = self.rates[prev_i]
+        known[now_i] = True
+        return prev, rates, known
+
+    def update(self, counters: np.ndarray, keys: Optional[np.ndarray] = None) -> np.ndarray:
+        """Rates of `counters` (NaN: unknown)."""
+        now = self.clock()
+        current = np.asarray(counters, dtype=np.uint64)
+        aligned = None if self._prev is None else self._align(keys, current.shape)
+        dt = (now - self._time) / 1e9
+        if aligned is None:
+            rates = np.full(current.shape, np.nan)
+        elif dt <= 0:
+            # same instant: nothing to measure yet
+            return aligned[1]
+        else:
+            prev, last, known = aligned
+            # uint64 arithmetic: the differences are modulo 2**64
+            delta = current - prev
+            down = current < prev
+            if down.any():
+                modulus = np.broadcast_to(self.modulus, current.shape)
+                wrapped = down & (modulus > 0) & (prev - current > modulus // np.uint64(2))
+                delta = np.where(wrapped, current + (modulus - prev),
+                                 np.where(down, current, delta))
+            rates = delta.astype(np.float64) * (self.scale / dt)
+            rates[~known] = np.nan
+            if self.tau > 0:
+                alpha = 1. - math.exp(-dt / self.tau)
+                smooth = last + alpha * (rates - last)
+                rates = np.where(np.isnan(last), rates, smooth)
+        self._keys = keys
+        self._prev = current.copy()
+        self._time = now
+        self.rates = rates
+        return rates
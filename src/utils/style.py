@@ -0,0 +1,144 @@
+import tkinter as tk
+import dataclasses
+from tkinter import ttk
+from typing import Optional, Tuple
+
+from src.systemAPI.registry import system
+from src.utils.table import set_dark_mode
+
+__all__ = ['StyleWatch']
+
+
+class StyleWatch():
+    FONT = 'Yu Gothic UI'
+    
+    @dataclasses.dataclass
+    class ColorHolder:
+        foreground: str
+        background: str
+        heading: str
+        disabled: str
+
+    def __init__(self,
+                 master: tk.Tk=None,
+                 dpi_factor: float=1.,
+                 theme: str = 'system'):
+        if master is None:
+            master = tk.Tk()
+        self.master = master
+        self.dpi_factor = dpi_factor
+        if theme == 'system':
+            self.current_mode = system.is_dark_mode()
+            self.syscolor = system.colorization_color()
+        else:
+            self.current_mode = theme == 'dark'
+            self.syscolor = '#0077cc' if theme == 'dark' else '#00aaff'
+        self.theme = theme
+
+        self.style = ttk.Style(master)
+        self.style.theme_use('default')
+        self.menu = tk.Menu(self.master, tearoff=False)
+        self.colors = self.choose_color()
+        self._init_styling()
+        self.apply(True)
+
+    def rescale(self):
+        self.style.configure("Treeview",
+                                font=(self.FONT, self.scaleto(12)),
+                                rowheight=self.scaleto(20))
+        self.style.configure("Treeview.Heading",
+                                font=(self.FONT, self.scaleto(12)),
+                                height=self.scaleto(20))
+        self.menu.configure(font=(self.FONT, self.scaleto(11)), borderwidth=0, border=0, relief='flat')
+
+    def _init_styling(self):
+        self.rescale()
+        self.style.theme_use('default')
+        self.style.layout('Treeview.Heading',
+                            [('Treeheading.cell', {'sticky': 'ewns', 'border': '5'}),
+                            ('Treeheading.border', {'sticky': 'nswe', 'children': [
+                                ('Treeheading.padding', {'sticky': 'nswe', 'children': [
+                                    ('Treeheading.image', {'side': 'right', 'sticky': ''}),
+                                    ('Treeheading.text', {'sticky': 'we'})]}
+                                )]}
+                            )]
+                            )
+        # remove dot lines
+        self.style.layout('Treeview.Item',
+                            [('Treeitem.padding',
+                            {'children': [
+                                ('Treeitem.indicator', {'side': 'left', 'sticky': ''}),
+                                ('Treeitem.image', {'side': 'left', 'sticky': ''}),
+                                ('Treeitem.text', {'side': 'left', 'sticky': ''})],
+                                'sticky': 'nswe'})
+                            ]
+                            )
+
+    def apply(self, force: bool=False, theme: Optional[Tuple[str, bool]] = None):
+        """
+        Restyle if the system theme changed. `theme`: (colorization color,
+        dark mode) already read (e.g. by the theme watcher), so the registry
+        is not read again on the Tk thread.
+        """
+        if not force:
+            if self.theme != 'system':
+                return
+            t, s = theme if theme is not None else (system.colorization_color(), system.is_dark_mode())
+            if t == self.syscolor and s == self.current_mode:
+                return
+            self.syscolor = t
+            self.current_mode = s
+        self.colors = self.choose_color()
+        self.style.configure('.',
+                             font=(self.FONT, self.scaleto(12)),
+                             foreground = self.colors.foreground,
+                             background=self.colors.background,
+                             insertcolor=self.colors.foreground,
+                             selectforeground=self.syscolor,
+                             selectbackground=self.colors.background,
+                             throughcolor=self.colors.background,
+                             fieldbackground=self.syscolor,
+                             borderwidth=0,
+                             relief = tk.SOLID,
+                             )
+        self.master.tk_setPalette(
+            background=self.style.lookup('.', 'background'),
+            foreground=self.style.lookup('.', 'foreground'),
+            selectBackground=self.style.lookup('.', 'selectbackground'),
+            selectForeground=self.style.lookup('.', 'selectforeground'),
+            highlightColor=self.style.lookup('.', 'fieldbackground'))
+        self.style.configure('Treeview', background=self.colors.background, fieldbackground=self.colors.background)
+        self.style.configure('Treeview.Heading',
+                             background=self.colors.heading,
+                             foreground=self.colors.foreground)
+        self.style.configure('Treeview.Item', padding=(2, 0, 0, 0))
+        self.style.map('Treeview',
+                       background=[('selected', self.style.lookup('.', 'selectforeground'))],
+                       foreground=[('selected', self.style.lookup('.', 'foreground'))])
+        self.style.map('Treeview.Heading', background=[('selected', self.colors.heading)])
+        self.menu.configure(
+            activebackground=self.colors.heading,
+            activeforeground=self.colors.foreground,
+            background=self.colors.background,
+            disabledforeground=self.colors.disabled,
+            foreground=self.colors.foreground,
+            )
+    
+    def scaleto(self, value: int):
+        return int(value * self.dpi_factor)
+    
+    def choose_color(self):
+        if self.theme == 'system':
+            # read by __init__ / apply
+            isdarkmode = self.current_mode
+        elif self.theme == 'dark':
+            isdarkmode = True
+        else:
+            isdarkmode = False
+
+        if isdarkmode:
+            holder = self.ColorHolder("#ffffff", "#393939", "#707070", "#a0a0a0")
+        else:
+            holder = self.ColorHolder("#000000", "#ffffff", "#CCCCCC", "#e0e0e0")
+        set_dark_mode(isdarkmode, holder.foreground)
+        return holder
@@ -1,21 +1,24 @@
 import enum
 import string
-import tkinter as tk
+import sys
 import dataclasses
-from tkinter import ttk
-from typing import List, Optional, Union
+from functools import partial
+from typing import Callable, Dict, List, Optional, Union
 
-from src.systemAPI.gpu import *
-from src.systemAPI.registry import system
 from src.utils.container import StatusContainer
 
+# Nvidia rows only exist on Windows
+if sys.platform == 'win32':
+    from src.systemAPI.gpu import gpu_fan_speed, gpu_power_limit
+
 __all__ = [
     'Name',
     'TableGroup',
     'adjust_format',
     'determine_color',
+    'resolve_color',
     'ctrl',
-    'StyleWatch']
+    'set_dark_mode']
 
 
 ALLOWED = ['name', 'tag', 'identifier', 'unit']
@@ -159,52 +162,31 @@ def set_temperature_color(value: int) -> str:
         return _create_color_code(value, 0, 0)
 
 
-def set_battery_color(name: 'Name', value: Union[str, int]) -> str:
-    if name.isname('Battery'):
-        # clip value 0 to 100
-        value = max(0, min(100, value))
-        # set value range to [0, 1.]
-        value = value / 100.
-        # multiply 255 and convert to int
-        value = int(255 * value)
-        if ISDARK:
-            if value < 0x80:
-                rc = 255
-                gc = value * 2
-            else:
-                rc = round((-131*value+49153) / 127)
-                gc = round((-3*value+32769) / 127)
-        else:
-            # bit complex
-            if value < 0x80:
-                rc = round((-0.9296875*value+288.0703125))
-                gc = value * 0xAA
-            else:
-                rc = round((-1.328125*value+388.671875))
-                gc = 0xAA
-        rc = max(0, min(255, rc))
-        gc = max(0, min(255, gc))
-        return _create_color_code(rc, gc, 0)
-    elif name.isname('AC Status'):
-        if value == 'Offline':
-            return "#FFFF00" if ISDARK else "#AAAA00"
-        elif value == 'Online':
-            return "#7CfC00" if ISDARK else "#AAAA00"
-    elif name.isname('Battery Status'):
-        if value in ['High', 'Charging', 'Charging(High)']:
-            return "#7CfC00" if ISDARK else "#00AA00"
-        if value in ['Low', 'Charging(Low)']:
-            return "#FFFF00" if ISDARK else "#AAAA00"
-        elif value == 'Critical':
-            return "#FF0000" if ISDARK else "#CC0000"
+def set_battery_level_color(value: int) -> str:
+    # clip value 0 to 100
+    value = max(0, min(100, value))
+    # set value range to [0, 1.]
+    value = value / 100.
+    # multiply 255 and convert to int
+    value = int(255 * value)
+    if ISDARK:
+        if value < 0x80:
+            rc = 255
+            gc = value * 2
         else:
-            return default_color
+            rc = round((-131*value+49153) / 127)
+            gc = round((-3*value+32769) / 127)
     else:
-        return default_color
-
-
-def set_load_color(value: int) -> str:
-    return set_temperature_color(value)
+        # bit complex
+        if value < 0x80:
+            rc = round((-0.9296875*value+288.0703125))
+            gc = value * 0xAA
+        else:
+            rc = round((-1.328125*value+388.671875))
+            gc = 0xAA
+    rc = max(0, min(255, rc))
+    gc = max(0, min(255, gc))
+    return _create_color_code(rc, gc, 0)
 
 
 def set_system_color(value: int) -> str:
@@ -219,170 +201,98 @@ def set_system_color(value: int) -> str:
         return _create_color_code(value, 0, 0)
 
 
-def set_nvgpu_power_color(value: float) -> str:
-    power_limit = gpu_power_limit()
-    if type(power_limit) is float:
-        value_p = value / power_limit * 100
-        return set_temperature_color(value_p)
-    else:
+# string values -> (dark, light)
+AC_STATUS_COLORS = {
+    'Offline': ("#FFFF00", "#AAAA00"),
+    'Online': ("#7CfC00", "#AAAA00"),
+}
+BATTERY_STATUS_COLORS = {
+    'High': ("#7CfC00", "#00AA00"),
+    'Charging': ("#7CfC00", "#00AA00"),
+    'Charging(High)': ("#7CfC00", "#00AA00"),
+    'Low': ("#FFFF00", "#AAAA00"),
+    'Charging(Low)': ("#FFFF00", "#AAAA00"),
+    'Critical': ("#FF0000", "#CC0000"),
+}
+
+# lookup tables for the current theme: colors of 0, 1, ..., 100 [%].
+# updated in place by `_build_luts`, so row color functions keep valid references.
+LUT_SIZE = 101
+TEMPERATURE_LUT: List[str] = []
+BATTERY_LUT: List[str] = []
+SYSTEM_LUT: List[str] = []
+AC_STATUS_LUT: Dict[str, str] = {}
+BATTERY_STATUS_LUT: Dict[str, str] = {}
+
+
+def _build_luts() -> None:
+    TEMPERATURE_LUT[:] = [set_temperature_color(v) for v in range(LUT_SIZE)]
+    BATTERY_LUT[:] = [set_battery_level_color(v) for v in range(LUT_SIZE)]
+    SYSTEM_LUT[:] = [set_system_color(v) for v in range(LUT_SIZE)]
+    theme = 0 if ISDARK else 1
+    AC_STATUS_LUT.clear()
+    AC_STATUS_LUT.update({k: v[theme] for k, v in AC_STATUS_COLORS.items()})
+    BATTERY_STATUS_LUT.clear()
+    BATTERY_STATUS_LUT.update({k: v[theme] for k, v in BATTERY_STATUS_COLORS.items()})
+_build_luts()
+
+
+def lut_color(lut: List[str], value: Union[int, float]) -> str:
+    """Color of a 0-100 value (rounded, clipped); non-numeric values get the default color."""
+    try:
+        i = int(value + 0.5)
+    except (TypeError, ValueError):
         return default_color
+    return lut[0 if i < 0 else 100 if i > 100 else i]
 
 
-def set_nvgpu_fan_color() -> str:
-    fan_speed = gpu_fan_speed()
-    if type(fan_speed) is float:
-        return set_temperature_color(fan_speed)
-    else:
-        return default_color
+def _default_color(value) -> str:
+    return default_color
 
 
-def determine_color(name: Name, value: Union[int, float, str]) -> str:
-    if name.istag('Temperature'):
-        cl = set_temperature_color(value)
-    elif name.istag('Load') or name.istag('gpu_ram') or name.istag('gpu_load'):
-        cl = set_load_color(value)
+def resolve_color(name: Name) -> Callable[[Union[int, float, str]], str]:
+    """
+    Color function of one table row, resolved once when the table is built.
+
+    The returned function only indexes the lookup tables of the current theme.
+    """
+    if name.istag('Temperature') or name.istag('Load') \
+            or name.istag('gpu_ram') or name.istag('gpu_load'):
+        return partial(lut_color, TEMPERATURE_LUT)
     elif name.istag('gpu_power'):
-        cl = set_nvgpu_power_color(value)
+        power_limit = gpu_power_limit()
+        if type(power_limit) is float:
+            return lambda value: lut_color(TEMPERATURE_LUT, value / power_limit * 100)
+        return _default_color
     elif name.istag('gpu_fan'):
-        cl = set_nvgpu_fan_color()
+        def gpu_fan_color(value) -> str:
+            # the row shows the OHM value; the color follows nvidia-smi's fan speed
+            fan_speed = gpu_fan_speed()
+            if type(fan_speed) is float:
+                return lut_color(TEMPERATURE_LUT, fan_speed)
+            return default_color
+        return gpu_fan_color
     elif name.istag('ac'):
-        cl = set_battery_color(name, value)
+        if name.isname('Battery'):
+            return partial(lut_color, BATTERY_LUT)
+        elif name.isname('AC Status'):
+            return lambda value: AC_STATUS_LUT.get(value, default_color)
+        elif name.isname('Battery Status'):
+            return lambda value: BATTERY_STATUS_LUT.get(value, default_color)
+        return _default_color
     elif name.istag('system'):
-        cl = set_system_color(value)
-    else:
-        cl = default_color
-    
-    return cl
+        return partial(lut_color, SYSTEM_LUT)
+    return _default_color
 
 
-class StyleWatch():
-    FONT = 'Yu Gothic UI'
-    
-    @dataclasses.dataclass
-    class ColorHolder:
-        foreground: str
-        background: str
-        heading: str
-        disabled: str
-
-    def __init__(self,
-                 master: tk.Tk=None,
-                 dpi_factor: float=1.,
-                 theme: str = 'system'):
-        if master is None:
-            master = tk.Tk()
-        self.master = master
-        self.dpi_factor = dpi_factor
-        if theme == 'system':
-            self.current_mode = system.is_dark_mode()
-            self.syscolor = system.colorization_color()
-        else:
-            self.current_mode = theme == 'dark'
-            self.syscolor = '#0077cc' if theme == 'dark' else '#00aaff'
-        self.theme = theme
-
-        self.style = ttk.Style(master)
-        self.style.theme_use('default')
-        self.menu = tk.Menu(self.master, tearoff=False)
-        self.colors = self.choose_color()
-        self._init_styling()
-        self.apply(True)
-
-    def rescale(self):
-        self.style.configure("Treeview",
-                                font=(self.FONT, self.scaleto(12)),
-                                rowheight=self.scaleto(20))
-        self.style.configure("Treeview.Heading",
-                                font=(self.FONT, self.scaleto(12)),
-                                height=self.scaleto(20))
-        self.menu.configure(font=(self.FONT, self.scaleto(11)), borderwidth=0, border=0, relief='flat')
-
-    def _init_styling(self):
-        self.rescale()
-        self.style.theme_use('default')
-        self.style.layout('Treeview.Heading',
-                            [('Treeheading.cell', {'sticky': 'ewns', 'border': '5'}),
-                            ('Treeheading.border', {'sticky': 'nswe', 'children': [
-                                ('Treeheading.padding', {'sticky': 'nswe', 'children': [
-                                    ('Treeheading.image', {'side': 'right', 'sticky': ''}),
-                                    ('Treeheading.text', {'sticky': 'we'})]}
-                                )]}
-                            )]
-                            )
-        # remove dot lines
-        self.style.layout('Treeview.Item',
-                            [('Treeitem.padding',
-                            {'children': [
-                                ('Treeitem.indicator', {'side': 'left', 'sticky': ''}),
-                                ('Treeitem.image', {'side': 'left', 'sticky': ''}),
-                                ('Treeitem.text', {'side': 'left', 'sticky': ''})],
-                                'sticky': 'nswe'})
-                            ]
-                            )
-
-    def apply(self, force: bool=False):
-        if not force:
-            if self.theme != 'system':
-                return
-            t = system.colorization_color()
-            s = system.is_dark_mode()
-            if t == self.syscolor and s == self.current_mode:
-                return
-            self.syscolor = t
-            self.current_mode = s
-        self.colors = self.choose_color()
-        self.style.configure('.',
-                             font=(self.FONT, self.scaleto(12)),
-                             foreground = self.colors.foreground,
-                             background=self.colors.background,
-                             insertcolor=self.colors.foreground,
-                             selectforeground=self.syscolor,
-                             selectbackground=self.colors.background,
-                             throughcolor=self.colors.background,
-                             fieldbackground=self.syscolor,
-                             borderwidth=0,
-                             relief = tk.SOLID,
-                             )
-        self.master.tk_setPalette(
-            background=self.style.lookup('.', 'background'),
-            foreground=self.style.lookup('.', 'foreground'),
-            selectBackground=self.style.lookup('.', 'selectbackground'),
-            selectForeground=self.style.lookup('.', 'selectforeground'),
-            highlightColor=self.style.lookup('.', 'fieldbackground'))
-        self.style.configure('Treeview', background=self.colors.background, fieldbackground=self.colors.background)
-        self.style.configure('Treeview.Heading',
-                             background=self.colors.heading,
-                             foreground=self.colors.foreground)
-        self.style.configure('Treeview.Item', padding=(2, 0, 0, 0))
-        self.style.map('Treeview',
-                       background=[('selected', self.style.lookup('.', 'selectforeground'))],
-                       foreground=[('selected', self.style.lookup('.', 'foreground'))])
-        self.style.map('Treeview.Heading', background=[('selected', self.colors.heading)])
-        self.menu.configure(
-            activebackground=self.colors.heading,
-            activeforeground=self.colors.foreground,
-            background=self.colors.background,
-            disabledforeground=self.colors.disabled,
-            foreground=self.colors.foreground,
-            )
-    
-    def scaleto(self, value: int):
-        return int(value * self.dpi_factor)
-    
-    def choose_color(self):
-        global default_color, ISDARK
-        if self.theme == 'system':
-            isdarkmode = system.is_dark_mode()
-        elif self.theme == 'dark':
-            isdarkmode = True
-        else:
-            isdarkmode = False
+def determine_color(name: Name, value: Union[int, float, str]) -> str:
+    return resolve_color(name)(value)
 
-        if isdarkmode:
-            holder = self.ColorHolder("#ffffff", "#393939", "#707070", "#a0a0a0")
-            ISDARK = True
-        else:
-            holder = self.ColorHolder("#000000", "#ffffff", "#CCCCCC", "#e0e0e0")
-            ISDARK = False
-        default_color = holder.foreground
-        return holder
+
+def set_dark_mode(isdark: bool, foreground: str) -> None:
+    """Called by StyleWatch when the theme changes; rebuilds the lookup tables if needed."""
+    global default_color, ISDARK
+    default_color = foreground
+    if isdark != ISDARK:
+        ISDARK = isdark
+        _build_luts()
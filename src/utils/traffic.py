@@ -0,0 +1,122 @@
+import dataclasses
+from typing import Any, List, Optional, Set, Tuple, Union
+
+import numpy as np
+
+from src.utils.rates import RateEngine
+from src.utils.task import logger
+from src.watchers import PollSource, Source, Watcher, WatcherThread
+
+__all__ = ['Adapter', 'AdapterTraffic', 'NOT_CONNECTED', 'DISCOVERY_INTERVAL']
+
+NOT_CONNECTED = 'Not connected'
+# seconds between two adapter discoveries besides the change notifications
+DISCOVERY_INTERVAL = 60.
+
+
+@dataclasses.dataclass
+class Adapter:
+    # LUID (Windows) / interface name (Linux)
+    key: Any
+    name: str
+    # a NIC (not a bond / bridge / vSwitch / VPN / tunnel on top of one)
+    physical: bool
+
+
+class AdapterTraffic:
+    """
+    Sent / received KB/s of the machine and of every active adapter.
+
+    Subclasses read the byte counters of all adapters with one call per
+    tick (`_read`); the rates (`RateEngine`, matched by key) and the
+    total are computed on the arrays. The total only adds up physical
+    adapters, since the traffic of a bond / vSwitch / VPN is also counted
+    on the NICs under it (all of them when there is no physical one).
+
+    Adapters are listed by `_discover`: at start (the adapters with their
+    own rows), then on the watcher thread when the system reports an
+    address / availability change or every `DISCOVERY_INTERVAL` seconds
+    (see `watch`). An idle link is not re-discovered; the sampling pass
+    only checks the watcher flag. The rows are fixed at start (the table
+    and the history have a fixed set of rows): an adapter found later is
+    counted in the total only, and logged.
+
+    `get_sent_received()` returns `[total sent, sent per adapter...,
+    total received, received per adapter...]`, 'Not connected' where
+    there is no value.
+    """
+    def __init__(self, tau: float = 0.):
+        # KB/s, 64-bit counters matched by adapter key
+        self.rates = RateEngine(tau=tau, scale=1 / 1024)
+        self._discovery: Optional[Watcher] = None
+        # adapters found after start (no row), already logged
+        self._unlisted: Set[str] = set()
+        found = self._discover()
+        # rows (fixed); their keys follow the later discoveries by name
+        self.adapters: List[Adapter] = [dataclasses.replace(adapter) for adapter in found]
+        self._apply(found)
+
+    def _discover(self) -> List[Adapter]:
+        raise NotImplementedError
+
+    def _discovery_source(self) -> Source:
+        """Source of `_discover` results (push where the OS can notify changes)."""
+        return PollSource(self._discover)
+
+    def _read(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(keys, n x 2 (sent, received) byte counters) of the active adapters."""
+        raise NotImplementedError
+
+    def watch(self, watchers: WatcherThread) -> None:
+        """Keep the adapter list up to date from `watchers`' thread."""
+        self._discovery = watchers.add(self._discovery_source(), interval=DISCOVERY_INTERVAL,
+                                       name='network adapters')
+
+    def _apply(self, found: List[Adapter]) -> None:
+        keys = {adapter.name: adapter.key for adapter in found}
+        new = keys.keys() - {adapter.name for adapter in self.adapters} - self._unlisted
+        if new:
+            logger.debug(f'Network: {", ".join(sorted(new))}: no row (found after start), '
+                         'counted in the total only.')
+            self._unlisted |= new
+        for adapter in self.adapters:
+            adapter.key = keys.get(adapter.name, adapter.key)
+        self._keys = np.array([adapter.key for adapter in self.adapters])
+        self._physical = np.array([adapter.key for adapter in found if adapter.physical])
+        # physical mask of the last `_read` keys
+        self._mask_keys: Optional[np.ndarray] = None
+        self._mask = np.zeros(0, dtype=bool)
+
+    @property
+    def names(self) -> List[str]:
+        return [adapter.name for adapter in self.adapters]
+
+    def _not_connected(self) -> List[str]:
+        return [NOT_CONNECTED] * (2 * (len(self.adapters) + 1))
+
+    def get_sent_received(self) -> List[Union[float, str]]:
+        if self._discovery is not None and self._discovery.consume():
+            self._apply(self._discovery.value)
+        keys, counters = self._read()
+        if not np.array_equal(keys, self._mask_keys):
+            self._mask_keys = keys
+            self._mask = np.isin(keys, self._physical)
+        physical = self._mask
+        rate = self.rates.update(counters, keys)
+        known = ~np.isnan(rate[:, 0])
+        if not known.any():
+            return self._not_connected()
+
+        sent, received = np.nansum(rate[physical] if physical[known].any() else rate, axis=0).tolist()
+        if not len(self.adapters):
+            return [sent, received]
+
+        # rows of the adapters found at start (NaN: gone)
+        order = np.argsort(keys)
+        pos = order[np.minimum(np.searchsorted(keys, self._keys, sorter=order), len(keys) - 1)]
+        rows = rate[pos]
+        rows[keys[pos] != self._keys] = np.nan
+        values = [sent, *rows[:, 0].tolist(), received, *rows[:, 1].tolist()]
+        return [NOT_CONNECTED if v != v else v for v in values]
+
+    __call__ = get_sent_received
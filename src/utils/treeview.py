@@ -0,0 +1,72 @@
+from tkinter import ttk
+from typing import Dict, List
+
+__all__ = ['TreeviewBatch', 'tcl_quote']
+
+_TCL_ESCAPE = str.maketrans({
+    **{c: '\\' + c for c in '\\"[]{}$; '},
+    '\n': '\\n',
+    '\t': '\\t',
+})
+
+
+def tcl_quote(value: str) -> str:
+    """Quote a string as a single Tcl word (backslash escapes, no substitution)."""
+    if value == '':
+        return '{}'
+    return value.translate(_TCL_ESCAPE)
+
+
+class TreeviewBatch:
+    """
+    Last rendered text / color of every row of a Treeview.
+
+    `set` only queues cells whose text or color changed since the last
+    `flush` (`set_label`: the row text, '#0'); `flush` sends all queued changes to Tcl as one script, so a
+    tick costs one round trip (or none when nothing changed).
+    Rows are addressed by index; each row has its own tag (for the color).
+    """
+    def __init__(self, tree: ttk.Treeview, column: str = '1'):
+        self.tree = tree
+        self.column = column
+        self._items: List[str] = []
+        self._tags: List[str] = []
+        self._texts: List[str] = []
+        self._labels: Dict[int, str] = {}
+        self._colors: List[str] = []
+        self._script: List[str] = []
+        # number of Tcl commands of the last flush
+        self.last_commands = 0
+
+    def add(self, item: str, tag: str, text: str, color: str) -> int:
+        """Register a row already inserted with `text` and tagged `tag` colored `color`."""
+        self._items.append(tcl_quote(item))
+        self._tags.append(tcl_quote(str(tag)))
+        self._texts.append(text)
+        self._colors.append(color)
+        return len(self._items) - 1
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def set(self, row: int, text: str, color: str) -> None:
+        path = self.tree._w
+        if text != self._texts[row]:
+            self._texts[row] = text
+            self._script.append(f'{path} set {self._items[row]} {self.column} {tcl_quote(text)}')
+        if color != self._colors[row]:
+            self._colors[row] = color
+            self._script.append(f'{path} tag configure {self._tags[row]} -foreground {tcl_quote(color)}')
+
+    def set_label(self, row: int, label: str) -> None:
+        if label != self._labels.get(row):
+            self._labels[row] = label
+            self._script.append(f'{self.tree._w} item {self._items[row]} -text {tcl_quote(label)}')
+
+    def flush(self) -> int:
+        """Send the queued changes; returns the number of Tcl commands sent."""
+        self.last_commands = len(self._script)
+        if self._script:
+            self.tree.tk.eval('\n'.join(self._script))
+            self._script.clear()
+        return self.last_commands
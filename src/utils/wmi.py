@@ -0,0 +1,201 @@
+import math
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+__all__ = [
+    'QuerySource',
+    'FakeQuerySource',
+    'WmiCache',
+    'FOREVER',
+    'CLASS_TTL',
+    'PROPERTY_TTL',
+    'DEFAULT_TTL',
+    'KEY_PROPERTY']
+
+Row = Dict[str, Any]
+
+FOREVER = math.inf
+# seconds a query result is reused, per class ...
+CLASS_TTL = {
+    'Win32_BIOS': FOREVER,
+    'Win32_PhysicalMemory': FOREVER,
+    'Win32_OperatingSystem': FOREVER,
+    'Win32_DiskPartition': 60.,
+    'Win32_Battery': 5.,
+}
+# ... and for the properties that change while running
+PROPERTY_TTL = {
+    'Win32_OperatingSystem': {
+        'FreePhysicalMemory': 3.,
+        'FreeVirtualMemory': 3.,
+        'FreeSpaceInPagingFiles': 3.,
+        'SizeStoredInPagingFiles': 3.,
+        'NumberOfProcesses': 3.,
+        'NumberOfUsers': 3.,
+        'LocalDateTime': 1.,
+    },
+}
+DEFAULT_TTL = 5.
+# property identifying an instance: results of the queries of one call
+# (one per TTL) are matched on it; classes without one are not split
+KEY_PROPERTY = {
+    'Win32_OperatingSystem': 'Name',
+    'Win32_PhysicalMemory': 'Tag',
+    'Win32_DiskPartition': 'DeviceID',
+    'Win32_Battery': 'DeviceID',
+}
+
+
+class QuerySource:
+    """Runs `SELECT <properties> FROM <wmi_class>` (called on the worker threads)."""
+    def query(self, wmi_class: str, properties: Sequence[str]) -> List[Row]:
+        """One dict per instance (properties without a value are left out)."""
+        raise NotImplementedError
+
+
+class FakeQuerySource(QuerySource):
+    """
+    Instances given as dicts per class (tests / benchmarks, and running off
+    Windows). Every query is appended to `queries` as WQL.
+    """
+    def __init__(self, tables: Optional[Dict[str, List[Row]]] = None, delay: float = 0.):
+        self.tables = tables if tables is not None else {}
+        self.delay = delay
+        self.queries: List[str] = []
+        self._lock = threading.Lock()
+
+    def query(self, wmi_class: str, properties: Sequence[str]) -> List[Row]:
+        with self._lock:
+            self.queries.append(f'SELECT {", ".join(properties)} FROM {wmi_class}')
+        if self.delay > 0:
+            time.sleep(self.delay)
+        if wmi_class not in self.tables:
+            raise LookupError(f'Invalid class "{wmi_class}".')
+        return [{name: row[name] for name in properties if row.get(name) is not None}
+                for row in self.tables[wmi_class]]
+
+    def select(self, wql: str) -> List[Row]:
+        """`query` from a WQL string (`SELECT a, b FROM Class`)."""
+        match = re.fullmatch(r'\s*SELECT\s+(.+?)\s+FROM\s+(\w+)\s*', wql, re.IGNORECASE)
+        if match is None:
+            raise ValueError(f'Unsupported query: {wql}')
+        properties, wmi_class = match.groups()
+        if properties.strip() == '*':
+            names = list(dict.fromkeys(k for row in self.tables.get(wmi_class, []) for k in row))
+        else:
+            names = [name.strip() for name in properties.split(',')]
+        return self.query(wmi_class, names)
+
+
+def _gather(futures: List[Future], merge: Callable[[List[Any]], Any]) -> Future:
+    """Future of `merge([results...])`, set when all of `futures` are done."""
+    if len(futures) == 1:
+        return futures[0]
+    result = Future()
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def done(_) -> None:
+        with lock:
+            remaining[0] -= 1
+            if remaining[0]:
+                return
+        try:
+            result.set_result(merge([future.result() for future in futures]))
+        except BaseException as e:
+            result.set_exception(e)
+
+    for future in futures:
+        future.add_done_callback(done)
+    return result
+
+
+class WmiCache:
+    """
+    Projected WMI queries run on a small thread pool, with results cached.
+
+    `submit(wmi_class, properties)` returns a Future right away; `get`
+    waits for it. Each property has a TTL (`PROPERTY_TTL`, else
+    `CLASS_TTL` of its class, else `DEFAULT_TTL`); the properties of one
+    call are split into one query per TTL, run in parallel and merged on
+    the key property of the class (`KEY_PROPERTY`, added to every split
+    query). Classes without a key are queried in one piece with the
+    shortest TTL. A result is reused until its TTL runs out (`FOREVER`:
+    static classes such as BIOS are queried once); identical queries in
+    flight are shared, failed ones are not cached.
+    """
+    def __init__(self,
+                 source: QuerySource,
+                 workers: int = 2,
+                 class_ttl: Optional[Dict[str, float]] = None,
+                 property_ttl: Optional[Dict[str, Dict[str, float]]] = None,
+                 key_property: Optional[Dict[str, str]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.source = source
+        self.class_ttl = CLASS_TTL if class_ttl is None else class_ttl
+        self.property_ttl = PROPERTY_TTL if property_ttl is None else property_ttl
+        self.key_property = KEY_PROPERTY if key_property is None else key_property
+        self.clock = clock
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix='wmi')
+        # (class, properties) -> (expiry, result)
+        self._entries: Dict[Tuple[str, Tuple[str, ...]], Tuple[float, Future]] = {}
+        self._lock = threading.Lock()
+
+    def ttl(self, wmi_class: str, prop: str) -> float:
+        ttl = self.property_ttl.get(wmi_class, {}).get(prop)
+        return ttl if ttl is not None else self.class_ttl.get(wmi_class, DEFAULT_TTL)
+
+    def _query(self, wmi_class: str, properties: Tuple[str, ...], ttl: float) -> Future:
+        key = (wmi_class, properties)
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expiry, future = entry
+                # a cancelled (`close`) or failed query is run again
+                if not future.done() or (now < expiry and not future.cancelled()
+                                         and future.exception() is None):
+                    return future
+            future = self._pool.submit(self.source.query, wmi_class, properties)
+            self._entries[key] = (now + ttl, future)
+        return future
+
+    def submit(self, wmi_class: str, properties: Sequence[str]) -> Future:
+        """Future of the instances of `wmi_class` (dicts of `properties`)."""
+        groups: Dict[float, List[str]] = {}
+        for prop in properties:
+            groups.setdefault(self.ttl(wmi_class, prop), []).append(prop)
+        key = self.key_property.get(wmi_class)
+        if len(groups) > 1 and key is None:
+            # no way to match the instances of several queries
+            groups = {min(groups): list(properties)}
+        if len(groups) > 1:
+            groups = {ttl: props if key in props else [key, *props] for ttl, props in groups.items()}
+        futures = [self._query(wmi_class, tuple(props), ttl) for ttl, props in groups.items()]
+
+        def merge(parts: List[List[Row]]) -> List[Row]:
+            # instances in the order of the first query, then the ones only the others saw
+            instances: Dict[Any, Row] = {}
+            for part in parts:
+                for row in part:
+                    instances.setdefault(row.get(key), {}).update(row)
+            return [{name: values[name] for name in properties if name in values}
+                    for values in instances.values()]
+
+        return _gather(futures, merge)
+
+    def get(self, wmi_class: str, properties: Sequence[str],
+            timeout: Optional[float] = None) -> List[Row]:
+        return self.submit(wmi_class, properties).result(timeout)
+
+    def invalidate(self, wmi_class: Optional[str] = None) -> None:
+        """Drop the cached results (of `wmi_class`, or all)."""
+        with self._lock:
+            for key in [k for k in self._entries if wmi_class in (None, k[0])]:
+                del self._entries[key]
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,172 @@
+import threading
+import time
+import traceback
+from typing import Any, Callable, List, Optional
+
+from src.gname import PYTASKMGR
+from src.utils.task import logger
+
+__all__ = ['Source', 'PollSource', 'FakeSource', 'Watcher', 'WatcherThread', 'POLL_INTERVAL']
+
+# seconds between two reads of a source that cannot notify changes
+POLL_INTERVAL = 5.
+
+
+class Source:
+    """
+    Where a watched value comes from.
+
+    `read()` returns the current value. Sources that can tell when the
+    value may have changed (`push = True`) call the function given to
+    `subscribe` from any thread; the value is then re-read on the watcher
+    thread.
+    """
+    push = False
+
+    def read(self) -> Any:
+        raise NotImplementedError
+
+    def subscribe(self, notify: Callable[[], None]) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class PollSource(Source):
+    """Plain function, re-read every `interval` seconds."""
+    def __init__(self, read: Callable[[], Any]):
+        self._read = read
+
+    def read(self) -> Any:
+        return self._read()
+
+
+class FakeSource(Source):
+    """
+    Settable value (tests / benchmarks, and running off Windows).
+
+    With `push=True`, `set` notifies like an OS change notification would.
+    """
+    def __init__(self, value: Any = None, push: bool = False):
+        self.value = value
+        self.push = push
+        self.reads = 0
+        self._notify: List[Callable[[], None]] = []
+
+    def read(self) -> Any:
+        self.reads += 1
+        return self.value
+
+    def subscribe(self, notify: Callable[[], None]) -> None:
+        self._notify.append(notify)
+
+    def set(self, value: Any) -> None:
+        self.value = value
+        if self.push:
+            for notify in self._notify:
+                notify()
+
+
+class Watcher:
+    """
+    Last known value of a source plus a "changed" flag.
+
+    The source is only read on the watcher thread; the UI checks
+    `consume()` (a flag test) and reads `value` when it returns True.
+    """
+    def __init__(self, thread: 'WatcherThread', source: Source, interval: Optional[float], name: str):
+        self.source = source
+        self.interval = interval
+        self.name = name
+        self.reads = 0
+        self._thread = thread
+        self._value = source.read()
+        self._changed = False
+        self._due = self._next_due()
+
+    def _next_due(self) -> float:
+        if self.interval is None:
+            return float('inf')
+        return time.monotonic() + self.interval
+
+    @property
+    def value(self) -> Any:
+        return self._value
+
+    def consume(self) -> bool:
+        """True once after every change."""
+        if self._changed:
+            self._changed = False
+            return True
+        return False
+
+    def notify(self) -> None:
+        """The value may have changed: re-read it soon (any thread)."""
+        self._due = 0.
+        self._thread.wake()
+
+    def refresh(self) -> None:
+        """Read the source now (watcher thread)."""
+        self.reads += 1
+        value = self.source.read()
+        if value != self._value:
+            logger.debug(f'Watcher {self.name}: {self._value} -> {value}')
+            self._value = value
+            self._changed = True
+
+
+class WatcherThread(threading.Thread):
+    """
+    One background thread for all watchers.
+
+    Push sources are re-read when they notify (plus every `interval`
+    seconds if one is given), the others every `interval` seconds. The
+    thread sleeps until the next read is due.
+    """
+    def __init__(self):
+        super().__init__(name=f'{PYTASKMGR} watcher', daemon=True)
+        self.watchers: List[Watcher] = []
+        self._wake = threading.Event()
+        self._stopped = False
+
+    def add(self,
+            source: Source,
+            interval: Optional[float] = POLL_INTERVAL,
+            name: str = '') -> Watcher:
+        """
+        Watch `source`. `interval=None` disables polling (push only).
+        A source without push support is always polled.
+        """
+        if not source.push and interval is None:
+            interval = POLL_INTERVAL
+        watcher = Watcher(self, source, interval, name)
+        if source.push:
+            source.subscribe(watcher.notify)
+        self.watchers.append(watcher)
+        self.wake()
+        return watcher
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def run(self) -> None:
+        while not self._stopped:
+            now = time.monotonic()
+            for watcher in self.watchers:
+                if watcher._due <= now:
+                    watcher._due = watcher._next_due()
+                    try:
+                        watcher.refresh()
+                    except Exception:
+                        logger.error(traceback.format_exc())
+            next_due = min((w._due for w in self.watchers), default=float('inf'))
+            timeout = max(0., next_due - time.monotonic())
+            self._wake.wait(None if timeout == float('inf') else timeout)
+            self._wake.clear()
+
+    def stop(self) -> None:
+        self._stopped = True
+        self.wake()
+        for watcher in self.watchers:
+            watcher.source.close()